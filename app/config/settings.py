@@ -1,5 +1,7 @@
 # app/infrastructure/db/session.py
 
+from typing import List, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -8,7 +10,32 @@ class Settings(BaseSettings):
     TEST_DATABASE_URL: str
     GROUP_SIZE_DEFAULT: int = 7
     PROPOSALS_PER_USER_DEFAULT: int = 2
+    GROUPING_HISTORY_FRACTALS: int = 5  # past fractals checked for repeat co-membership, 0 = off
+    GROUPING_ATTRIBUTES: List[str] = ["language", "timezone"]  # User.prefs keys kept together, fractal settings "group_by" overrides
+    GROUPING_SEED: Optional[int] = None  # fixed base seed (benchmarks), fractal settings "seed" overrides; None = random per round
     ROUND_TIME_DEFAULT: int = 10
+    LATE_JOIN_MINUTES: int = 5  # round 0 accepts new members this long after it starts, 0 = off
+    REBALANCE_AFTER_MINUTES: int = 3  # round 0 members with no activity by then may trade seats, 0 = off
+    REBALANCE_MIN_ACTIVE: int = 3  # groups below this many active members pull active ones from busy groups
+    CARD_FRAGMENT_CACHE_SIZE: int = 5000
+    CARD_FEED_PAGE_SIZE: int = 20
+    CARD_FEED_MAX_PAGE_SIZE: int = 100
+    SEARCH_PAGE_SIZE: int = 20
+    SEARCH_MAX_PAGE_SIZE: int = 100
+    STREAM_BATCH_SIZE: int = 5000  # rows per fetch in repositories/streaming.py
+    EXPORT_CHUNK_SIZE: int = 10000  # rows per server-side cursor fetch in exports
+    COMMENT_WINDOW_SIZE: int = 10
+    DASHBOARD_STATE_TTL_SECONDS: float = 3.0  # per-user /dashboard_state cache, also dropped on group/fractal changes
+    DASHBOARD_STATE_CACHE_SIZE: int = 5000
+    COMMENT_PAGE_SIZE: int = 20
+    SCORING_CONCURRENCY: int = 4
+    PROGRESS_PUSH_DEBOUNCE_SECONDS: float = 1.0  # one "progress" ws event per group per burst of votes, 0 = push every vote
+    EARLY_CLOSE_POLICY: str = "vote_phase"  # off | vote_phase | any_time, fractal meta "early_close" overrides
+    SLOW_QUERY_MS: int = 250
+    QUERY_PROFILE_SLOWEST: int = 5
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False
+    LOG_SAMPLE_EVERY: int = 100
 #    public_base_url: str = "https://temptingly-breechless-venessa.ngrok-free.dev"
 #    public_base_wss_url: str = "wss://temptingly-breechless-venessa.ngrok-free.dev"
     public_base_url: str = "https://fractal.ia-ai.se"
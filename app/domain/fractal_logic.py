@@ -1,6 +1,8 @@
 #~~~{"id":"70515","variant":"standard","title":"Async Service Layer"} 
 # app/domain/fractal_logic.py
-from typing import List, Dict, Optional
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import hashlib
+import heapq
 import random
 from datetime import datetime, timezone
 from datetime import datetime, timedelta
@@ -10,31 +12,266 @@ from datetime import datetime, timedelta
 # ----------------------------
 import math
 
-def divide_into_groups(user_ids: List[int], group_size: int) -> List[List[int]]:
+# Placement costs: meeting someone again is tolerated, meeting a rep from a
+# related source group less so, splitting a language/timezone bucket least.
+REPEAT_PENALTY = 1
+RELATED_PENALTY = 4
+ATTRIBUTE_PENALTY = 16
+GROUPING_WINDOW = 8  # open groups a user may be placed in
+_EMPTY: frozenset = frozenset()
+
+
+def group_sizes(n: int, group_size: int) -> List[int]:
+    """As even as possible, never above group_size; the first groups get the extra members."""
+    if n <= 0:
+        return []
+    num_groups = max(1, math.ceil(n / group_size))
+    base_size = n // num_groups
+    extra = n % num_groups  # first 'extra' groups get 1 more member
+    return [base_size + (1 if i < extra else 0) for i in range(num_groups)]
+
+
+def divide_into_groups(
+    user_ids: List[int],
+    group_size: int,
+    history: Optional[Dict[int, Set[int]]] = None,
+    related: Optional[Dict[int, Hashable]] = None,
+    attrs: Optional[Dict[int, Hashable]] = None,
+    seed: Optional[int] = None,
+) -> List[List[int]]:
     """
     Divide users into groups as evenly as possible, randomly.
     Extra members are distributed to the first few groups.
+
+    Deterministic for a given seed: the result depends only on the seed, the
+    set of user ids and the constraints, never on input order or global random
+    state, so a round's groups can be replayed from Round.seed.
+
+    Optional constraints:
+      history: user → users they already sat with (symmetric); repeats are avoided
+      related: user → key; users sharing a key (reps of related source groups) are kept apart
+      attrs:   user → bucket (language, timezone); groups stay within one bucket when possible
+
+    With constraints, users are ordered by bucket (random within a bucket) and
+    placed greedily into the cheapest of the next GROUPING_WINDOW groups with
+    room; groups that still got a conflict are then repaired by pairwise swaps
+    with nearby groups. Cost per user is O(window * group_size), so 100k
+    members take well under a second; it is a heuristic, not an optimum.
     """
     if not user_ids:
         return []
 
-    random.shuffle(user_ids)
+    rng = random.Random(seed)
+    sizes = group_sizes(len(user_ids), group_size)
+    order = sorted(user_ids)
+    rng.shuffle(order)
 
-    n = len(user_ids)
-    num_groups = max(1, math.ceil(n / group_size))
-    base_size = n // num_groups
-    extra = n % num_groups  # first 'extra' groups get 1 more member
+    if not (history or related or attrs):
+        groups = []
+        idx = 0
+        for size in sizes:
+            groups.append(order[idx: idx + size])
+            idx += size
+        return groups
+
+    history = history or {}
+    related = related or {}
+    attrs = attrs or {}
 
-    groups = []
-    idx = 0
-    for i in range(num_groups):
-        size = base_size + (1 if i < extra else 0)
-        groups.append(user_ids[idx: idx + size])
-        idx += size
+    if attrs:
+        order.sort(key=lambda uid: str(attrs.get(uid, "")))  # stable: still shuffled within a bucket
+
+    groups: List[List[int]] = [[] for _ in sizes]
+    group_keys: List[Dict[Hashable, int]] = [{} for _ in sizes]
+    group_attr: List[Optional[Hashable]] = [None] * len(sizes)
+    first = 0  # every group before it is full
+    conflicted: Set[int] = set()
+
+    for uid in order:
+        while len(groups[first]) >= sizes[first]:
+            first += 1
+        last = min(first + GROUPING_WINDOW, len(sizes))
+
+        met = history.get(uid) or _EMPTY
+        key = related.get(uid)
+        attr = attrs.get(uid)
+        best, best_cost = first, None
+        for g in range(first, last):
+            members = groups[g]
+            if len(members) >= sizes[g]:
+                continue
+            cost = 0 if met.isdisjoint(members) else REPEAT_PENALTY * len(met.intersection(members))
+            if key is not None:
+                cost += RELATED_PENALTY * group_keys[g].get(key, 0)
+            if group_attr[g] is not None and group_attr[g] != attr:
+                cost += ATTRIBUTE_PENALTY
+            if best_cost is None or cost < best_cost:
+                best, best_cost = g, cost
+                if cost == 0:
+                    break
+
+        groups[best].append(uid)
+        if best_cost:
+            conflicted.add(best)
+        if key is not None:
+            group_keys[best][key] = group_keys[best].get(key, 0) + 1
+        if group_attr[best] is None:
+            group_attr[best] = attr
+
+    # The last groups of a window take whoever is left; swap their conflicted
+    # members with same-bucket members of nearby groups while that lowers the cost.
+    for g in sorted(conflicted):
+        members = groups[g]
+        for i, u in enumerate(members):
+            cost_u = _member_cost(u, members, history, related)
+            if not cost_u:
+                continue
+            for h in range(max(0, g - GROUPING_WINDOW), min(len(groups), g + GROUPING_WINDOW + 1)):
+                others = groups[h]
+                j = _better_swap(u, cost_u, members, others, history, related, attrs) if h != g else None
+                if j is not None:
+                    members[i], others[j] = others[j], u
+                    break
 
     return groups
 
 
+def _member_cost(uid: int, members: List[int], history, related, skip: Optional[int] = None) -> int:
+    met = history.get(uid) or _EMPTY
+    key = related.get(uid)
+    cost = 0
+    for m in members:
+        if m == uid or m == skip:
+            continue
+        if m in met:
+            cost += REPEAT_PENALTY
+        if key is not None and related.get(m) == key:
+            cost += RELATED_PENALTY
+    return cost
+
+
+def _better_swap(u, cost_u, members, others, history, related, attrs) -> Optional[int]:
+    """Index in others of a member to trade places with u, if that lowers the combined cost."""
+    attr = attrs.get(u)
+    for j, v in enumerate(others):
+        if attrs.get(v) != attr:
+            continue
+        before = cost_u + _member_cost(v, others, history, related)
+        after = _member_cost(u, others, history, related, skip=v) + _member_cost(v, members, history, related, skip=u)
+        if after < before:
+            return j
+    return None
+
+
+Move = Tuple[int, Optional[int], int]  # (user_id, from group or None for a late joiner, to group)
+
+
+def plan_rebalance(
+    groups: Dict[int, List[int]],
+    active: Set[int],
+    pinned: Set[int],
+    late: List[int],
+    group_size: int,
+    min_active: int = 3,
+    move_members: bool = True,
+) -> List[Move]:
+    """
+    Moves that even out active members across the groups of a round.
+
+    1. Late joiners go to the group with the fewest active members that has
+       room (fewest members when all are full); they count as active.
+    2. With move_members, every group below min(min_active, average) active
+       members takes an active, unpinned member from the busiest group, and
+       when full sends one of its inactive members back in exchange, so sizes
+       stay put. Pinned members (authors) never move, nobody moves twice.
+    """
+    if not groups:
+        return []
+    members = {gid: list(uids) for gid, uids in groups.items()}
+    counts = {gid: sum(1 for uid in uids if uid in active) for gid, uids in members.items()}
+    moves: List[Move] = []
+    moved: Set[int] = set()
+
+    def relocate(uid: int, src: Optional[int], dst: int) -> None:
+        if src is not None:
+            members[src].remove(uid)
+        members[dst].append(uid)
+        moves.append((uid, src, dst))
+        moved.add(uid)
+
+    # 1. Late joiners: (has no room, active, size) min-heap with lazy updates
+    heap = [(len(m) >= group_size, counts[g], len(m), g) for g, m in members.items()]
+    heapq.heapify(heap)
+    for uid in sorted(late):
+        while True:
+            full, count, size, g = heapq.heappop(heap)
+            if (full, count, size) == (len(members[g]) >= group_size, counts[g], len(members[g])):
+                break
+        relocate(uid, None, g)
+        counts[g] += 1
+        heapq.heappush(heap, (len(members[g]) >= group_size, counts[g], len(members[g]), g))
+
+    if not move_members:
+        return moves
+
+    # 2. Starved groups pull active members from the busiest groups
+    need = min(min_active, sum(counts.values()) // len(counts))
+    donors = [(-c, g) for g, c in counts.items()]
+    heapq.heapify(donors)
+    for s in sorted((g for g, c in counts.items() if c < need), key=lambda g: (counts[g], g)):
+        while counts[s] < need and donors:
+            c, d = heapq.heappop(donors)
+            if -c != counts[d]:
+                continue  # stale entry
+            if counts[d] - 1 < need or counts[d] < counts[s] + 2:
+                heapq.heappush(donors, (c, d))
+                break
+            uid = next((u for u in members[d] if u in active and u not in pinned and u not in moved), None)
+            if uid is None:
+                continue  # nobody movable here, drop the donor
+            spare = None
+            if len(members[s]) >= group_size:
+                spare = next((u for u in members[s] if u not in active and u not in pinned and u not in moved), None)
+                if spare is None:
+                    heapq.heappush(donors, (c, d))
+                    break
+            relocate(uid, d, s)
+            if spare is not None:
+                relocate(spare, s, d)
+            counts[d] -= 1
+            counts[s] += 1
+            heapq.heappush(donors, (-counts[d], d))
+    return moves
+
+
+def derive_seed(*parts) -> int:
+    """Stable 63-bit seed from any parts (e.g. a base seed and a round level)."""
+    digest = hashlib.sha256(":".join(map(str, parts)).encode()).digest()
+    return int.from_bytes(digest[:8], "big") >> 1
+
+
+def new_seed() -> int:
+    return random.SystemRandom().getrandbits(63)
+
+
+def grouping_conflicts(
+    groups: List[List[int]],
+    history: Optional[Dict[int, Set[int]]] = None,
+    related: Optional[Dict[int, Hashable]] = None,
+) -> Dict[str, int]:
+    """Pairs in the same group that met before / share a related key."""
+    history = history or {}
+    related = related or {}
+    repeats = related_pairs = 0
+    for members in groups:
+        for i, a in enumerate(members):
+            met = history.get(a, ())
+            for b in members[i + 1:]:
+                repeats += b in met
+                related_pairs += a in related and related.get(a) == related.get(b)
+    return {"repeats": repeats, "related": related_pairs}
+
+
 def get_round_index(fractal, now=None):
     """Returns how many full rounds have elapsed since start_date."""
     now = now or datetime.utcnow()
@@ -78,3 +315,90 @@ def build_comment_tree(comments: List[Dict]) -> List[Dict]:
             tree.append(c)
     return tree
 
+
+# ----------------------------
+# Voting completion
+# ----------------------------
+EARLY_CLOSE_POLICIES = ("off", "vote_phase", "any_time")
+
+
+def required_medals(member_count: int) -> int:
+    """Gold/silver/bronze, but never more medals than other members to give them to."""
+    return max(0, min(3, member_count - 1))
+
+
+def group_progress(
+    member_ids: List[int],
+    remaining: Dict[int, int],
+    medals: Dict[int, int],
+    proposal_count: int,
+    items_total: int,
+    items_consumed: int,
+) -> Dict:
+    """
+    Voting progress of one group.
+    remaining: unvoted queue items per member; medals: rep medals cast per member.
+    A group without proposals is never complete (nothing was discussed yet).
+    """
+    need = required_medals(len(member_ids))
+    done = [
+        uid for uid in member_ids
+        if remaining.get(uid, 0) == 0 and medals.get(uid, 0) >= need
+    ]
+    votes_total = items_total + need * len(member_ids)
+    votes_cast = items_consumed + sum(min(medals.get(uid, 0), need) for uid in member_ids)
+    return {
+        "members": len(member_ids),
+        "members_done": len(done),
+        "votes_cast": votes_cast,
+        "votes_total": votes_total,
+        "complete": proposal_count > 0 and len(done) == len(member_ids),
+    }
+
+
+def member_progress(
+    member_ids: List[int],
+    queue: List[Tuple[int, int, int, int]],
+    rep_votes: List[Tuple[int, int]],
+    proposal_count: int,
+    user_id: Optional[int],
+) -> Tuple[Dict, Dict]:
+    """
+    (group progress, the user's own progress) from raw rows: queue counts
+    (user_id, item_type, total, consumed) and rep votes (voter_user_id, points).
+    The user's part: unvoted items per item_type, medals cast and needed.
+    """
+    remaining: Dict[int, int] = {}
+    unvoted: Dict[int, int] = {}
+    items_total = items_consumed = 0
+    for uid, item_type, total, consumed in queue:
+        remaining[uid] = remaining.get(uid, 0) + total - consumed
+        items_total += total
+        items_consumed += consumed
+        if uid == user_id:
+            unvoted[item_type] = unvoted.get(item_type, 0) + total - consumed
+    points: Dict[int, Set[int]] = {}
+    for voter, p in rep_votes:
+        points.setdefault(voter, set()).add(p)
+    medals = {uid: len(p) for uid, p in points.items()}
+
+    progress = group_progress(member_ids, remaining, medals, proposal_count, items_total, items_consumed)
+    mine = {
+        "unvoted": unvoted,
+        "medals_cast": medals.get(user_id, 0),
+        "medals_needed": required_medals(len(member_ids)),
+    }
+    return progress, mine
+
+
+def should_close_early(policy: str, round_status: str, progress: List[Dict]) -> bool:
+    """
+    off:        always wait for round_time
+    vote_phase: close once every group is complete, but not before half-way
+    any_time:   close as soon as every group is complete
+    """
+    if policy == "off" or not progress:
+        return False
+    if policy == "vote_phase" and round_status != "vote":
+        return False
+    return all(p["complete"] for p in progress)
@@ -0,0 +1,180 @@
+# app/domain/promotion.py
+"""
+Promotion policies: who moves up from a closed round and what they carry.
+
+A policy is read from Fractal.meta["promotion"] (merged over DEFAULT_POLICY)
+and applied by promote_to_next_round in three steps, each a named strategy:
+
+  reps       which ranked reps of each group move up
+             "top_k":      the first reps_per_group medals (1 = gold only)
+  proposals  which proposals of a source group travel with its reps
+             "top_k":      the best proposals_per_user (meta["proposals_per_user"])
+             "threshold":  every proposal scoring >= min_score, at most max_proposals
+  merge      how carried proposals are reconciled across groups
+             "near":       near duplicates (word-shingle Jaccard >= similarity,
+                           see domain.similarity) collapse into the best scored
+             "exact":      same normalized title and body collapse into the best scored
+             "none"
+
+New strategies register with @rep_strategy / @proposal_strategy / @merge_strategy.
+Everything here is pure: proposals only need id, title, body, total_score.
+"""
+import re
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from domain.similarity import merge_near_duplicates
+
+DEFAULT_POLICY = {
+    "reps": "top_k",
+    "reps_per_group": 1,
+    "proposals": "top_k",
+    "proposals_per_user": 2,
+    "min_score": 0.0,
+    "max_proposals": 10,
+    "merge": "near",
+    "similarity": 0.6,
+}
+
+REP_STRATEGIES: Dict[str, Callable] = {}
+PROPOSAL_STRATEGIES: Dict[str, Callable] = {}
+MERGE_STRATEGIES: Dict[str, Callable] = {}
+
+
+def _register(registry: Dict[str, Callable], name: str):
+    def wrap(fn):
+        registry[name] = fn
+        return fn
+    return wrap
+
+
+def rep_strategy(name: str):
+    """fn(ranked: {rank: user_id}, policy) -> [user_id, ...] best first."""
+    return _register(REP_STRATEGIES, name)
+
+
+def proposal_strategy(name: str):
+    """fn(proposals best first, policy) -> proposals to carry."""
+    return _register(PROPOSAL_STRATEGIES, name)
+
+
+def merge_strategy(name: str):
+    """fn(proposals, policy) -> {duplicate_id: kept_id}."""
+    return _register(MERGE_STRATEGIES, name)
+
+
+def resolve_policy(meta: Dict, default_proposals_per_user: int) -> Tuple[Dict, List[str]]:
+    """
+    The effective policy for a fractal and the settings that were ignored
+    (unknown strategy names fall back to the default strategy).
+    """
+    meta = meta or {}
+    policy = {
+        **DEFAULT_POLICY,
+        "proposals_per_user": meta.get("proposals_per_user", default_proposals_per_user),
+        **(meta.get("promotion") or {}),
+    }
+    ignored = []
+    for key, registry in (("reps", REP_STRATEGIES), ("proposals", PROPOSAL_STRATEGIES), ("merge", MERGE_STRATEGIES)):
+        if policy[key] not in registry:
+            ignored.append(f"{key}={policy[key]}")
+            policy[key] = DEFAULT_POLICY[key]
+    return policy, ignored
+
+
+def _score(p) -> float:
+    return p.total_score if p.total_score is not None else float("-inf")
+
+
+# ----------------------------
+# Reps
+# ----------------------------
+@rep_strategy("top_k")
+def top_k_reps(ranked: Dict[int, int], policy: Dict) -> List[int]:
+    k = max(1, int(policy["reps_per_group"]))
+    return [ranked[rank] for rank in sorted(ranked)[:k]]
+
+
+# ----------------------------
+# Proposals
+# ----------------------------
+@proposal_strategy("top_k")
+def top_k_proposals(proposals: Sequence, policy: Dict) -> List:
+    return list(proposals[: max(0, int(policy["proposals_per_user"]))])
+
+
+@proposal_strategy("threshold")
+def threshold_proposals(proposals: Sequence, policy: Dict) -> List:
+    min_score = float(policy["min_score"])
+    return [p for p in proposals if _score(p) >= min_score][: max(0, int(policy["max_proposals"]))]
+
+
+# ----------------------------
+# Merge
+# ----------------------------
+@merge_strategy("none")
+def no_merge(proposals: Sequence, policy: Dict) -> Dict[int, int]:
+    return {}
+
+
+_NON_WORD = re.compile(r"\W+")
+
+
+def normalize_text(text: str) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+
+@merge_strategy("exact")
+def exact_merge(proposals: Sequence, policy: Dict) -> Dict[int, int]:
+    kept: Dict[Tuple[str, str], object] = {}
+    merged: Dict[int, int] = {}
+    for p in sorted(proposals, key=lambda p: (-_score(p), p.id)):
+        key = (normalize_text(p.title), normalize_text(p.body))
+        if key in kept:
+            merged[p.id] = kept[key].id
+        else:
+            kept[key] = p
+    return merged
+
+
+@merge_strategy("near")
+def near_merge(proposals: Sequence, policy: Dict) -> Dict[int, int]:
+    return merge_near_duplicates(proposals, float(policy["similarity"]))
+
+
+# ----------------------------
+# Plan
+# ----------------------------
+def select_reps(reps_by_group: Dict[int, Dict[int, int]], policy: Dict) -> Dict[int, int]:
+    """{rep_id: source group id} for every promoted rep; {group_id: {rank: user_id}} in."""
+    pick_reps = REP_STRATEGIES[policy["reps"]]
+    rep_source: Dict[int, int] = {}
+    for gid, ranked in reps_by_group.items():
+        for uid in pick_reps(ranked, policy):
+            rep_source.setdefault(uid, gid)
+    return rep_source
+
+
+def plan_promotion(
+    rep_source: Dict[int, int],
+    proposals_by_group: Dict[int, List],
+    policy: Dict,
+) -> Tuple[Dict[int, List], Dict[int, int]]:
+    """
+    (rep → proposals they carry, duplicate id → kept id).
+    proposals_by_group lists each group's proposals best first. A group with
+    several promoted reps deals its proposals out round-robin, best rep first.
+    """
+    pick_proposals = PROPOSAL_STRATEGIES[policy["proposals"]]
+    reps_of: Dict[int, List[int]] = {}
+    for uid, gid in rep_source.items():
+        reps_of.setdefault(gid, []).append(uid)
+
+    carried: Dict[int, List] = {uid: [] for uid in rep_source}
+    for gid, reps in reps_of.items():
+        for i, p in enumerate(pick_proposals(proposals_by_group.get(gid, []), policy)):
+            carried[reps[i % len(reps)]].append(p)
+
+    merged = MERGE_STRATEGIES[policy["merge"]]([p for ps in carried.values() for p in ps], policy)
+    if merged:
+        carried = {uid: [p for p in ps if p.id not in merged] for uid, ps in carried.items()}
+    return carried, merged
@@ -0,0 +1,138 @@
+# app/domain/similarity.py
+"""
+Near-duplicate detection for proposals, local and dependency free.
+
+Texts become sets of hashed word shingles (bigrams, or the single word of a
+one-word text). Each set gets a one-permutation MinHash signature: every
+shingle hash lands in one of SIGNATURE_SIZE bins and the bin keeps its
+minimum, empty bins borrow from the next filled one. Signatures are split into
+LSH bands; texts sharing a band are candidates, and candidates are confirmed
+with the exact Jaccard similarity of their shingle sets. Confirmed pairs are
+joined into clusters with union-find.
+
+Cost is linear in the number of words (texts are cut at MAX_WORDS): about
+2s for 28k proposals of ~30 words, run once per promotion.
+"""
+import re
+import zlib
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+SIGNATURE_BITS = 5
+SIGNATURE_SIZE = 1 << SIGNATURE_BITS  # 32 bins
+BANDS = 10  # 10 bands x 3 rows: pairs from about Jaccard 0.45 up become candidates
+_ROWS = 3
+_MASK = SIGNATURE_SIZE - 1
+_LOW = (1 << (32 - SIGNATURE_BITS)) - 1
+_EMPTY = 0xFFFFFFFF
+_MIX = 0x9E3779B1  # golden ratio multiplier
+MAX_WORDS = 64  # title + start of the body is enough to tell duplicates
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, word_ids: Optional[Dict[str, int]] = None) -> FrozenSet[int]:
+    """
+    32-bit hashes of the word bigrams. Words are crc32'd once per call site
+    (word_ids cache) and bigrams mixed multiplicatively, which is much cheaper
+    than hashing bigram strings and stable across processes.
+    """
+    word_ids = {} if word_ids is None else word_ids
+    ids = []
+    for w in _WORD.findall((text or "").lower())[:MAX_WORDS]:
+        h = word_ids.get(w)
+        if h is None:
+            h = word_ids[w] = zlib.crc32(w.encode())
+        ids.append(h)
+    if len(ids) < 2:
+        return frozenset((h * _MIX) & 0xFFFFFFFF for h in ids)
+    return frozenset(((a * _MIX + b) * _MIX) & 0xFFFFFFFF for a, b in zip(ids, ids[1:]))
+
+
+def signature(shingle_set: Iterable[int]) -> Tuple[int, ...]:
+    bins = [_EMPTY] * SIGNATURE_SIZE
+    for h in shingle_set:
+        b = h >> (32 - SIGNATURE_BITS)  # top bits: best mixed
+        v = h & _LOW
+        if v < bins[b]:
+            bins[b] = v
+    # Densify: an empty bin takes the value of the next filled one (cyclically)
+    filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+    if filled and len(filled) < SIGNATURE_SIZE:
+        nxt = filled[0]
+        for i in range(SIGNATURE_SIZE - 1, -1, -1):
+            if bins[i] != _EMPTY:
+                nxt = i
+            else:
+                bins[i] = bins[nxt] + (((nxt - i) & _MASK) << (32 - SIGNATURE_BITS))  # above any real value
+    return tuple(bins)
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def near_duplicate_clusters(texts: Dict[Hashable, str], threshold: float = 0.6) -> List[List[Hashable]]:
+    """
+    Groups of keys whose texts are near duplicates (Jaccard >= threshold on
+    word shingles, chained transitively). Singletons are left out; keys in a
+    cluster keep the order of texts.
+    """
+    keys = list(texts)
+    word_ids: Dict[str, int] = {}
+    sets = [shingles(texts[k], word_ids) for k in keys]
+    parent = list(range(len(keys)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    bands: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(BANDS)]
+    for i, s in enumerate(sets):
+        if not s:
+            continue
+        sig = signature(s)
+        for band, buckets in enumerate(bands):
+            buckets.setdefault(sig[band * _ROWS:(band + 1) * _ROWS], []).append(i)
+
+    for members in (m for buckets in bands for m in buckets.values()):
+        if len(members) < 2:
+            continue
+        # Compare against one representative per cluster in the bucket, so a
+        # bucket of identical texts stays linear
+        reps: List[int] = []
+        for j in members:
+            for i in reps:
+                if find(i) == find(j):
+                    break
+                if jaccard(sets[i], sets[j]) >= threshold:
+                    parent[find(j)] = find(i)
+                    break
+            else:
+                reps.append(j)
+
+    clusters: Dict[int, List[Hashable]] = {}
+    for i, k in enumerate(keys):
+        clusters.setdefault(find(i), []).append(k)
+    return [c for c in clusters.values() if len(c) > 1]
+
+
+def proposal_text(p) -> str:
+    return f"{p.title or ''} {p.body or ''}"
+
+
+def merge_near_duplicates(proposals: Sequence, threshold: float) -> Dict[int, int]:
+    """{duplicate_id: kept_id}; each cluster keeps its best scored proposal (lowest id on ties)."""
+    by_id = {p.id: p for p in proposals}
+    merged: Dict[int, int] = {}
+    for cluster in near_duplicate_clusters({p.id: proposal_text(p) for p in proposals}, threshold):
+        ranked = sorted(
+            cluster,
+            key=lambda pid: (-(by_id[pid].total_score if by_id[pid].total_score is not None else float("-inf")), pid),
+        )
+        for pid in ranked[1:]:
+            merged[pid] = ranked[0]
+    return merged
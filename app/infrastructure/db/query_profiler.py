@@ -0,0 +1,197 @@
+# infrastructure/db/query_profiler.py
+"""
+SQL query profiler.
+
+Cursor events on the engine count queries and DB time into the QueryProfile of
+the current unit of work (HTTP route, Telegram handler, poll tick), which is
+carried in a ContextVar. Finished profiles are aggregated per name so route
+regressions show up in get_query_stats().
+"""
+import heapq
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from config.settings import settings
+from infrastructure.logging_setup import kv
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryProfile"]] = ContextVar("query_profile", default=None)
+_stats: Dict[str, "_ProfileStats"] = {}
+
+_WS = re.compile(r"\s+")
+
+
+def _short(statement: str, limit: int = 300) -> str:
+    return _WS.sub(" ", statement).strip()[:limit]
+
+
+class QueryProfile:
+    """Queries executed by one unit of work."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.db_time = 0.0
+        self.slowest: List[Tuple[float, str]] = []  # min-heap of (seconds, statement)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.db_time += duration
+        item = (duration, statement)
+        if len(self.slowest) < settings.QUERY_PROFILE_SLOWEST:
+            heapq.heappush(self.slowest, item)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def headers(self) -> Dict[str, str]:
+        db_ms = self.db_time * 1000
+        return {
+            "X-DB-Queries": str(self.count),
+            "X-DB-Time-ms": f"{db_ms:.1f}",
+            "Server-Timing": f'db;dur={db_ms:.1f};desc="{self.count} queries"',
+        }
+
+
+class _ProfileStats:
+    __slots__ = ("calls", "queries", "db_time", "max_queries", "max_db_time", "slowest")
+
+    def __init__(self):
+        self.calls = 0
+        self.queries = 0
+        self.db_time = 0.0
+        self.max_queries = 0
+        self.max_db_time = 0.0
+        self.slowest: List[Tuple[float, str]] = []
+
+    def add(self, profile: QueryProfile) -> None:
+        self.calls += 1
+        self.queries += profile.count
+        self.db_time += profile.db_time
+        self.max_queries = max(self.max_queries, profile.count)
+        self.max_db_time = max(self.max_db_time, profile.db_time)
+        for duration, statement in profile.slowest:
+            item = (duration, _short(statement))
+            if len(self.slowest) < settings.QUERY_PROFILE_SLOWEST:
+                heapq.heappush(self.slowest, item)
+            elif duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+
+
+# ----------------------------
+# SQLAlchemy events
+# ----------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, duration)
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("🐢 Slow query", extra=kv(
+            ms=round(duration * 1000), unit=profile.name if profile else "-", sql=_short(statement),
+        ))
+
+
+def install_query_profiler(engine) -> None:
+    """Attach the cursor listeners to an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ----------------------------
+# Units of work
+# ----------------------------
+def start_query_profile(name: str):
+    """Begin profiling; returns (profile, token) for finish_query_profile."""
+    profile = QueryProfile(name)
+    return profile, _current.set(profile)
+
+
+def finish_query_profile(profile: QueryProfile, token, name: Optional[str] = None) -> None:
+    """Stop profiling and aggregate under name (defaults to the start name)."""
+    _current.reset(token)
+    profile.name = name or profile.name
+    _stats.setdefault(profile.name, _ProfileStats()).add(profile)
+
+
+@contextmanager
+def query_profile(name: str):
+    """with query_profile("poll:check_fractals") as profile: ..."""
+    profile, token = start_query_profile(name)
+    try:
+        yield profile
+    finally:
+        finish_query_profile(profile, token)
+
+
+def get_query_stats() -> Dict[str, Dict]:
+    """Aggregated query stats per route / handler / tick, most DB time first."""
+    out = {}
+    for name, s in sorted(_stats.items(), key=lambda kv: kv[1].db_time, reverse=True):
+        out[name] = {
+            "calls": s.calls,
+            "queries_avg": round(s.queries / s.calls, 2),
+            "queries_max": s.max_queries,
+            "db_ms_avg": round(s.db_time / s.calls * 1000, 2),
+            "db_ms_max": round(s.max_db_time * 1000, 2),
+            "slowest": [
+                {"ms": round(d * 1000, 2), "statement": stmt}
+                for d, stmt in sorted(s.slowest, reverse=True)
+            ],
+        }
+    return out
+
+
+def iter_query_totals():
+    """(name, calls, queries, db_seconds) per unit of work, for /metrics."""
+    for name, s in _stats.items():
+        yield name, s.calls, s.queries, s.db_time
+
+
+# ----------------------------
+# ASGI middleware
+# ----------------------------
+class QueryProfilerMiddleware:
+    """
+    Profiles every HTTP request under "METHOD /route/{template}".
+    In development the per-request numbers are also sent as response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile, token = start_query_profile(f"{scope['method']} {scope['path']}")
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.ENV == "development":
+                headers = list(message.get("headers", []))
+                headers += [(k.lower().encode(), v.encode()) for k, v in profile.headers().items()]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            # Route template keeps the names bounded (no ids, no static file paths)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "<unrouted>"
+            finish_query_profile(profile, token, f"{scope['method']} {path}")
@@ -0,0 +1,73 @@
+# app/infrastructure/db/schema.py
+"""
+Idempotent schema upgrades applied after Base.metadata.create_all.
+
+create_all only creates missing tables, so columns and indexes added to
+existing tables are listed here as IF NOT EXISTS statements.
+"""
+from sqlalchemy import text
+
+from infrastructure.models import COMMENT_SEARCH_TSV, PROPOSAL_SEARCH_TSV
+
+SCHEMA_UPGRADES = [
+    # representative_selection.rank (1=gold, 2=silver, 3=bronze)
+    "ALTER TABLE representative_selection ADD COLUMN IF NOT EXISTS rank INTEGER DEFAULT 1",
+    # rounds.checkpoints: progress of an interrupted round close
+    "ALTER TABLE rounds ADD COLUMN IF NOT EXISTS checkpoints JSONB DEFAULT '{}'::jsonb",
+    # rounds.seed: group assignment seed, replayable
+    "ALTER TABLE rounds ADD COLUMN IF NOT EXISTS seed BIGINT",
+    # representative_votes: the unique constraint was never created, keep the
+    # latest vote per medal before enforcing it
+    """
+    DELETE FROM representative_votes a
+    USING representative_votes b
+    WHERE a.group_id = b.group_id
+      AND a.round_id = b.round_id
+      AND a.voter_user_id = b.voter_user_id
+      AND a.points = b.points
+      AND a.id < b.id
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS unique_vote_per_points
+    ON representative_votes (group_id, round_id, voter_user_id, points)
+    """,
+    # keyset card feed: (total_score DESC NULLS LAST, created_at DESC, id DESC)
+    """
+    CREATE INDEX IF NOT EXISTS ix_proposals_group_feed
+    ON proposals (group_id, total_score DESC NULLS LAST, created_at DESC, id DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_proposals_fractal_feed
+    ON proposals (fractal_id, total_score DESC NULLS LAST, created_at DESC, id DESC)
+    """,
+    # voting queue: one item per (user, group, item), head lookup on unconsumed items
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_queue_items_item
+    ON queue_items (user_id, group_id, item_type, item_id)
+    """,
+    # queue_items.position: explicit queue order (serial ids from INSERT ... SELECT
+    # ORDER BY are not guaranteed to follow it)
+    "ALTER TABLE queue_items ADD COLUMN IF NOT EXISTS position INTEGER NOT NULL DEFAULT 0",
+    "DROP INDEX IF EXISTS ix_queue_items_head",
+    """
+    CREATE INDEX IF NOT EXISTS ix_queue_items_next
+    ON queue_items (group_id, user_id, item_type, position, id) WHERE NOT consumed
+    """,
+    # full-text search: generated tsvectors (rewrites the tables once) + GIN
+    f"""
+    ALTER TABLE proposals ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS ({PROPOSAL_SEARCH_TSV}) STORED
+    """,
+    f"""
+    ALTER TABLE comments ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS ({COMMENT_SEARCH_TSV}) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_proposals_search ON proposals USING GIN (search_tsv)",
+    "CREATE INDEX IF NOT EXISTS ix_comments_search ON comments USING GIN (search_tsv)",
+]
+
+
+async def apply_schema_upgrades(conn) -> None:
+    """Run all upgrade statements on an open connection (inside engine.begin())."""
+    for stmt in SCHEMA_UPGRADES:
+        await conn.execute(text(stmt))
@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 from config.settings import settings
 from sqlalchemy import text 
+from infrastructure.db.query_profiler import install_query_profiler
 
 Base = declarative_base()
 
@@ -18,6 +19,7 @@ engine = create_async_engine(
     pool_size=10,            # ✅ Limit connections
     max_overflow=20
 )
+install_query_profiler(engine)
 
 # Async session factory
 AsyncSessionLocal = sessionmaker(
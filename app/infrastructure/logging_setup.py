@@ -0,0 +1,112 @@
+# infrastructure/logging_setup.py
+"""
+Structured, leveled, non-blocking logging.
+
+setup_logging() routes the root logger through a QueueHandler, so callers on
+the event loop only enqueue records; a QueueListener thread formats them and
+writes to stdout. Modules keep using logging.getLogger(__name__).
+
+    logger.info("Round closed", extra=kv(round_id=7, groups=12))
+    logger.debug("ws send ok", extra=sampled("ws_send", user_id=uid))
+
+kv() adds structured fields (key=value, or JSON keys with LOG_JSON).
+sampled() marks per-message events: only 1 in LOG_SAMPLE_EVERY per key is kept.
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from config.settings import settings
+
+_listener: Optional[QueueListener] = None
+
+
+def kv(**fields) -> Dict:
+    """extra= for structured fields."""
+    return {"fields": fields}
+
+
+def sampled(key: str, **fields) -> Dict:
+    """extra= for high-volume events, sampled per key."""
+    return {"fields": fields, "sample": key}
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps the 1st, (N+1)th, ... record per sample key; other records pass untouched."""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample", None)
+        if key is None or self.every == 1:
+            return True
+        n = self._seen.get(key, 0)
+        self._seen[key] = n + 1
+        if n % self.every:
+            return False
+        record.fields = {**getattr(record, "fields", {}), "sampled": f"1/{self.every}"}
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, as_json: bool = False):
+        super().__init__()
+        self.as_json = as_json
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+        fields = getattr(record, "fields", None) or {}
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        if self.as_json:
+            return json.dumps(
+                {"ts": ts, "level": record.levelname, "logger": record.name, "msg": message, **fields},
+                default=str,
+                ensure_ascii=False,
+            )
+        extras = " ".join(f"{k}={v}" for k, v in fields.items())
+        return f"{ts} {record.levelname:<7} {record.name}: {message}" + (f" | {extras}" if extras else "")
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge args here; the listener thread does the real formatting.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.msg = f"{record.msg}\n{record.exc_text}"
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> QueueListener:
+    """Idempotent: install the queue handler on the root logger and start the writer thread."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(StructuredFormatter(as_json=settings.LOG_JSON))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_EVERY))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,202 @@
+# infrastructure/metrics.py
+"""
+Lightweight in-process metrics registry rendered in the Prometheus text format
+(served at GET /metrics). No client library, no external service.
+
+    ROUNDS_CLOSED.inc(reason="scheduled")
+    with GROUP_SCORING_SECONDS.time():
+        ...
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 900)
+
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, LabelKey, float]]:
+        for key, value in self._values.items():
+            yield self.name, key, value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, function: Optional[Callable[[], float]] = None):
+        self.name, self.help = name, help
+        self._values: Dict[LabelKey, float] = {}
+        self._function = function  # evaluated at scrape time
+
+    def set(self, value: float, **labels) -> None:
+        self._values[_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[Tuple[str, LabelKey, float]]:
+        if self._function is not None:
+            yield self.name, (), self._function()
+        for key, value in self._values.items():
+            yield self.name, key, value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _key(labels)
+        counts = self._counts.setdefault(key, [0] * len(self.buckets))
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterable[Tuple[str, LabelKey, float]]:
+        for key, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", key + (("le", _fmt_value(bound)),), cumulative
+            yield f"{self.name}_sum", key, self._sums[key]
+            yield f"{self.name}_count", key, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """collector() yields ready-made exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_fmt_labels(key)} {_fmt_value(value)}")
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ----------------------------
+# Round lifecycle
+# ----------------------------
+POLL_TICK_SECONDS = REGISTRY.register(Histogram(
+    "fractal_poll_tick_seconds", "Duration of one check_fractals poll tick"))
+ROUNDS_CLOSED = REGISTRY.register(Counter(
+    "fractal_rounds_closed_total", "Rounds closed, by reason (scheduled, early, overdue, manual, resumed)"))
+ROUND_CLOSE_LAG_SECONDS = REGISTRY.register(Histogram(
+    "fractal_round_close_lag_seconds", "Time from scheduled round close to actual close", LAG_BUCKETS))
+ROUND_TIME_SAVED_SECONDS = REGISTRY.register(Histogram(
+    "fractal_round_time_saved_seconds", "Time left on the round clock when it closed early", LAG_BUCKETS))
+ROUND_CLOSE_SECONDS = REGISTRY.register(Histogram(
+    "fractal_round_close_seconds", "Duration of close_last_round, notifications excluded (sent in the background)"))
+ROUND_CLOSE_STAGE_SECONDS = REGISTRY.register(Histogram(
+    "fractal_round_close_stage_seconds", "close_last_round duration per stage (close, scoring, promote)"))
+GROUP_REBALANCE_MOVES = REGISTRY.register(Counter(
+    "fractal_group_rebalance_moves_total", "Round 0 members placed or moved between groups, by kind (late, active, inactive)"))
+GROUP_SCORING_SECONDS = REGISTRY.register(Histogram(
+    "fractal_group_scoring_seconds", "Proposal + comment scoring duration per group"))
+TREE_BUILD_SECONDS = REGISTRY.register(Histogram(
+    "fractal_tree_build_seconds", "build_fractal_tree duration"))
+
+# ----------------------------
+# Fan-out
+# ----------------------------
+TELEGRAM_SEND_SECONDS = REGISTRY.register(Histogram(
+    "fractal_telegram_send_seconds", "Latency of one Telegram send_message call"))
+TELEGRAM_SEND_ERRORS = REGISTRY.register(Counter(
+    "fractal_telegram_send_errors_total", "Failed Telegram sends, by error (retry_after, forbidden, other)"))
+WEBSOCKET_SENDS = REGISTRY.register(Counter(
+    "fractal_websocket_sends_total", "Websocket event sends, by result (ok, failed)"))
+SEND_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "fractal_send_queue_depth", "Messages waiting in the current fan-out, by channel"))
+
+
+def _websocket_clients() -> float:
+    from states import connected_clients
+    return sum(len(sockets) for sockets in connected_clients.values())
+
+
+WEBSOCKET_CLIENTS = REGISTRY.register(Gauge(
+    "fractal_websocket_clients", "Connected web app websockets", function=_websocket_clients))
+
+
+def _db_query_totals() -> Iterable[str]:
+    from infrastructure.db.query_profiler import iter_query_totals
+    rows = list(iter_query_totals())
+    yield "# HELP fractal_db_queries_total SQL queries per route / handler / poll tick"
+    yield "# TYPE fractal_db_queries_total counter"
+    for name, calls, queries, db_time in rows:
+        yield f"fractal_db_queries_total{_fmt_labels((('unit', name),))} {queries}"
+    yield "# HELP fractal_db_seconds_total DB time per route / handler / poll tick"
+    yield "# TYPE fractal_db_seconds_total counter"
+    for name, calls, queries, db_time in rows:
+        yield f"fractal_db_seconds_total{_fmt_labels((('unit', name),))} {_fmt_value(db_time)}"
+
+
+REGISTRY.add_collector(_db_query_totals)
@@ -1,9 +1,19 @@
 # app/infrastructure/models.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, UniqueConstraint, func, CheckConstraint, Float
-from sqlalchemy.orm import relationship, backref
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, DateTime, ForeignKey, JSON, UniqueConstraint, func, CheckConstraint, Float, Computed
+from sqlalchemy.orm import relationship, backref, deferred
 from datetime import datetime, timezone
 from infrastructure.db.session import Base
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+
+# Full-text search: text search config of the generated search_tsv columns.
+# 'simple' (no stemming, no stop words) because fractals are multilingual; it
+# is baked into the stored columns, so changing it needs a column rebuild.
+SEARCH_CONFIG = "simple"
+PROPOSAL_SEARCH_TSV = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(body, '')), 'B')"
+)
+COMMENT_SEARCH_TSV = f"to_tsvector('{SEARCH_CONFIG}', coalesce(text, ''))"
 
 
 # Queue
@@ -35,6 +45,9 @@ class QueueItem(Base):
 
     consumed = Column(Boolean, default=False, nullable=False)
 
+    # queue order within (group, user, item_type); explicit, ids are not ordered
+    position = Column(Integer, default=0, nullable=False)
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     user = relationship("User")
@@ -118,7 +131,9 @@ class Round(Base):
     level = Column(Integer, default=0)
     started_at = Column(DateTime(timezone=True), nullable=True)
     ended_at = Column(DateTime(timezone=True), nullable=True)
-    status = Column(String(50), default="open")
+    status = Column(String(50), default="open")  # open → vote → scoring → promoting → closed
+    checkpoints = Column(JSONB, default=dict)  # close progress: reps, scored groups, next_round_id; round 0: rebalanced
+    seed = Column(BigInteger, nullable=True)  # group assignment seed, see replay_round_groups
 """
     _fractal = relationship("Fractal", back_populates="_rounds")
     _groups = relationship("Group", back_populates="_round")
@@ -175,6 +190,7 @@ class Proposal(Base):
     created_at = Column(DateTime(timezone=True), default=func.now())
     score_per_level = Column(JSONB, default=list)
     total_score = Column(Float)
+    search_tsv = deferred(Column(TSVECTOR, Computed(PROPOSAL_SEARCH_TSV, persisted=True)))  # GIN indexed, see search_fractal_repo
 """
     _fractal = relationship("Fractal", back_populates="_proposals")
     _group = relationship("Group", back_populates="_proposals")
@@ -198,6 +214,7 @@ class Comment(Base):
     score_per_level = Column(JSONB, default=list)
     total_score = Column(Float)
     group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
+    search_tsv = deferred(Column(TSVECTOR, Computed(COMMENT_SEARCH_TSV, persisted=True)))  # GIN indexed, see search_fractal_repo
 
 """
     _proposal = relationship("Proposal", back_populates="_comments")
@@ -256,11 +273,14 @@ class RepresentativeVote(Base):
     candidate_user_id = Column(Integer, ForeignKey("users.id"), index=True)    
     created_at = Column(DateTime(timezone=True), default=func.now())
     points = Column(Integer, nullable=False)
-    
-    UniqueConstraint(
-        "group_id", "round_id", "voter_user_id", "points", 
-        name="unique_vote_per_points"
-    ),
+
+    # One gold, one silver and one bronze per voter and round
+    __table_args__ = (
+        UniqueConstraint(
+            "group_id", "round_id", "voter_user_id", "points",
+            name="unique_vote_per_points"
+        ),
+    )
 
 # ----------------------------
 # RepresentativeSelection
@@ -273,6 +293,7 @@ class RepresentativeSelection(Base):
     created_at = Column(DateTime(timezone=True), default=func.now())
     method = Column(String(80), default="vote")
     seed = Column(Integer, nullable=True)
+    rank = Column(Integer, default=1)  # 1=gold, 2=silver, 3=bronze
 
 """
     _group = relationship("Group", back_populates="_representative_selections")
@@ -24,6 +24,11 @@ from infrastructure.db.session import AsyncSessionLocal
 
 from sqlalchemy.ext.asyncio import create_async_engine
 from infrastructure.db.session import Base  # adjust import to your Base
+from infrastructure.db.schema import apply_schema_upgrades
+from infrastructure.db.query_profiler import QueryProfilerMiddleware
+from infrastructure.metrics import REGISTRY
+from infrastructure.logging_setup import setup_logging
+from fastapi.responses import PlainTextResponse
 
 
 DATABASE_ADMIN_URL = "postgresql://fractal_user:fractal_pass@db:5432/postgres"
@@ -51,6 +56,7 @@ async def create_tables():
     async with engine.begin() as conn:
         print("Creating all tables...")
         await conn.run_sync(Base.metadata.create_all)
+        await apply_schema_upgrades(conn)
     await engine.dispose()
     print("Tables created successfully.")
 
@@ -102,6 +108,9 @@ async def lifespan(app: FastAPI):
         print("✅ Bot shutdown complete.")
 
 
+# Queue-based structured logging before anything logs
+setup_logging()
+
 # Apply lifespan to your app
 app = FastAPI(lifespan=lifespan)
 
@@ -120,9 +129,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route query count / DB time (headers in development)
+app.add_middleware(QueryProfilerMiddleware)
+
 # include routers
 app.include_router(fractal_routers.router, prefix="/api/v1/fractals", tags=["fractals"])
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of the in-process registry."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/")
 async def index():
     """Health / basic info endpoint."""
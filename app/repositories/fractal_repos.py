@@ -3,14 +3,20 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete, func
+from sqlalchemy import update, delete, insert, func, text, any_, bindparam, or_, tuple_, union
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from infrastructure.models import (
     User, Fractal, FractalMember, Group, GroupMember, Proposal, Comment,
     ProposalVote, CommentVote, Round, RepresentativeSelection, RepresentativeVote, QueueItem, 
 )
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy import and_, select
+from repositories.read_models import (
+    ProposalCard, CommentRow, CommentKey, PROPOSAL_CARD_COLUMNS, COMMENT_ROW_COLUMNS,
+    comment_row_columns, proposal_cards, comment_rows,
+)
 from sqlalchemy.sql import exists
 from config.settings import settings
 
@@ -21,8 +27,13 @@ from services.fractal_service_tree import build_fractal_tree
 from datetime import datetime, timezone
 from typing import List, Dict
 from typing import Optional, Union
-from sqlalchemy import func, case, select, cast, Integer
+from sqlalchemy import func, case, select, cast, Integer, JSON, literal, literal_column
 from sqlalchemy import select, desc
+import json
+import logging
+from infrastructure.logging_setup import kv, sampled
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------
 # User
@@ -50,33 +61,60 @@ async def vote_representative_repo(
     """
     User has 3 distinct votes: Gold(3), Silver(2), Bronze(1).
     Replace existing vote for THIS POINTS LEVEL only.
+    Single INSERT ... ON CONFLICT against unique_vote_per_points.
     """
     if points not in (1, 2, 3):
         raise ValueError("Points must be 1, 2, or 3")
-    
-    # Delete ONLY existing vote with SAME POINTS (keep other ranks)
-    await db.execute(
-        delete(RepresentativeVote)
-        .where(
-            (RepresentativeVote.group_id == group_id) &
-            (RepresentativeVote.round_id == round_id) &
-            (RepresentativeVote.voter_user_id == voter_user_id) &
-            (RepresentativeVote.points == points)  # Replace same rank only
-        )
+
+    votes = await vote_representative_ballot_repo(
+        db, group_id, round_id, voter_user_id, {points: candidate_user_id}
     )
-    
-    # Add new vote
-    vote = RepresentativeVote(
-        group_id=group_id,
-        round_id=round_id,
-        voter_user_id=voter_user_id,
-        candidate_user_id=candidate_user_id,
-        points=points  # 3,2,1
+    return votes[0]
+
+
+async def vote_representative_ballot_repo(
+    db: AsyncSession,
+    group_id: int,
+    round_id: int,
+    voter_user_id: int,
+    ballot: Dict[int, int],  # {points: candidate_user_id}, points 3=gold, 2=silver, 1=bronze
+) -> List[RepresentativeVote]:
+    """
+    Upsert up to 3 medals for one voter in one atomic statement.
+    Medals not in the ballot are left unchanged.
+    """
+    if not ballot:
+        return []
+    if any(points not in (1, 2, 3) for points in ballot):
+        raise ValueError("Points must be 1, 2, or 3")
+
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(RepresentativeVote).values([
+        {
+            "group_id": group_id,
+            "round_id": round_id,
+            "voter_user_id": voter_user_id,
+            "candidate_user_id": candidate_user_id,
+            "points": points,
+            "created_at": now,
+        }
+        for points, candidate_user_id in sorted(ballot.items(), reverse=True)
+    ])
+    stmt = (
+        stmt.on_conflict_do_update(
+            index_elements=["group_id", "round_id", "voter_user_id", "points"],
+            set_={
+                "candidate_user_id": stmt.excluded.candidate_user_id,
+                "created_at": stmt.excluded.created_at,
+            },
+        )
+        .returning(RepresentativeVote)
+        .execution_options(populate_existing=True)
     )
-    db.add(vote)
+    result = await db.execute(stmt)
+    votes = result.scalars().all()
     await db.commit()
-    await db.refresh(vote)
-    return vote
+    return votes
 
 #async def select_representative_repo(db: AsyncSession, group_id: int):
 #    res = await db.execute(
@@ -154,6 +192,8 @@ async def create_round_repo(
     fractal_id: int,
     level: int = 0,
     status: str = "open",
+    seed: Optional[int] = None,
+    commit: bool = True,
 ) -> Round:
     """
     Create a new Round for a given Fractal.
@@ -163,6 +203,9 @@ async def create_round_repo(
         fractal_id (int): ID of the parent fractal.
         level (int, optional): Level of the round. Defaults to 0.
         status (str, optional): Status of the round. Defaults to "open".
+        seed (int, optional): Group assignment seed.
+        commit (bool, optional): Commit now; False only flushes (id assigned)
+            so the caller can commit the round with other writes.
 
     Returns:
         Round: The newly created Round object.
@@ -175,8 +218,12 @@ async def create_round_repo(
         level=level,
         status=status,
         started_at=started_at,
+        seed=seed,
     )
     db.add(round_obj)
+    if not commit:
+        await db.flush()
+        return round_obj
     await db.commit()
     await db.refresh(round_obj)
     return round_obj
@@ -191,22 +238,48 @@ async def set_round_status_repo(db, round_id: int, status: str):
     await db.refresh(round_obj)
     return round_obj
 
-async def close_last_round_repo(db: AsyncSession, fractal_id: int):
-    """Mark a round as closed and set the end timestamp, then return the round."""
-    round_obj = await get_last_round_repo(db, fractal_id)
-    RoundTree = models.RoundTree
-    stmt = (
+# Round close state machine: open → vote → scoring → promoting → closed.
+# Progress inside scoring/promoting is checkpointed in Round.checkpoints:
+#   {"reps": true, "scored": [group_id, ...], "next_round_id": id}
+CLOSING_STATES = ("scoring", "promoting")
+
+
+async def transition_round_repo(
+    db: AsyncSession,
+    round_id: int,
+    from_states: Tuple[str, ...],
+    to_state: str,
+    commit: bool = True,
+    **values,
+) -> Optional[Round]:
+    """
+    Compare-and-set the round status. Returns the updated round, or None when
+    the round is no longer in one of from_states (someone else moved it on).
+    """
+    result = await db.execute(
         update(Round)
-        .where(Round.id == round_obj.id)
-        .values(
-            ended_at=datetime.now(timezone.utc),
-            status="closed"
-        )
-        .returning(Round)  # RETURNING clause returns the updated row
+        .where(Round.id == round_id, Round.status.in_(from_states))
+        .values(status=to_state, **values)
+        .returning(Round)
+        .execution_options(populate_existing=True)
     )
-    result = await db.execute(stmt)
-    await db.commit()
-    closed_round = result.scalar_one()  # get the single updated Round object
+    round_obj = result.scalar_one_or_none()
+    if commit:
+        await db.commit()
+    return round_obj
+
+
+async def begin_round_close_repo(db: AsyncSession, round_id: int) -> Optional[Round]:
+    """
+    Voting ends: open/vote → scoring, set the end timestamp and store the round tree.
+    None if the round was already past voting.
+    """
+    RoundTree = models.RoundTree
+    closed_round = await transition_round_repo(
+        db, round_id, ("open", "vote"), "scoring", ended_at=datetime.now(timezone.utc)
+    )
+    if closed_round is None:
+        return None
 
     tree = await build_fractal_tree(db, fractal_id=closed_round.fractal_id, round_id=closed_round.id)
 
@@ -222,6 +295,47 @@ async def close_last_round_repo(db: AsyncSession, fractal_id: int):
     return closed_round
 
 
+async def checkpoint_round_repo(db: AsyncSession, round_id: int, commit: bool = True, **marks) -> None:
+    """Merge marks into Round.checkpoints in one atomic UPDATE."""
+    await db.execute(
+        text(
+            "UPDATE rounds SET checkpoints = COALESCE(checkpoints, '{}'::jsonb) || CAST(:marks AS text)::jsonb "
+            "WHERE id = :round_id"
+        ),
+        {"marks": json.dumps(marks), "round_id": round_id},
+    )
+    if commit:
+        await db.commit()
+
+
+async def checkpoint_group_scored_repo(db: AsyncSession, round_id: int, group_id: int) -> None:
+    """Append group_id to checkpoints.scored; safe from concurrent scoring sessions (row lock)."""
+    await db.execute(
+        text(
+            "UPDATE rounds SET checkpoints = jsonb_set("
+            "COALESCE(checkpoints, '{}'::jsonb), '{scored}', "
+            "COALESCE(checkpoints->'scored', '[]'::jsonb) || to_jsonb(CAST(:group_id AS integer))) "
+            "WHERE id = :round_id"
+        ),
+        {"group_id": group_id, "round_id": round_id},
+    )
+    await db.commit()
+
+
+async def discard_round_repo(db: AsyncSession, round_id: int) -> None:
+    """
+    Delete a round left behind by an interrupted promotion: its groups, members
+    and queues. Proposals never point at it, their moves commit together with
+    promoting → closed.
+    """
+    group_ids = select(Group.id).where(Group.round_id == round_id)
+    await db.execute(delete(QueueItem).where(QueueItem.group_id.in_(group_ids)))
+    await db.execute(delete(GroupMember).where(GroupMember.group_id.in_(group_ids)))
+    await db.execute(delete(Group).where(Group.round_id == round_id))
+    await db.execute(delete(Round).where(Round.id == round_id))
+    await db.commit()
+
+
 async def close_round_repo(db: AsyncSession, round_id: int):
     """Mark a round as closed and set the end timestamp, then return the round."""
     stmt = (
@@ -317,6 +431,156 @@ async def get_representatives_for_group_repo(
     return reps
 
 
+async def rank_representatives_for_round_repo(
+    db: AsyncSession,
+    round_id: int,
+) -> Dict[int, Dict[int, int]]:
+    """
+    Rank rep candidates for EVERY group of a round in one query.
+    Returns {group_id: {1: gold_user_id, 2: silver_user_id, 3: bronze_user_id}},
+    including members with 0 votes if necessary.
+    Same ordering as get_representatives_for_group_repo.
+    """
+    total_points = func.coalesce(func.sum(RepresentativeVote.points), 0).label("total_points")
+    vote_count = func.count(RepresentativeVote.id).label("vote_count")
+
+    # LEFT JOIN: include all group members of the round even if they have 0 votes
+    totals = (
+        select(
+            GroupMember.group_id.label("group_id"),
+            GroupMember.user_id.label("candidate_user_id"),
+            total_points,
+            vote_count,
+        )
+        .select_from(GroupMember)
+        .join(Group, Group.id == GroupMember.group_id)
+        .join(
+            RepresentativeVote,
+            (RepresentativeVote.candidate_user_id == GroupMember.user_id)
+            & (RepresentativeVote.group_id == GroupMember.group_id)
+            & (RepresentativeVote.round_id == round_id),
+            isouter=True,  # LEFT JOIN
+        )
+        .where(Group.round_id == round_id)
+        .group_by(GroupMember.group_id, GroupMember.user_id)
+        .subquery()
+    )
+
+    # Rank per group: total_points desc, vote_count desc, user_id desc
+    ranked = (
+        select(
+            totals.c.group_id,
+            totals.c.candidate_user_id,
+            func.row_number()
+            .over(
+                partition_by=totals.c.group_id,
+                order_by=(
+                    totals.c.total_points.desc(),
+                    totals.c.vote_count.desc(),
+                    totals.c.candidate_user_id.desc(),
+                ),
+            )
+            .label("rank"),
+        )
+        .subquery()
+    )
+
+    result = await db.execute(
+        select(ranked.c.group_id, ranked.c.candidate_user_id, ranked.c.rank)
+        .where(ranked.c.rank <= 3)
+        .order_by(ranked.c.group_id, ranked.c.rank)
+    )
+
+    reps: Dict[int, Dict[int, int]] = {}
+    for group_id, candidate_user_id, rank in result.all():
+        reps.setdefault(group_id, {})[rank] = candidate_user_id
+    return reps
+
+
+async def save_representatives_for_round_repo(
+    db: AsyncSession,
+    round_id: int,
+) -> Dict[int, Dict[int, int]]:
+    """
+    Rank reps for all groups of a round and store the winners in
+    RepresentativeSelection (one row per group and medal).
+    Replaces earlier selections for the round, so it is safe to call again.
+    """
+    reps = await rank_representatives_for_round_repo(db, round_id)
+
+    group_ids = select(Group.id).where(Group.round_id == round_id)
+    await db.execute(
+        delete(RepresentativeSelection)
+        .where(RepresentativeSelection.group_id.in_(group_ids))
+    )
+
+    rows = [
+        {
+            "group_id": group_id,
+            "representative_user_id": user_id,
+            "rank": rank,
+            "method": "vote",
+        }
+        for group_id, ranks in reps.items()
+        for rank, user_id in ranks.items()
+    ]
+    if rows:
+        await db.execute(insert(RepresentativeSelection), rows)
+    await db.commit()
+    return reps
+
+
+async def get_representatives_for_round_repo(
+    db: AsyncSession,
+    round_id: int,
+) -> Dict[int, Dict[int, int]]:
+    """Stored winners for a round: {group_id: {rank: user_id}} (empty if not stored yet)."""
+    result = await db.execute(
+        select(
+            RepresentativeSelection.group_id,
+            RepresentativeSelection.rank,
+            RepresentativeSelection.representative_user_id,
+        )
+        .join(Group, Group.id == RepresentativeSelection.group_id)
+        .where(Group.round_id == round_id)
+        .order_by(RepresentativeSelection.group_id, RepresentativeSelection.rank)
+    )
+    reps: Dict[int, Dict[int, int]] = {}
+    for group_id, rank, user_id in result.all():
+        reps.setdefault(group_id, {})[rank or 1] = user_id
+    return reps
+
+
+async def get_or_build_representatives_for_round_repo(
+    db: AsyncSession,
+    round_id: int,
+) -> Dict[int, Dict[int, int]]:
+    """
+    Look up stored winners for a round; rounds closed without a stored
+    selection (e.g. force-closed as overdue) are ranked and stored on demand.
+    """
+    reps = await get_representatives_for_round_repo(db, round_id)
+    if reps:
+        return reps
+    return await save_representatives_for_round_repo(db, round_id)
+
+
+async def get_stored_representatives_for_group_repo(
+    db: AsyncSession,
+    group_id: int,
+) -> Dict[int, int]:
+    """Stored winners for one group: {1: gold_user_id, 2: silver_user_id, 3: bronze_user_id}."""
+    result = await db.execute(
+        select(
+            RepresentativeSelection.rank,
+            RepresentativeSelection.representative_user_id,
+        )
+        .where(RepresentativeSelection.group_id == group_id)
+        .order_by(RepresentativeSelection.rank)
+    )
+    return {rank or 1: user_id for rank, user_id in result.all()}
+
+
 # ----------------------------
 # Group
 # ----------------------------
@@ -338,6 +602,54 @@ async def get_groups_for_round_repo(db: AsyncSession, round_id: int):
     result = await db.execute(select(Group).where(Group.round_id == round_id))
     return result.scalars().all()
 
+
+async def get_comember_history_repo(
+    db: AsyncSession, user_ids: List[int], fractals: int, fractal_id: int, round_id: int
+) -> Dict[int, set]:
+    """
+    Who sat with whom among user_ids, in the last `fractals` fractals up to
+    fractal_id and in rounds before round_id, so a round's history (and its
+    groups) can be replayed later. Symmetric: {user_id: {co-member ids}}.
+    The ids go in as one array parameter, so 100k members stay a single statement.
+    """
+    if not user_ids or fractals <= 0:
+        return {}
+    ids = bindparam("user_ids", list(user_ids), type_=ARRAY(Integer))
+    recent = (
+        select(Fractal.id).where(Fractal.id <= fractal_id)
+        .order_by(Fractal.id.desc()).limit(fractals).scalar_subquery()
+    )
+    a, b = aliased(GroupMember), aliased(GroupMember)
+    result = await db.execute(
+        select(a.user_id, b.user_id)
+        .join(b, and_(b.group_id == a.group_id, b.user_id != a.user_id))
+        .join(Group, Group.id == a.group_id)
+        .where(
+            Group.fractal_id.in_(recent),
+            Group.round_id < round_id,
+            a.user_id == any_(ids),
+            b.user_id == any_(ids),
+        )
+        .distinct()
+    )
+    history: Dict[int, set] = {}
+    for uid, other in result.all():
+        history.setdefault(uid, set()).add(other)
+    return history
+
+
+async def get_grouping_attrs_repo(
+    db: AsyncSession, user_ids: List[int], keys: List[str]
+) -> Dict[int, Tuple]:
+    """{user_id: (prefs[key], ...)} for users with at least one of the keys set."""
+    if not user_ids or not keys:
+        return {}
+    ids = bindparam("user_ids", list(user_ids), type_=ARRAY(Integer))
+    result = await db.execute(
+        select(User.id, *[User.prefs[k].astext for k in keys]).where(User.id == any_(ids))
+    )
+    return {row[0]: tuple(row[1:]) for row in result.all() if any(v is not None for v in row[1:])}
+
 # ----------------------------
 # Proposal
 # ----------------------------
@@ -357,6 +669,20 @@ async def get_proposals_for_group_repo(db: AsyncSession, group_id: int) -> List[
     result = await db.execute(select(Proposal).where(Proposal.group_id == group_id))
     return result.scalars().all()
 
+async def get_round_proposals_repo(db: AsyncSession, round_id: int) -> Dict[int, List[Proposal]]:
+    """{group_id: [proposal, ...] best first} for every group of a round, in one query."""
+    result = await db.execute(
+        select(Proposal)
+        .join(Group, Group.id == Proposal.group_id)
+        .where(Group.round_id == round_id)
+        .order_by(Proposal.group_id, Proposal.total_score.desc().nulls_last(), Proposal.created_at, Proposal.id)
+    )
+    proposals: Dict[int, List[Proposal]] = {}
+    for p in result.scalars().all():
+        proposals.setdefault(p.group_id, []).append(p)
+    return proposals
+
+
 async def get_top_proposals_repo(db: AsyncSession, group_id: int, top_count: int) -> List[Proposal]:
     stmt = (
         select(Proposal)
@@ -536,41 +862,477 @@ async def vote_comment_repo(db: AsyncSession, comment_id: int, voter_user_id: in
 # ----------------------------
 # Pending Proposals/Comments for a user
 # ----------------------------
-async def get_pending_proposals_repo(db: AsyncSession, user_id: int) -> List[Proposal]:
-    # proposals where user has not voted yet
+async def get_pending_proposals_repo(db: AsyncSession, user_id: int, group_id: int) -> List[Proposal]:
+    # proposals of the group the user has not voted on yet
     subq = select(ProposalVote.proposal_id).where(ProposalVote.voter_user_id == user_id)
-    result = await db.execute(select(Proposal).where(~Proposal.id.in_(subq)))
+    result = await db.execute(select(Proposal).where(Proposal.group_id == group_id, ~Proposal.id.in_(subq)))
+    return result.scalars().all()
+
+async def get_pending_comments_repo(db: AsyncSession, user_id: int, group_id: int) -> List[Comment]:
+    # comments of the group the user has not voted on yet
+    subq = select(CommentVote.comment_id).where(CommentVote.voter_user_id == user_id)
+    result = await db.execute(select(Comment).where(Comment.group_id == group_id, ~Comment.id.in_(subq)))
+    return result.scalars().all()
+
+
+# ----------------------------
+# Voting queue (QueueItem)
+# ----------------------------
+# Per-user "next card" queue, materialized when a round's content is known and
+# topped up when proposals/comments are added. Items are consumed on vote.
+QUEUE_PROPOSAL = 0
+QUEUE_COMMENT = 1
+
+_QUEUE_COLUMNS = ["group_id", "user_id", "item_type", "item_id", "consumed", "position", "created_at"]
+
+
+def _queue_position(item_type: int, *order_by):
+    """
+    Position of each selected item: after the member's current tail for
+    item_type, in order_by order. Ties from concurrent top-ups fall back to id.
+    """
+    queued = aliased(QueueItem)
+    tail = (
+        select(func.coalesce(func.max(queued.position), 0))
+        .where(
+            queued.group_id == GroupMember.group_id,
+            queued.user_id == GroupMember.user_id,
+            queued.item_type == item_type,
+        )
+        .scalar_subquery()
+    )
+    return tail + func.row_number().over(
+        partition_by=(GroupMember.group_id, GroupMember.user_id), order_by=order_by,
+    )
+
+
+def _enqueue_proposals_stmt(
+    group_ids: Optional[List[int]] = None,
+    user_id: Optional[int] = None,
+    proposal_id: Optional[int] = None,
+):
+    """INSERT ... SELECT of every (member, proposal) pair the member still has to vote on."""
+    from sqlalchemy import false, literal
+
+    voted = exists().where(
+        ProposalVote.proposal_id == Proposal.id,
+        ProposalVote.voter_user_id == GroupMember.user_id,
+    )
+    stmt = (
+        select(
+            GroupMember.group_id, GroupMember.user_id, literal(QUEUE_PROPOSAL),
+            Proposal.id, false(),
+            # highest total score first, then oldest first
+            _queue_position(QUEUE_PROPOSAL, desc(Proposal.total_score).nullslast(), Proposal.created_at.asc(), Proposal.id),
+            func.now(),
+        )
+        .join(Proposal, Proposal.group_id == GroupMember.group_id)
+        .where(Proposal.creator_user_id != GroupMember.user_id, ~voted)
+    )
+    if group_ids is not None:
+        stmt = stmt.where(GroupMember.group_id.in_(group_ids))
+    if user_id is not None:
+        stmt = stmt.where(GroupMember.user_id == user_id)
+    if proposal_id is not None:
+        stmt = stmt.where(Proposal.id == proposal_id)
+    return pg_insert(QueueItem).from_select(_QUEUE_COLUMNS, stmt).on_conflict_do_nothing()
+
+
+def _enqueue_comments_stmt(
+    group_ids: Optional[List[int]] = None,
+    user_id: Optional[int] = None,
+    comment_id: Optional[int] = None,
+):
+    """INSERT ... SELECT of every (member, comment of this group) pair not voted yet."""
+    from sqlalchemy import false, literal
+
+    voted = exists().where(
+        CommentVote.comment_id == Comment.id,
+        CommentVote.voter_user_id == GroupMember.user_id,
+    )
+    stmt = (
+        select(
+            GroupMember.group_id, GroupMember.user_id, literal(QUEUE_COMMENT),
+            Comment.id, false(),
+            _queue_position(QUEUE_COMMENT, Comment.created_at.asc(), Comment.id),
+            func.now(),
+        )
+        .join(Comment, Comment.group_id == GroupMember.group_id)
+        .join(Proposal, and_(Proposal.id == Comment.proposal_id, Proposal.group_id == GroupMember.group_id))
+        .where(Comment.user_id != GroupMember.user_id, ~voted)
+    )
+    if group_ids is not None:
+        stmt = stmt.where(GroupMember.group_id.in_(group_ids))
+    if user_id is not None:
+        stmt = stmt.where(GroupMember.user_id == user_id)
+    if comment_id is not None:
+        stmt = stmt.where(Comment.id == comment_id)
+    return pg_insert(QueueItem).from_select(_QUEUE_COLUMNS, stmt).on_conflict_do_nothing()
+
+
+async def build_voting_queue_repo(db: AsyncSession, group_ids: List[int], user_id: Optional[int] = None) -> None:
+    """Queue everything still to vote on in these groups (optionally for one user). Idempotent."""
+    if not group_ids:
+        return
+    await db.execute(_enqueue_proposals_stmt(group_ids, user_id))
+    await db.execute(_enqueue_comments_stmt(group_ids, user_id))
+    await db.commit()
+
+
+async def enqueue_proposal_repo(db: AsyncSession, proposal_id: int) -> None:
+    """Top-up: a new proposal goes to the back of the proposal part of every member's queue."""
+    await db.execute(_enqueue_proposals_stmt(proposal_id=proposal_id))
+    await db.commit()
+
+
+async def enqueue_comment_repo(db: AsyncSession, comment_id: int) -> None:
+    """Top-up: a new comment goes to the back of every group member's queue."""
+    await db.execute(_enqueue_comments_stmt(comment_id=comment_id))
+    await db.commit()
+
+
+async def next_queue_item_repo(db: AsyncSession, group_id: int, user_id: int) -> Optional[Tuple[int, int]]:
+    """(item_type, item_id) at the head of the user's queue: proposals first, then comments."""
+    result = await db.execute(
+        select(QueueItem.item_type, QueueItem.item_id)
+        .where(
+            QueueItem.group_id == group_id,
+            QueueItem.user_id == user_id,
+            QueueItem.consumed.is_(False),
+        )
+        .order_by(QueueItem.item_type, QueueItem.position, QueueItem.id)
+        .limit(1)
+    )
+    row = result.first()
+    return (row.item_type, row.item_id) if row else None
+
+
+async def has_unqueued_votes_repo(db: AsyncSession, group_id: int, user_id: int) -> bool:
+    """
+    True if the member still has a proposal or comment to vote on in this group
+    that is not in their queue: the queue was never built, or content from
+    before it existed (rounds running at deploy) or a missed top-up is absent.
+    """
+    def queued(item_type: int, item_id):
+        return exists().where(
+            QueueItem.group_id == group_id,
+            QueueItem.user_id == user_id,
+            QueueItem.item_type == item_type,
+            QueueItem.item_id == item_id,
+        )
+
+    member = exists().where(GroupMember.group_id == group_id, GroupMember.user_id == user_id)
+    proposals = (
+        select(Proposal.id)
+        .where(
+            Proposal.group_id == group_id,
+            Proposal.creator_user_id != user_id,
+            ~exists().where(ProposalVote.proposal_id == Proposal.id, ProposalVote.voter_user_id == user_id),
+            ~queued(QUEUE_PROPOSAL, Proposal.id),
+        )
+    )
+    comments = (
+        select(Comment.id)
+        .join(Proposal, and_(Proposal.id == Comment.proposal_id, Proposal.group_id == group_id))
+        .where(
+            Comment.group_id == group_id,
+            Comment.user_id != user_id,
+            ~exists().where(CommentVote.comment_id == Comment.id, CommentVote.voter_user_id == user_id),
+            ~queued(QUEUE_COMMENT, Comment.id),
+        )
+    )
+    result = await db.execute(select(and_(member, or_(proposals.exists(), comments.exists()))))
+    return bool(result.scalar())
+
+
+async def consume_queue_item_repo(db: AsyncSession, user_id: int, item_type: int, item_id: int) -> int:
+    """Pop an item once the user has voted on it. Returns the number of items consumed (0 on a re-vote)."""
+    result = await db.execute(
+        update(QueueItem)
+        .where(
+            QueueItem.user_id == user_id,
+            QueueItem.item_type == item_type,
+            QueueItem.item_id == item_id,
+            QueueItem.consumed.is_(False),
+        )
+        .values(consumed=True)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def clear_voting_queue_repo(db: AsyncSession, group_ids: List[int]) -> None:
+    """Drop the queues of closed groups."""
+    if not group_ids:
+        return
+    await db.execute(delete(QueueItem).where(QueueItem.group_id.in_(group_ids)))
+    await db.commit()
+
+
+async def get_voting_progress_repo(db: AsyncSession, group_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Raw completion counts per group, from the voting queue and the rep votes:
+    member_ids, remaining (unvoted items per member), medals (set of points
+    given per member), proposals, items_total, items_consumed.
+    """
+    out = {
+        gid: {"member_ids": [], "remaining": {}, "medals": {}, "proposals": 0, "items_total": 0, "items_consumed": 0}
+        for gid in group_ids
+    }
+    if not group_ids:
+        return out
+
+    members = await db.execute(
+        select(GroupMember.group_id, GroupMember.user_id).where(GroupMember.group_id.in_(group_ids))
+    )
+    for gid, uid in members.all():
+        out[gid]["member_ids"].append(uid)
+
+    queue = await db.execute(
+        select(
+            QueueItem.group_id,
+            QueueItem.user_id,
+            func.count(),
+            func.count().filter(QueueItem.consumed.is_(True)),
+        )
+        .where(QueueItem.group_id.in_(group_ids))
+        .group_by(QueueItem.group_id, QueueItem.user_id)
+    )
+    for gid, uid, total, consumed in queue.all():
+        out[gid]["remaining"][uid] = total - consumed
+        out[gid]["items_total"] += total
+        out[gid]["items_consumed"] += consumed
+
+    medals = await db.execute(
+        select(RepresentativeVote.group_id, RepresentativeVote.voter_user_id, func.array_agg(func.distinct(RepresentativeVote.points)))
+        .where(RepresentativeVote.group_id.in_(group_ids))
+        .group_by(RepresentativeVote.group_id, RepresentativeVote.voter_user_id)
+    )
+    for gid, uid, points in medals.all():
+        out[gid]["medals"][uid] = set(points)
+
+    proposals = await db.execute(
+        select(Proposal.group_id, func.count())
+        .where(Proposal.group_id.in_(group_ids))
+        .group_by(Proposal.group_id)
+    )
+    for gid, count in proposals.all():
+        out[gid]["proposals"] = count
+
+    return out
+
+
+def _json_object(type_=None, **fields):
+    """json_build_object with constant keys rendered inline (no untyped bind parameters)."""
+    args = []
+    for key, value in fields.items():
+        args += [literal_column(f"'{key}'"), value]
+    return func.json_build_object(*args, type_=type_ or JSON)
+
+
+async def get_dashboard_state_repo(db: AsyncSession, telegram_id: str, fractal_id: Optional[int] = None) -> Optional[Dict]:
+    """
+    Everything the web app needs on open, in one round trip: a chain of CTEs
+    (user → fractal → last round → the user's group in it → members, queue
+    counts, rep votes, proposals, selected reps) folded into one row of JSON.
+
+    fractal_id defaults to the user's active fractal. Returns None for an
+    unknown Telegram user; fractal / round / group keys are None when missing.
+    Values: user {id, username, active_fractal_id}, fractal {id, name, description, start_date,
+    status, round_time}, round {id, level, status, started_at}, group_id,
+    members [{user_id, username}], queue [{user_id, item_type, total, consumed}],
+    rep_votes [{voter_user_id, candidate_user_id, points}], proposals,
+    reps [{user_id, rank}].
+    """
+    empty = literal_column("'[]'::json", JSON)
+
+    def agg(cte, **fields):
+        """JSON array of one object per row of cte ([] when empty)."""
+        return select(func.coalesce(func.json_agg(_json_object(**fields)), empty)).select_from(cte).scalar_subquery()
+
+    u = (
+        select(User.id, User.username, User.active_fractal_id)
+        .where(User.telegram_id == str(telegram_id))
+        .limit(1)
+        .cte("u")
+    )
+    f = (
+        select(Fractal.id, Fractal.name, Fractal.description, Fractal.start_date, Fractal.status, Fractal.meta)
+        .where(Fractal.id == func.coalesce(literal(fractal_id or None, Integer), select(u.c.active_fractal_id).scalar_subquery()))
+        .cte("f")
+    )
+    r = (
+        select(Round.id, Round.level, Round.status, Round.started_at)
+        .join(f, Round.fractal_id == f.c.id)
+        .order_by(desc(Round.level))
+        .limit(1)
+        .cte("r")
+    )
+    g = (
+        select(Group.id.label("group_id"))
+        .join(r, Group.round_id == r.c.id)
+        .join(GroupMember, GroupMember.group_id == Group.id)
+        .join(u, GroupMember.user_id == u.c.id)
+        .limit(1)
+        .cte("g")
+    )
+    members = (
+        select(GroupMember.user_id, User.username)
+        .join(g, GroupMember.group_id == g.c.group_id)
+        .join(User, User.id == GroupMember.user_id)
+        .cte("members")
+    )
+    queue = (
+        select(
+            QueueItem.user_id, QueueItem.item_type,
+            func.count().label("total"),
+            func.count().filter(QueueItem.consumed.is_(True)).label("consumed"),
+        )
+        .join(g, QueueItem.group_id == g.c.group_id)
+        .group_by(QueueItem.user_id, QueueItem.item_type)
+        .cte("queue")
+    )
+    rep_votes = (
+        select(RepresentativeVote.voter_user_id, RepresentativeVote.candidate_user_id, RepresentativeVote.points)
+        .join(g, RepresentativeVote.group_id == g.c.group_id)
+        .join(r, RepresentativeVote.round_id == r.c.id)
+        .cte("rep_votes")
+    )
+    reps = (
+        select(RepresentativeSelection.representative_user_id, RepresentativeSelection.rank)
+        .join(g, RepresentativeSelection.group_id == g.c.group_id)
+        .cte("reps")
+    )
+
+    stmt = select(
+        select(_json_object(id=u.c.id, username=u.c.username, active_fractal_id=u.c.active_fractal_id))
+        .scalar_subquery().label("user"),
+        select(_json_object(
+            id=f.c.id, name=f.c.name, description=f.c.description, start_date=f.c.start_date,
+            status=f.c.status, round_time=f.c.meta["round_time"],
+        )).scalar_subquery().label("fractal"),
+        select(_json_object(id=r.c.id, level=r.c.level, status=r.c.status, started_at=r.c.started_at))
+        .scalar_subquery().label("round"),
+        select(g.c.group_id).scalar_subquery().label("group_id"),
+        agg(members, user_id=members.c.user_id, username=members.c.username).label("members"),
+        agg(
+            queue, user_id=queue.c.user_id, item_type=queue.c.item_type,
+            total=queue.c.total, consumed=queue.c.consumed,
+        ).label("queue"),
+        agg(
+            rep_votes, voter_user_id=rep_votes.c.voter_user_id,
+            candidate_user_id=rep_votes.c.candidate_user_id, points=rep_votes.c.points,
+        ).label("rep_votes"),
+        select(func.count()).select_from(Proposal).join(g, Proposal.group_id == g.c.group_id)
+        .scalar_subquery().label("proposals"),
+        agg(reps, user_id=reps.c.representative_user_id, rank=reps.c.rank).label("reps"),
+    )
+
+    row = (await db.execute(stmt)).mappings().one()
+    if row["user"] is None:
+        return None
+    return dict(row)
+
+
+async def get_group_members_repo(db: AsyncSession, group_id: int) -> List[GroupMember]:
+    """
+    Returns a list of GroupMember objects for the given group_id.
+    """
+    result = await db.execute(
+        select(GroupMember).where(GroupMember.group_id == group_id)
+    )
     return result.scalars().all()
 
-async def get_pending_comments_repo(db: AsyncSession, user_id: int) -> List[Comment]:
-    subq = select(CommentVote.comment_id).where(CommentVote.voter_user_id == user_id)
-    result = await db.execute(select(Comment).where(~Comment.id.in_(subq)))
-    return result.scalars().all()
+
+async def get_round_memberships_repo(db: AsyncSession, round_id: int) -> Dict[int, List[int]]:
+    """{group_id: [user_id, ...]} for every group of a round, in one query."""
+    result = await db.execute(
+        select(GroupMember.group_id, GroupMember.user_id)
+        .join(Group, Group.id == GroupMember.group_id)
+        .where(Group.round_id == round_id)
+    )
+    members: Dict[int, List[int]] = {}
+    for group_id, user_id in result.all():
+        members.setdefault(group_id, []).append(user_id)
+    return members
 
 
-async def get_group_members_repo(db: AsyncSession, group_id: int) -> List[GroupMember]:
+async def get_round_activity_repo(db: AsyncSession, round_id: int) -> Tuple[set, set]:
     """
-    Returns a list of GroupMember objects for the given group_id.
+    (active, authors) in a round: authors wrote a proposal or comment there,
+    active users also include everyone who voted on its cards or reps.
     """
+    round_groups = select(Group.id).where(Group.round_id == round_id)
+    authors_q = union(
+        select(Proposal.creator_user_id).where(Proposal.group_id.in_(round_groups)),
+        select(Comment.user_id).where(Comment.group_id.in_(round_groups)),
+    )
+    voters_q = union(
+        select(ProposalVote.voter_user_id)
+        .join(Proposal, Proposal.id == ProposalVote.proposal_id)
+        .where(Proposal.group_id.in_(round_groups)),
+        select(CommentVote.voter_user_id)
+        .join(Comment, Comment.id == CommentVote.comment_id)
+        .where(Comment.group_id.in_(round_groups)),
+        select(RepresentativeVote.voter_user_id).where(RepresentativeVote.round_id == round_id),
+    )
+    authors = set((await db.execute(authors_q)).scalars().all())
+    voters = set((await db.execute(voters_q)).scalars().all())
+    return authors | voters, authors
+
+
+async def get_unassigned_members_repo(db: AsyncSession, fractal_id: int, round_id: int) -> List[int]:
+    """Active fractal members without a group in the round (late joiners)."""
+    in_round = (
+        select(GroupMember.user_id)
+        .join(Group, Group.id == GroupMember.group_id)
+        .where(Group.round_id == round_id)
+    )
     result = await db.execute(
-        select(GroupMember).where(GroupMember.group_id == group_id)
+        select(FractalMember.user_id).where(
+            FractalMember.fractal_id == fractal_id,
+            FractalMember.left_at.is_(None),
+            FractalMember.user_id.not_in(in_round),
+        )
     )
     return result.scalars().all()
 
 
-# app/repositories/representative_vote_repo.py
-async def save_rep_vote_repo(db: AsyncSession, group_id: int, round_id: int, voter_id: int, candidate_id: int, points: int):
-    vote = RepresentativeVote(
-        group_id=group_id,
-        round_id=round_id,
-        voter_user_id=voter_id,
-        candidate_user_id=candidate_id,
-        points=points
+async def move_group_members_repo(
+    db: AsyncSession, round_id: int, moves: List[Tuple[int, Optional[int], int]]
+) -> None:
+    """
+    Apply (user_id, from_group_id | None, to_group_id) moves in one transaction.
+    A moved member leaves their old group's voting queue and rep ballots (cast
+    and received); card votes they already cast stay with the cards.
+    """
+    old = [(uid, src) for uid, src, _ in moves if src is not None]
+    if old:
+        await db.execute(
+            delete(GroupMember).where(tuple_(GroupMember.user_id, GroupMember.group_id).in_(old))
+        )
+        await db.execute(
+            delete(QueueItem).where(tuple_(QueueItem.user_id, QueueItem.group_id).in_(old))
+        )
+        await db.execute(
+            delete(RepresentativeVote).where(
+                RepresentativeVote.round_id == round_id,
+                or_(
+                    tuple_(RepresentativeVote.voter_user_id, RepresentativeVote.group_id).in_(old),
+                    tuple_(RepresentativeVote.candidate_user_id, RepresentativeVote.group_id).in_(old),
+                ),
+            )
+        )
+    await db.execute(
+        insert(GroupMember),
+        [{"group_id": dst, "user_id": uid} for uid, _, dst in moves],
     )
-    db.add(vote)
     await db.commit()
-    await db.refresh(vote)
-    return vote
+
+
+# app/repositories/representative_vote_repo.py
+async def save_rep_vote_repo(db: AsyncSession, group_id: int, round_id: int, voter_id: int, candidate_id: int, points: int):
+    return await vote_representative_repo(db, group_id, round_id, voter_id, candidate_id, points)
 
 async def get_rep_votes_for_round_repo(db: AsyncSession, group_id: int):
     result = await db.execute(
@@ -697,6 +1459,44 @@ async def get_votes_for_comment_repo(db: AsyncSession, comment_id: int) -> List[
     )
     return result.scalars().all()
 
+async def count_votes_for_proposal_repo(db: AsyncSession, proposal_id: int) -> int:
+    """Number of members who voted on a proposal."""
+    result = await db.execute(
+        select(func.count(ProposalVote.id)).where(ProposalVote.proposal_id == proposal_id)
+    )
+    return result.scalar_one()
+
+
+async def count_votes_for_comment_repo(db: AsyncSession, comment_id: int) -> int:
+    """Number of members who voted on a comment."""
+    result = await db.execute(
+        select(func.count(CommentVote.id)).where(CommentVote.comment_id == comment_id)
+    )
+    return result.scalar_one()
+
+
+async def get_group_telegram_ids_repo(db: AsyncSession, group_id: int) -> List[str]:
+    """Telegram ids of all group members in one query."""
+    result = await db.execute(
+        select(User.telegram_id)
+        .join(GroupMember, GroupMember.user_id == User.id)
+        .where(GroupMember.group_id == group_id)
+        .where(User.telegram_id.isnot(None))
+    )
+    return list(result.scalars().all())
+
+async def get_users_telegram_ids_repo(db: AsyncSession, user_ids) -> List[str]:
+    """Telegram ids of the given users in one query (users without one are skipped)."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    result = await db.execute(
+        select(User.telegram_id)
+        .where(User.id.in_(user_ids))
+        .where(User.telegram_id.isnot(None))
+    )
+    return list(result.scalars().all())
+
 # ----------------------------
 # Helpers
 # ----------------------------
@@ -748,6 +1548,17 @@ async def get_waiting_fractals_repo(db, now: datetime):
 
     return fractals
 
+async def get_closing_rounds_repo(db: AsyncSession):
+    """Rounds whose close was interrupted (scoring/promoting), oldest first."""
+    result = await db.execute(
+        select(Round)
+        .where(Round.status.in_(CLOSING_STATES))
+        .order_by(Round.started_at.asc())
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
 async def get_open_rounds_repo(db: AsyncSession):
     """
     Return all rounds with status='open'.
@@ -803,7 +1614,7 @@ async def close_fractal_repo(db, fractal_id: int):
     """
     Set a fractal from 'open' to 'closed'.
     """
-    print("Closing Fractal")
+    logger.info("Closing fractal", extra=kv(fractal_id=fractal_id))
     fractal = await db.get(Fractal, fractal_id)
     if not fractal:
         return None
@@ -879,6 +1690,16 @@ async def get_last_group_repo(db: AsyncSession, fractal_id: int) -> Round | None
     return result.scalars().one_or_none()
 
 
+async def get_round_by_level_repo(db: AsyncSession, fractal_id: int, level: int) -> Round | None:
+    result = await db.execute(
+        select(Round)
+        .where(Round.fractal_id == fractal_id, Round.level == level)
+        .order_by(desc(Round.id))
+        .limit(1)
+    )
+    return result.scalars().one_or_none()
+
+
 async def get_last_round_repo(db: AsyncSession, fractal_id: int) -> Round | None:
     result = await db.execute(
         select(Round)
@@ -889,6 +1710,36 @@ async def get_last_round_repo(db: AsyncSession, fractal_id: int) -> Round | None
     return result.scalars().one_or_none()
 
 
+async def get_group_scope_repo(db: AsyncSession, group_id: int) -> Optional[Tuple[int, int, int]]:
+    """(group_id, round_id, fractal_id) for a group, or None."""
+    result = await db.execute(
+        select(Group.id, Group.round_id, Group.fractal_id).where(Group.id == group_id)
+    )
+    row = result.first()
+    return tuple(row) if row else None
+
+
+async def get_proposal_scope_repo(db: AsyncSession, proposal_id: int) -> Optional[Tuple[int, int, int]]:
+    """(group_id, round_id, fractal_id) a proposal currently belongs to, or None."""
+    result = await db.execute(
+        select(Proposal.group_id, Proposal.round_id, Proposal.fractal_id)
+        .where(Proposal.id == proposal_id)
+    )
+    row = result.first()
+    return tuple(row) if row else None
+
+
+async def get_comment_scope_repo(db: AsyncSession, comment_id: int) -> Optional[Tuple[int, int, int]]:
+    """(group_id, round_id, fractal_id) of the group a comment was written in, or None."""
+    result = await db.execute(
+        select(Group.id, Group.round_id, Group.fractal_id)
+        .join(Comment, Comment.group_id == Group.id)
+        .where(Comment.id == comment_id)
+    )
+    row = result.first()
+    return tuple(row) if row else None
+
+
 async def get_group_repo(db: AsyncSession, group_id: int) -> Group | None:
     result = await db.execute(
         select(Group).where(Group.id == group_id)
@@ -1022,46 +1873,32 @@ async def get_next_card_repo(
     group_id: int,
     current_user_id: int
 ) -> Optional[Dict]:
-    Proposal = models.Proposal
-    Comment = models.Comment
-    ProposalVote = models.ProposalVote
-    CommentVote = models.CommentVote
-
-    # --- 1) Proposals WITHOUT votes from current_user, not created by current_user
-
-    proposal = await get_next_proposal_to_vote_repo(db, group_id, current_user_id)
-
-    if proposal:
-        return await _enrich_proposal_with_comments_repo(db, proposal, current_user_id)
-
-    # --- 2) Comments WITHOUT votes from current_user, not created by current_user
+    """
+    Next card from the user's voting queue: unvoted proposals first, then
+    unvoted comments. Live queues are kept current by the top-ups; when the
+    queue runs dry while unvoted content is missing from it (never built, or
+    rounds already running at deploy), the missing items are queued here.
+    """
+    item = await next_queue_item_repo(db, group_id, current_user_id)
+    if item is None and await has_unqueued_votes_repo(db, group_id, current_user_id):
+        await build_voting_queue_repo(db, [group_id], user_id=current_user_id)
+        item = await next_queue_item_repo(db, group_id, current_user_id)
+    if item is None:
+        return None
 
-    comment_vote_exists = exists().where(
-        and_(
-            CommentVote.comment_id == Comment.id,
-            CommentVote.voter_user_id == current_user_id,
-        )
-    ).correlate(Comment)
+    item_type, item_id = item
+    if item_type == QUEUE_PROPOSAL:
+        proposal = await get_proposal_card_repo(db, item_id)
+        return await _enrich_proposal_with_comments_repo(db, proposal, current_user_id) if proposal else None
 
-    comment_stmt = (
-        select(Comment)
-        .join(Proposal, Comment.proposal_id == Proposal.id)
-        .where(
-            Proposal.group_id == group_id,
-            Comment.group_id == group_id,
-            Comment.user_id != current_user_id,
-            ~comment_vote_exists,  # Now boolean!
-        )
-        .order_by(Comment.created_at.asc())
-        .limit(1)
-    )
-    comment_result = await db.execute(comment_stmt)
-    comment = comment_result.scalars().first()
+    rows = comment_rows((await db.execute(select(*COMMENT_ROW_COLUMNS).where(Comment.id == item_id))).all())
+    return await _enrich_comment_with_proposal_repo(db, rows[0], current_user_id) if rows else None
 
-    if comment:
-        return await _enrich_comment_with_proposal_repo(db, comment, current_user_id)
 
-    return None
+async def get_proposal_card_repo(db: AsyncSession, proposal_id: int) -> Optional[ProposalCard]:
+    """Read model of one proposal for card hydration (no ORM entity)."""
+    rows = proposal_cards((await db.execute(select(*PROPOSAL_CARD_COLUMNS).where(Proposal.id == proposal_id))).all())
+    return rows[0] if rows else None
 
 
 import asyncio
@@ -1079,15 +1916,7 @@ async def get_all_cards_repo(
     from sqlalchemy import func
     Proposal = models.Proposal
 
-    # Count total proposals in fractal
-    count_stmt = (
-        select(func.count(Proposal.id))
-        .where(Proposal.fractal_id == fractal_id)
-    )
-    count_result = await db.execute(count_stmt)
-    total_count = count_result.scalar()
-
-    print(f"Total proposals in fractal {fractal_id}: {total_count}")
+    logger.debug("get_all_cards", extra=sampled("get_all_cards", fractal_id=fractal_id, group_id=group_id))
 
     if (group_id == -1):
         group = await get_last_group_repo(db, fractal_id)
@@ -1096,7 +1925,7 @@ async def get_all_cards_repo(
 
     if(group_id == -2):
         prop_stmt = (
-            select(Proposal)
+            select(*PROPOSAL_CARD_COLUMNS)
             .where(Proposal.fractal_id == fractal_id)
             .order_by(
                 desc(Proposal.total_score).nullslast(),  # highest total_score first
@@ -1105,7 +1934,7 @@ async def get_all_cards_repo(
         )
     else:
         prop_stmt = (
-            select(Proposal)
+            select(*PROPOSAL_CARD_COLUMNS)
             .where(Proposal.group_id == group_id)
             .order_by(
                 desc(Proposal.total_score).nullslast(),  # highest total_score first
@@ -1113,14 +1942,19 @@ async def get_all_cards_repo(
             )
         )
     prop_result = await db.execute(prop_stmt)
-    proposals = prop_result.scalars().all()
+    proposals = proposal_cards(prop_result.all())
 
     if not proposals:
         return None
 
+    # ✅ Comment windows for all cards in one query
+    windows = await get_comment_windows_repo(db, [p.id for p in proposals], settings.COMMENT_WINDOW_SIZE)
+
     # ✅ Process all proposals in parallel
     proposals_data = await asyncio.gather(*[
-        _enrich_proposal_with_comments_repo(db, proposal, current_user_id)
+        _enrich_proposal_with_comments_repo(
+            db, proposal, current_user_id, windows.get(proposal.id, ([], None))
+        )
         for proposal in proposals
     ])
     
@@ -1129,6 +1963,166 @@ async def get_all_cards_repo(
     
     return proposals_data if proposals_data else None
 
+
+async def get_cards_page_repo(
+    db: AsyncSession,
+    group_id: int,
+    fractal_id: int = -1,
+    after: Optional[Tuple[Optional[float], Optional[datetime], int]] = None,
+    limit: int = 20,
+) -> Tuple[List[Proposal], bool]:
+    """
+    One keyset page of proposals ordered like get_all_cards_repo
+    (total_score DESC NULLS LAST, created_at DESC, id DESC).
+
+    after is the (total_score, created_at, id) of the last card already shown.
+    Returns (proposals, has_more); proposals are ProposalCard read models, not hydrated.
+    """
+    from sqlalchemy import or_, tuple_
+
+    if group_id == -1:
+        group = await get_last_group_repo(db, fractal_id)
+        if not group:
+            return [], False
+        group_id = group.id
+
+    stmt = select(*PROPOSAL_CARD_COLUMNS)
+    if group_id == -2:
+        stmt = stmt.where(Proposal.fractal_id == fractal_id)
+    else:
+        stmt = stmt.where(Proposal.group_id == group_id)
+
+    if after is not None:
+        score, created_at, proposal_id = after
+        older = tuple_(Proposal.created_at, Proposal.id) < tuple_(created_at, proposal_id)
+        if score is None:
+            # Already in the NULL-score tail
+            stmt = stmt.where(Proposal.total_score.is_(None), older)
+        else:
+            stmt = stmt.where(or_(
+                Proposal.total_score < score,
+                Proposal.total_score.is_(None),
+                and_(Proposal.total_score == score, older),
+            ))
+
+    stmt = stmt.order_by(
+        desc(Proposal.total_score).nullslast(),
+        desc(Proposal.created_at),
+        desc(Proposal.id),
+    ).limit(limit + 1)
+
+    proposals = proposal_cards((await db.execute(stmt)).all())
+    return proposals[:limit], len(proposals) > limit
+
+
+# Full-text search. Headline markers are control characters so the service can
+# escape the user text first and turn them into <mark> afterwards.
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+_HEADLINE_OPTIONS = f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, MaxFragments=2, MinWords=8, MaxWords=24"
+_TITLE_HEADLINE_OPTIONS = f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, HighlightAll=true"
+SEARCH_KINDS = ("proposal", "comment")
+
+
+async def search_fractal_repo(
+    db: AsyncSession,
+    fractal_id: int,
+    query: str,
+    after: Optional[Tuple[float, str, int]] = None,
+    limit: int = 20,
+    kinds: Tuple[str, ...] = SEARCH_KINDS,
+) -> Tuple[List[Dict], bool]:
+    """
+    One keyset page of full-text hits over a fractal's proposals (title, body)
+    and comments, best first: (rank DESC, kind DESC, id DESC).
+
+    query uses web search syntax ("a phrase", -word, or). Matching and ranking
+    go through the GIN indexed search_tsv columns; ts_headline, the expensive
+    part, only runs for the page. after is the (rank, kind, id) of the last hit
+    already shown. Returns (hits, has_more); hits are dicts with kind, id, rank,
+    proposal_id, group_id, round_id, title, total_score, title_headline and
+    headline (marked with HEADLINE_START / HEADLINE_STOP).
+    """
+    from sqlalchemy import literal_column, union_all
+    from sqlalchemy.dialects.postgresql import REGCONFIG
+
+    config = cast(models.SEARCH_CONFIG, REGCONFIG)
+    tsq = func.websearch_to_tsquery(config, query)
+
+    parts = []
+    if "proposal" in kinds:
+        parts.append(
+            select(
+                literal_column("'proposal'").label("kind"),
+                Proposal.id.label("id"),
+                cast(func.ts_rank_cd(Proposal.search_tsv, tsq, 1), Float).label("rank"),
+            )
+            .where(Proposal.fractal_id == fractal_id, Proposal.search_tsv.op("@@")(tsq))
+        )
+    if "comment" in kinds:
+        parts.append(
+            select(
+                literal_column("'comment'").label("kind"),
+                Comment.id.label("id"),
+                cast(func.ts_rank_cd(Comment.search_tsv, tsq, 1), Float).label("rank"),
+            )
+            .join(Proposal, Proposal.id == Comment.proposal_id)
+            .where(Proposal.fractal_id == fractal_id, Comment.search_tsv.op("@@")(tsq))
+        )
+    if not parts:
+        return [], False
+
+    hits = union_all(*parts).subquery("hits")
+    stmt = select(hits.c.kind, hits.c.id, hits.c.rank)
+    if after is not None:
+        stmt = stmt.where(tuple_(hits.c.rank, hits.c.kind, hits.c.id) < tuple_(*after))
+    stmt = stmt.order_by(hits.c.rank.desc(), hits.c.kind.desc(), hits.c.id.desc()).limit(limit + 1)
+    page = (await db.execute(stmt)).all()
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    title_headline = func.ts_headline(config, Proposal.title, tsq, _TITLE_HEADLINE_OPTIONS).label("title_headline")
+    rows: Dict[Tuple[str, int], Dict] = {}
+    proposal_ids = [h.id for h in page if h.kind == "proposal"]
+    if proposal_ids:
+        result = await db.execute(
+            select(
+                Proposal.id, Proposal.id.label("proposal_id"), Proposal.group_id, Proposal.round_id,
+                Proposal.title, Proposal.total_score, title_headline,
+                func.ts_headline(config, func.coalesce(Proposal.body, ""), tsq, _HEADLINE_OPTIONS).label("headline"),
+            )
+            .where(Proposal.id.in_(proposal_ids))
+        )
+        rows.update((("proposal", r["id"]), dict(r)) for r in result.mappings())
+    comment_ids = [h.id for h in page if h.kind == "comment"]
+    if comment_ids:
+        result = await db.execute(
+            select(
+                Comment.id, Comment.proposal_id, Comment.group_id, Proposal.round_id,
+                Proposal.title, Comment.total_score, title_headline,
+                func.ts_headline(config, Comment.text, tsq, _HEADLINE_OPTIONS).label("headline"),
+            )
+            .join(Proposal, Proposal.id == Comment.proposal_id)
+            .where(Comment.id.in_(comment_ids))
+        )
+        rows.update((("comment", r["id"]), dict(r)) for r in result.mappings())
+
+    return [
+        {**rows[(h.kind, h.id)], "kind": h.kind, "rank": h.rank}
+        for h in page
+        if (h.kind, h.id) in rows
+    ], has_more
+
+
+async def hydrate_card_repo(
+    db: AsyncSession,
+    proposal: ProposalCard,
+    current_user_id: int,
+    window: Optional[Tuple[List[CommentRow], Optional[CommentKey]]] = None,
+) -> Optional[Dict]:
+    """Card dict for one proposal, as rendered by proposal_card.html."""
+    return await _enrich_proposal_with_comments_repo(db, proposal, current_user_id, window)
+
 from typing import Optional, Tuple
 import re
 
@@ -1151,15 +2145,16 @@ async def get_winning_proposal_telegram_repo(
         return None, None
 
     stmt = (
-        select(Proposal)
+        select(*PROPOSAL_CARD_COLUMNS)
         .where(Proposal.group_id == group.id)
         .order_by(
             desc(Proposal.total_score).nullslast(),
             desc(Proposal.created_at),
         )
+        .limit(1)
     )
     result = await db.execute(stmt)
-    proposal = result.scalars().first()
+    proposal = next(iter(proposal_cards(result.all())), None)
     if not proposal:
         return None, None
 
@@ -1234,83 +2229,196 @@ async def get_winning_proposal_telegram_repo(
 
 
 
+def _comment_order(is_current_group, comments=Comment):
+    """Window order: current group first, then total_score, then oldest first."""
+    return (
+        desc(is_current_group),
+        desc(comments.total_score).nullslast(),
+        asc(comments.created_at),
+        asc(comments.id),
+    )
+
+
+def _comment_key(comment: CommentRow, group_id: Optional[int]) -> CommentKey:
+    return 1 if comment.group_id == group_id else 0, comment.total_score, comment.created_at, comment.id
+
+
+async def get_comment_windows_repo(
+    db: AsyncSession,
+    proposal_ids: List[int],
+    k: int,
+) -> Dict[int, Tuple[List[CommentRow], Optional[CommentKey]]]:
+    """
+    Top k comments of every proposal in one query (LATERAL ... LIMIT k+1).
+    Returns {proposal_id: (comments, after)}: after is the sort key of the
+    last comment shown, None when nothing is left.
+    """
+    from sqlalchemy import true
+
+    if not proposal_ids:
+        return {}
+
+    p = select(Proposal.id, Proposal.group_id).where(Proposal.id.in_(proposal_ids)).subquery("p")
+    is_current_group = case((Comment.group_id == p.c.group_id, 1), else_=0)
+    window = (
+        select(*COMMENT_ROW_COLUMNS)
+        .where(Comment.proposal_id == p.c.id)
+        .order_by(*_comment_order(is_current_group))
+        .limit(k + 1)
+        .lateral("w")
+    )
+    stmt = (
+        select(p.c.id.label("card_id"), p.c.group_id.label("card_group_id"), *comment_row_columns(window))
+        .select_from(p)
+        .join(window, true())
+        .order_by(p.c.id, *_comment_order(case((window.c.group_id == p.c.group_id, 1), else_=0), window.c))
+    )
+
+    rows: Dict[int, Tuple[Optional[int], List[CommentRow]]] = {}
+    for row in (await db.execute(stmt)).all():
+        rows.setdefault(row[0], (row[1], []))[1].append(CommentRow(*row[2:]))
+
+    windows = {}
+    for proposal_id, (group_id, comments) in rows.items():
+        after = _comment_key(comments[k - 1], group_id) if len(comments) > k else None
+        windows[proposal_id] = (comments[:k], after)
+    return windows
+
+
+async def get_comments_page_repo(
+    db: AsyncSession,
+    proposal_id: int,
+    after: Optional[CommentKey],
+    limit: int = 20,
+) -> Tuple[List[CommentRow], Optional[CommentKey], Optional[int]]:
+    """
+    Comments after a window sort key, in window order.
+    Returns (comments, key of the last one when more follow, proposal_group_id).
+    """
+    from sqlalchemy import or_, tuple_
+
+    group_id = (await db.execute(select(Proposal.group_id).where(Proposal.id == proposal_id))).scalar()
+    is_current_group = case((Comment.group_id == group_id, 1), else_=0)
+
+    stmt = select(*COMMENT_ROW_COLUMNS).where(Comment.proposal_id == proposal_id)
+    if after is not None:
+        current, score, created_at, comment_id = after
+        newer = tuple_(Comment.created_at, Comment.id) > tuple_(created_at, comment_id)
+        if score is None:
+            same_group = and_(Comment.total_score.is_(None), newer)
+        else:
+            same_group = or_(
+                Comment.total_score < score,
+                Comment.total_score.is_(None),
+                and_(Comment.total_score == score, newer),
+            )
+        stmt = stmt.where(or_(is_current_group < current, and_(is_current_group == current, same_group)))
+
+    stmt = stmt.order_by(*_comment_order(is_current_group)).limit(limit + 1)
+    comments = comment_rows((await db.execute(stmt)).all())
+
+    next_after = _comment_key(comments[limit - 1], group_id) if len(comments) > limit else None
+    return comments[:limit], next_after, group_id
+
+
+async def comment_cards_repo(
+    db: AsyncSession,
+    comments: List[CommentRow],
+    group_id: Optional[int],
+    current_user_id: int,
+) -> List[Dict]:
+    """Comment dicts for proposal_card.html; authors and the viewer's votes in one query each."""
+    User = models.User
+    CommentVote = models.CommentVote
+
+    if not comments:
+        return []
+
+    author_ids = {c.user_id for c in comments}
+    usernames = dict((await db.execute(select(User.id, User.username).where(User.id.in_(author_ids)))).all())
+    votes = dict((await db.execute(
+        select(CommentVote.comment_id, CommentVote.vote)
+        .where(CommentVote.comment_id.in_([c.id for c in comments]))
+        .where(CommentVote.voter_user_id == current_user_id)
+    )).all())
+
+    template_comments = []
+    for comment in comments:
+        # take away users own vote and comments from other groups
+        if comment.user_id == current_user_id or group_id != comment.group_id:
+            vote = -1
+        else:
+            vote = votes.get(comment.id) or 0
+
+        template_comments.append({
+            "id": comment.id,
+            "message": comment.text,
+            "username": usernames.get(comment.user_id) or "",
+            "user_id": comment.user_id,
+            "avatar": f"/static/img/64_{(comment.user_id or 0) % 16 + 1}.png",
+            "date": comment.created_at.strftime("%Y-%m-%d %H:%M") if comment.created_at else "just now",
+            "vote": vote,
+            "text": comment.text,
+            "total_score": comment.total_score,
+            "group_id": comment.group_id,
+        })
+
+    # Votable comments first, then by score
+    template_comments.sort(key=lambda c: (
+        c["vote"] == -1,
+        -(c.get("total_score") or 0),
+        c["vote"]
+    ))
+    return template_comments
+
+
 async def _enrich_proposal_with_comments_repo(
-    db: AsyncSession, 
-    proposal: Proposal, 
+    db: AsyncSession,
+    proposal: ProposalCard,
     current_user_id: int,
+    window: Optional[Tuple[List[CommentRow], Optional[CommentKey]]] = None,
+    include_comment: Optional[CommentRow] = None,
 ) -> Dict:
-    """Enrich proposal to match proposal_card.html template exactly."""
+    """
+    Enrich proposal to match proposal_card.html template exactly.
+
+    Only the top COMMENT_WINDOW_SIZE comments are loaded (window, when prefetched
+    for a page of cards by get_comment_windows_repo); the rest come from
+    /get_comments after comments_after, which the service layer turns into the
+    card's comments_cursor. include_comment is kept in the window
+    even when it ranks lower (the comment a next-card asks to vote on).
+    """
     User = models.User
     ProposalVote = models.ProposalVote
-    CommentVote = models.CommentVote
-    
+
     # Proposal creator info (for 'user' in template)
-    creator_result = await db.execute(select(User).where(User.id == proposal.creator_user_id))
-    creator = creator_result.scalars().first()
+    creator_result = await db.execute(select(User.id, User.username).where(User.id == proposal.creator_user_id))
+    creator = creator_result.first()
 
     # take away users own vote
     if (proposal.creator_user_id == current_user_id):
         proposal_vote = -1
     else:
-        # Comment vote
         vote_result = await db.execute(
-            select(ProposalVote)
+            select(ProposalVote.score)
             .where(ProposalVote.proposal_id == proposal.id)
             .where(ProposalVote.voter_user_id == current_user_id)
         )
-        vote_record = vote_result.scalars().first()
-        proposal_vote = vote_record.score if vote_record else 0
+        proposal_vote = vote_result.scalar() or 0
 
-    # ALL comments (matching template structure)
-    group = await get_group_repo(db, proposal.group_id)
-    all_comments = await get_comments_for_proposal_repo(db, proposal.id, group.id, group.level)
-    template_comments = []
+    if window is None:
+        windows = await get_comment_windows_repo(db, [proposal.id], settings.COMMENT_WINDOW_SIZE)
+        window = windows.get(proposal.id, ([], None))
+    comments, comments_after = window
 
-    for comment in all_comments:
-        # Get comment author
-        author_result = await db.execute(select(User).where(User.id == comment.user_id))
-        author = author_result.scalars().first()
+    if include_comment is not None and all(c.id != include_comment.id for c in comments):
+        comments = [*comments, include_comment]
+
+    template_comments = await comment_cards_repo(db, comments, proposal.group_id, current_user_id)
 
-        # Comment vote
-        # take away users own vote and comments from other groups
-        if (comment.user_id == current_user_id or group.id != comment.group_id ):
-            vote = -1
-        else:        
-            vote_result = await db.execute(
-                select(CommentVote)
-                .where(CommentVote.comment_id == comment.id)
-                .where(CommentVote.voter_user_id == current_user_id)
-            )
-            vote_record = vote_result.scalars().first()
-            vote = vote_record.vote if vote_record else 0
-        # ADD THIS: Build and append comment structure
-        
-        comment_card = {
-            "id": comment.id,
-            "message": comment.text,
-            "username": author.username,
-            "user_id": author.id,
-            "avatar": f"/static/img/64_{(author.id) % 16 + 1}.png",
-            "date": comment.created_at.strftime("%Y-%m-%d %H:%M"),
-            "vote": vote,
-            "text": comment.text,
-            "total_score": comment.total_score,
-            "group_id": comment.group_id,
-            # Add other template fields
-        }
-        template_comments.append(comment_card)
-        # Sort so vote -1 comments appear last
-        #template_comments.sort(key=lambda c: (c["vote"] == -1, c["vote"]))
-
-        template_comments.sort(key=lambda c: (
-            c["vote"] == -1,
-            -(c.get("total_score") or 0),
-            c["vote"]
-        ))
-    
     # ✅ EXACT TEMPLATE STRUCTURE
     card = {
-        "username" : creator.username,        
+        "username" : creator.username,
         "id": proposal.id,
         "user_id": creator.id,
         "avatar": f"/static/img/64_{(creator.id) % 16 + 1}.png",
@@ -1318,30 +2426,30 @@ async def _enrich_proposal_with_comments_repo(
         "message": proposal.body or "",  # ✅ Template uses 'message'
         "date": proposal.created_at.strftime("%Y-%m-%d %H:%M") if proposal.created_at else "just now",
         "tags": proposal.meta.get("tags", []),  # ✅ Template expects 'tags'
+        "merged": proposal.meta.get("merged_from", []),  # ✅ Near duplicates folded in at promotion
         "vote": proposal_vote,  # ✅ Template score pill
         "total_score": proposal.total_score,
-        "comments": template_comments  # ✅ Full comments array
+        "comments": template_comments,  # ✅ Top comments window
+        "comments_after": comments_after,  # ✅ "Load more" sort key, None when complete
     }
-    
+
     return card
 
 async def _enrich_comment_with_proposal_repo(
     db: AsyncSession, 
-    comment: Comment, 
+    comment: CommentRow, 
     current_user_id: int,
 ) -> Dict:
     """Comment card - wraps proposal context to match template."""
-    Proposal = models.Proposal
-    User = models.User
-    CommentVote = models.CommentVote
-    ProposalVote = models.ProposalVote
-    
     # Get parent proposal
-    prop_result = await db.execute(select(Proposal).where(Proposal.id == comment.proposal_id))
-    proposal = prop_result.scalars().first()
+    proposal = await get_proposal_card_repo(db, comment.proposal_id)
+    if proposal is None:
+        return None
     
-    # Use proposal enrichment (reuses template logic)
-    proposal_card = await _enrich_proposal_with_comments_repo(db, proposal, current_user_id)
+    # Use proposal enrichment (reuses template logic), keep the comment to vote on in the window
+    proposal_card = await _enrich_proposal_with_comments_repo(
+        db, proposal, current_user_id, include_comment=comment
+    )
     
 
     return proposal_card
@@ -1407,6 +2515,37 @@ async def get_votes_for_group_proposals_repo(db: AsyncSession, group_id: int):
     return result.scalars().all()
 
 
+def group_proposal_votes_stmt(group_id: int):
+    """(voter_user_id, proposal_id, score) of a group's proposal votes, by voter; for stream_rows_repo."""
+    return (
+        select(ProposalVote.voter_user_id, ProposalVote.proposal_id, ProposalVote.score)
+        .join(Proposal, ProposalVote.proposal_id == Proposal.id)
+        .where(Proposal.group_id == group_id)
+        .order_by(ProposalVote.voter_user_id, ProposalVote.proposal_id)
+    )
+
+
+def group_comment_votes_stmt(group_id: int):
+    """(voter_user_id, comment_id, vote) of the votes on a group's comments, by voter; for stream_rows_repo."""
+    return (
+        select(CommentVote.voter_user_id, CommentVote.comment_id, CommentVote.vote)
+        .join(Comment, CommentVote.comment_id == Comment.id)
+        .join(Proposal, Comment.proposal_id == Proposal.id)
+        .where(Proposal.group_id == group_id)
+        .order_by(CommentVote.voter_user_id, CommentVote.comment_id)
+    )
+
+
+def fractal_telegram_ids_stmt(fractal_id: int):
+    """(user_id, telegram_id) of a fractal's members with a Telegram account; for keyset_batches_repo."""
+    return (
+        select(User.id, User.telegram_id)
+        .join(FractalMember, FractalMember.user_id == User.id)
+        .where(FractalMember.fractal_id == fractal_id, User.telegram_id.isnot(None))
+        .distinct()
+    )
+
+
 async def get_votes_for_group_comments_repo(db: AsyncSession, group_id: int):
     """
     Fetch all comment votes for all comments belonging to proposals in a group.
@@ -1422,3 +2561,101 @@ async def get_votes_for_group_comments_repo(db: AsyncSession, group_id: int):
         .where(Proposal.group_id == group_id)
     )
     return result.scalars().all()
+
+
+# ----------------------------
+# Export
+# ----------------------------
+def _ts(column):
+    """Timestamp as text, formatted by Postgres: much cheaper than isoformat per row."""
+    from sqlalchemy import String
+    return cast(column, String).label(column.key)
+
+
+def export_statements_repo(fractal_id: int) -> Dict[str, Any]:
+    """
+    {table: select} for a fractal's full results: proposals with score_per_level,
+    comments, proposal / comment / representative votes and the representative
+    chain (each selection with the group the rep sat in one level up). Column
+    names are the select's labels; rows are ordered by primary key.
+    """
+    Creator = aliased(User)
+    NextGroup = aliased(Group)
+    next_group_id = (
+        select(GroupMember.group_id)
+        .join(NextGroup, NextGroup.id == GroupMember.group_id)
+        .where(
+            GroupMember.user_id == RepresentativeSelection.representative_user_id,
+            NextGroup.fractal_id == Group.fractal_id,
+            NextGroup.level == Group.level + 1,
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    return {
+        "proposals": (
+            select(
+                Proposal.id, Proposal.round_id, Proposal.group_id, Proposal.creator_user_id,
+                Creator.username.label("creator_username"), Proposal.title, Proposal.body,
+                Proposal.total_score, Proposal.score_per_level,
+                Proposal.meta["merged_into"].astext.label("merged_into"), _ts(Proposal.created_at),
+            )
+            .outerjoin(Creator, Creator.id == Proposal.creator_user_id)
+            .where(Proposal.fractal_id == fractal_id)
+            .order_by(Proposal.id)
+        ),
+        "comments": (
+            select(
+                Comment.id, Comment.proposal_id, Comment.parent_comment_id, Comment.group_id, Comment.user_id,
+                Creator.username, Comment.text, Comment.total_score, Comment.score_per_level, _ts(Comment.created_at),
+            )
+            .join(Proposal, Proposal.id == Comment.proposal_id)
+            .outerjoin(Creator, Creator.id == Comment.user_id)
+            .where(Proposal.fractal_id == fractal_id)
+            .order_by(Comment.id)
+        ),
+        "proposal_votes": (
+            select(
+                ProposalVote.id, ProposalVote.proposal_id, ProposalVote.voter_user_id, ProposalVote.score,
+                _ts(ProposalVote.created_at),
+            )
+            .join(Proposal, Proposal.id == ProposalVote.proposal_id)
+            .where(Proposal.fractal_id == fractal_id)
+            .order_by(ProposalVote.id)
+        ),
+        "comment_votes": (
+            select(
+                CommentVote.id, CommentVote.comment_id, CommentVote.voter_user_id, CommentVote.vote,
+                _ts(CommentVote.created_at),
+            )
+            .join(Comment, Comment.id == CommentVote.comment_id)
+            .join(Proposal, Proposal.id == Comment.proposal_id)
+            .where(Proposal.fractal_id == fractal_id)
+            .order_by(CommentVote.id)
+        ),
+        "representative_votes": (
+            select(
+                RepresentativeVote.id, RepresentativeVote.round_id, RepresentativeVote.group_id,
+                RepresentativeVote.voter_user_id, RepresentativeVote.candidate_user_id, RepresentativeVote.points,
+                _ts(RepresentativeVote.created_at),
+            )
+            .join(Group, Group.id == RepresentativeVote.group_id)
+            .where(Group.fractal_id == fractal_id)
+            .order_by(RepresentativeVote.id)
+        ),
+        "representatives": (
+            select(
+                RepresentativeSelection.id, Round.level, Group.round_id, RepresentativeSelection.group_id,
+                RepresentativeSelection.representative_user_id.label("user_id"), Creator.username,
+                RepresentativeSelection.rank, RepresentativeSelection.method,
+                next_group_id.label("next_group_id"),
+                _ts(RepresentativeSelection.created_at),
+            )
+            .join(Group, Group.id == RepresentativeSelection.group_id)
+            .join(Round, Round.id == Group.round_id)
+            .outerjoin(Creator, Creator.id == RepresentativeSelection.representative_user_id)
+            .where(Group.fractal_id == fractal_id)
+            .order_by(RepresentativeSelection.id)
+        ),
+    }
+
@@ -0,0 +1,86 @@
+# app/repositories/read_models.py
+"""
+Read models: compact __slots__ records filled from column-only selects, for
+the read-only hot paths (card hydration, comment windows).
+
+They skip the session identity map, change tracking and the parse of whole
+JSONB columns: a card only needs two keys of Proposal.meta and never
+score_per_level. Field names match the ORM models, so code reading
+proposal.title or comment.group_id accepts either. Writes keep using the
+ORM entities.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from infrastructure.models import Comment, Proposal
+
+# Proposal.meta keys a card shows
+CARD_META_KEYS = ("tags", "merged_from")
+
+
+@dataclass(frozen=True, slots=True)
+class ProposalCard:
+    id: int
+    fractal_id: Optional[int]
+    group_id: Optional[int]
+    round_id: Optional[int]
+    creator_user_id: Optional[int]
+    title: str
+    body: Optional[str]
+    total_score: Optional[float]
+    created_at: Optional[datetime]
+    meta: dict  # only CARD_META_KEYS that are set
+
+
+def _card_meta(meta):
+    pairs = []
+    for key in CARD_META_KEYS:
+        pairs += [literal_column(f"'{key}'"), meta[key]]
+    return func.jsonb_strip_nulls(func.jsonb_build_object(*pairs), type_=JSONB)
+
+
+PROPOSAL_CARD_COLUMNS = (
+    Proposal.id, Proposal.fractal_id, Proposal.group_id, Proposal.round_id, Proposal.creator_user_id,
+    Proposal.title, Proposal.body, Proposal.total_score, Proposal.created_at,
+    _card_meta(Proposal.meta).label("meta"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CommentRow:
+    id: int
+    proposal_id: Optional[int]
+    parent_comment_id: Optional[int]
+    user_id: Optional[int]
+    group_id: int
+    text: str
+    total_score: Optional[float]
+    created_at: Optional[datetime]
+
+
+# Window order of a comment: (in the card's group, total_score, created_at, id)
+CommentKey = Tuple[int, Optional[float], Optional[datetime], int]
+
+
+def comment_row_columns(comments=Comment) -> tuple:
+    """CommentRow columns of Comment, or of an aliased / lateral comment selectable."""
+    c = getattr(comments, "c", comments)
+    return (
+        c.id, c.proposal_id, c.parent_comment_id, c.user_id, c.group_id,
+        c.text, c.total_score, c.created_at,
+    )
+
+
+COMMENT_ROW_COLUMNS = comment_row_columns()
+
+
+def proposal_cards(rows: Iterable) -> List[ProposalCard]:
+    return [ProposalCard(*row) for row in rows]
+
+
+def comment_rows(rows: Iterable) -> List[CommentRow]:
+    return [CommentRow(*row) for row in rows]
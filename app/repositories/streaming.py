@@ -0,0 +1,77 @@
+# app/repositories/streaming.py
+"""
+Streaming query layer: async iterators over plain row tuples instead of
+materialized lists of ORM objects, so peak memory follows the batch size,
+not the table size.
+
+  stream_batches_repo  lists of rows from a server-side cursor
+                       (stream_results + yield_per). For consumers that keep
+                       up with the database: scoring, exports, tree builds.
+  stream_rows_repo     the same, one row at a time.
+  keyset_batches_repo  separate LIMIT queries walking the first column.
+                       Nothing is held open between batches, for slow
+                       consumers such as Telegram broadcasts.
+  group_consecutive    (key, [rows]) runs of rows sharing a key, for streams
+                       ordered by that key (e.g. votes by voter).
+
+Rows are sqlalchemy Rows: tuples that also allow attribute access by label.
+"""
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+
+
+def _batch_size(batch_size: Optional[int]) -> int:
+    return batch_size or settings.STREAM_BATCH_SIZE
+
+
+async def stream_batches_repo(db: AsyncSession, stmt, batch_size: Optional[int] = None) -> AsyncIterator[List]:
+    """Rows of stmt in lists of batch_size from a server-side cursor; one batch in memory at a time."""
+    batch_size = _batch_size(batch_size)
+    result = await db.stream(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    async for rows in result.partitions(batch_size):
+        yield rows
+
+
+async def stream_rows_repo(db: AsyncSession, stmt, batch_size: Optional[int] = None) -> AsyncIterator:
+    """Rows of stmt one by one, fetched batch_size at a time from a server-side cursor."""
+    async for rows in stream_batches_repo(db, stmt, batch_size):
+        for row in rows:
+            yield row
+
+
+async def keyset_batches_repo(db: AsyncSession, stmt, batch_size: Optional[int] = None) -> AsyncIterator[List]:
+    """
+    Rows of stmt in lists of batch_size, one short query per batch
+    (WHERE key > last ORDER BY key LIMIT batch_size). The key is the first
+    selected column and must be unique in the result; stmt must not be ordered.
+    """
+    batch_size = _batch_size(batch_size)
+    key = stmt.selected_columns[0]
+    last = None
+    while True:
+        page = stmt if last is None else stmt.where(key > last)
+        rows = (await db.execute(page.order_by(key).limit(batch_size))).all()
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        last = rows[-1][0]
+
+
+async def group_consecutive(
+    rows: AsyncIterator, key: Callable[[Any], Any] = lambda row: row[0],
+) -> AsyncIterator[Tuple[Any, List]]:
+    """(key, [rows]) for each run of consecutive rows with the same key."""
+    current, run = None, []
+    async for row in rows:
+        k = key(row)
+        if run and k != current:
+            yield current, run
+            run = []
+        current = k
+        run.append(row)
+    if run:
+        yield current, run
@@ -5,17 +5,24 @@ from jose import jwt, JWTError
 from datetime import datetime, timedelta
 import json
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from fastapi.responses import JSONResponse, HTMLResponse, Response
+from fastapi.responses import JSONResponse, HTMLResponse, Response, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Any, Dict, List, Optional
 from config.settings import settings
 from mako.lookup import TemplateLookup
 from infrastructure.db.session import get_async_session as get_db
+from infrastructure.db.session import AsyncSessionLocal
 from infrastructure.models import RoundTree
 from datetime import datetime, timezone
 import random
+from urllib.parse import urlencode
 from services.fractal_service_tree import build_fractal_tree
+from services.card_fragment_cache import render_card, render_comment_rows
+from services.change_counters import change_version, make_etag, etag_matches
+from services.export_formats import FORMATS as EXPORT_FORMATS
+from infrastructure.db.query_profiler import get_query_stats
 
 from fastapi import WebSocket, WebSocketDisconnect
 import json
@@ -26,7 +33,6 @@ from typing import Dict, List
 from services.fractal_service import (
     get_last_group_repo,
     get_proposals_for_group_repo,
-    vote_representative_repo,
     rep_vote_card,
     create_fractal,
     create_user,
@@ -36,6 +42,7 @@ from services.fractal_service import (
     get_groups_for_round,
     close_last_round,
     promote_to_next_round,
+    replay_round_groups,
     create_proposal,
     create_comment,
     vote_proposal,
@@ -43,13 +50,23 @@ from services.fractal_service import (
     get_proposals_comments_tree,
     get_proposal_comments_tree,
     get_representatives_for_group_repo,
-    vote_representative_repo,
+    rank_representatives_for_round,
+    vote_representative,
+    vote_representative_ballot,
     get_group_members,
     get_fractal,
     get_user,
     get_user_info_by_telegram_id,
+    get_dashboard_state,
     get_next_card,
     get_all_cards,
+    get_cards_page,
+    search_fractal,
+    stream_export,
+    EXPORT_TABLES,
+    stream_cards,
+    get_comments_page,
+    get_voting_progress,
     get_or_build_round_tree_repo,
     get_last_round_repo,
     calculate_rep_results
@@ -63,6 +80,10 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1600
 
 from states import connected_clients
+import logging
+from infrastructure.logging_setup import sampled
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -204,7 +225,7 @@ async def fractals_auth(
         validate(request.init_data, settings.bot_token)
         data = parse(request.init_data)
         user = data["user"]
-        print(f"✅ Telegram user: {user['id']} - {user.get('first_name', '')}")
+        logger.debug("Telegram user authenticated", extra=sampled("auth", telegram_id=user['id']))
 
         # 2️⃣ Fetch user context only if fractal_id is not provided
         user_context = {}
@@ -261,9 +282,41 @@ async def fractals_auth(
         return JSONResponse(content=response_data)
 
     except Exception as e:
-        print(f"❌ Auth failed: {e}")
+        logger.warning("❌ Auth failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
         
+@router.post("/dashboard_state")
+async def fractals_dashboard_state(
+    request: AuthRequest,
+    db: AsyncSession = Depends(get_db),
+    fractal_id: Optional[int] = Query(None, description="Current fractal ID"),
+):
+    """
+    /auth plus everything the web app shows on open, in one round trip:
+    round_ends_at / seconds_left, group progress, the user's pending votes
+    and the rep ballot HTML (null when the app should fetch /rep_vote_card).
+    """
+    try:
+        validate(request.init_data, settings.bot_token)
+        user = parse(request.init_data)["user"]
+        logger.debug("Telegram user authenticated", extra=sampled("auth", telegram_id=user['id']))
+
+        state = await get_dashboard_state(db, str(user["id"]), fractal_id or None)
+        if state is None:
+            raise ValueError("Unknown user")
+
+        return JSONResponse(content={
+            **state,
+            "status": "ok",
+            "first_name": user.get("first_name", ""),
+            "username": user.get("username", ""),
+            "rep_ballot": {"html": state["rep_ballot"]} if state["rep_ballot"] else None,
+        })
+
+    except Exception as e:
+        logger.warning("❌ Dashboard state failed: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ---------- HTML Endpoints ----------
 templates = TemplateLookup(
     directories=["templates"],
@@ -280,6 +333,34 @@ async def dashboard(request: Request,
     html = template.render(request=request, fractal_id=fractal_id, default_name="Guest", settings=settings)
     return HTMLResponse(html)
 
+# ---------- Conditional GET ----------
+def _scope_etag(kind: str, group_id: int, *parts) -> Optional[str]:
+    """
+    ETag from the group's change counter. None (no conditional GET) for the
+    negative group ids (-1 last group, -2 whole fractal): not every write that
+    changes those views bumps one counter they could be versioned on.
+    """
+    if group_id < 0:
+        return None
+    return make_etag(kind, *parts, "group", group_id, change_version("group", group_id))
+
+
+def _not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """304 if the client already has this version, else None."""
+    if etag and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def _with_etag(response: Response, etag: Optional[str]) -> Response:
+    # no-cache: the browser keeps the body but revalidates on every poll
+    if not etag:
+        return response
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @router.get("/get_next_card")
 async def get_next_card_router(
     request: Request,
@@ -288,7 +369,12 @@ async def get_next_card_router(
     db: AsyncSession = Depends(get_db)
 ):
     """Load next unvoted card - EXACTLY matches proposal_card.html."""
-    
+
+    etag = _scope_etag("next_card", group_id, user_id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     card = await get_next_card(db, group_id, user_id)
     
     if not card:
@@ -296,26 +382,14 @@ async def get_next_card_router(
 #        response = HTMLResponse(template.render(request=request))
         response = HTMLResponse()
         response.headers["HX-Trigger"] = "noMoreCards"
-        return response
+        return _with_etag(response, etag)
      
-    # Static user/reply for template (current user)
-    avatar_id = (user_id % 16) + 1
-    current_user = {
-        "id": user_id,
-        "username": "You",  # Or fetch real username
-        "avatar": "/static/img/64_" + str(avatar_id) + ".png"
-    }
-    
-    # ✅ Pass card as 'proposal' - template works unchanged!
+    # ✅ Shared card parts cached, per-viewer vote pills spliced in
     template = templates.get_template("proposal_card.html")
     
-    html_content = template.render(
-        request=request,
-        user=current_user,
-        proposal=card  # ✅ Perfect match!
-    )
+    html_content = render_card(template, card)
     
-    return HTMLResponse(content=html_content)
+    return _with_etag(HTMLResponse(content=html_content), etag)
 
 
 @router.get("/get_all_cards")
@@ -327,7 +401,12 @@ async def get_all_cards_router(
     db: AsyncSession = Depends(get_db)
 ):
     """Load all cards in group - renders multiple proposal_card.html templates."""
-    
+
+    etag = _scope_etag("all_cards", group_id, user_id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     cards = await get_all_cards(db, group_id, user_id, fractal_id)
     
     if not cards:
@@ -336,29 +415,101 @@ async def get_all_cards_router(
 #        response = HTMLResponse(html)
         response = HTMLResponse()
         response.headers["HX-Trigger"] = "noCards"
-        return response
-    
-    avatar_id = (user_id % 16) + 1
-    current_user = {
-        "id": user_id,
-        "username": "You",
-        "avatar": f"/static/img/64_{avatar_id}.png"
-    }
+        return _with_etag(response, etag)
     
     template = templates.get_template("proposal_card.html")
     
+    # ✅ Shared card parts rendered once, per-viewer vote pills spliced in
     combined_html = "".join([
-        template.render_unicode(  # ✅ render_unicode() returns str
-            request=request,
-            user=current_user,
-            proposal=card,
-            number_comments = 1,
-            current_group_id = group_id
-        )
+        render_card(template, card)
         for card in cards
     ])
     
-    return HTMLResponse(content=combined_html)
+    return _with_etag(HTMLResponse(content=combined_html), etag)
+
+
+@router.get("/get_cards_feed")
+async def get_cards_feed_router(
+    request: Request,
+    group_id: int = Query(..., description="Current group ID (-1 last group, -2 whole fractal)"),
+    user_id: int = Query(..., description="Current user ID"),
+    fractal_id: int = Query(-1, description="Fractal ID"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(settings.CARD_FEED_PAGE_SIZE, ge=1, le=settings.CARD_FEED_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Keyset-paginated card feed. Cards are streamed as they are hydrated; the last
+    chunk is an HTMX sentinel that loads the next page when scrolled into view.
+    """
+
+    etag = _scope_etag("cards_feed", group_id, user_id, cursor or "", limit)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    try:
+        proposals, next_cursor = await get_cards_page(db, group_id, fractal_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not proposals:
+        response = HTMLResponse()
+        if not cursor:
+            response.headers["HX-Trigger"] = "noCards"
+        return _with_etag(response, etag)
+
+    template = templates.get_template("proposal_card.html")
+
+    async def body():
+        async for card in stream_cards(AsyncSessionLocal, proposals, user_id):
+            yield render_card(template, card)
+        if next_cursor:
+            query = urlencode({
+                "group_id": group_id, "user_id": user_id, "fractal_id": fractal_id,
+                "cursor": next_cursor, "limit": limit,
+            })
+            yield (
+                f'<div class="card-feed-more" hx-get="/api/v1/fractals/get_cards_feed?{query}" '
+                f'hx-trigger="revealed" hx-swap="outerHTML"></div>'
+            )
+
+    return _with_etag(StreamingResponse(body(), media_type="text/html; charset=utf-8"), etag)
+
+
+@router.get("/search")
+async def search_router(
+    fractal_id: int = Query(..., description="Fractal ID"),
+    q: str = Query(..., min_length=1, max_length=200, description='Search text: words, "a phrase", -exclude, or'),
+    kind: Optional[str] = Query(None, description="proposal or comment, both when omitted"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page"),
+    limit: int = Query(settings.SEARCH_PAGE_SIZE, ge=1, le=settings.SEARCH_MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over a fractal's proposals and comments, best match first, keyset paginated."""
+    try:
+        hits, next_cursor = await search_fractal(db, fractal_id, q, cursor, limit, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content={"ok": True, "hits": hits, "next_cursor": next_cursor})
+
+
+@router.get("/get_comments")
+async def get_comments_router(
+    proposal_id: int = Query(..., description="Proposal ID"),
+    user_id: int = Query(..., description="Current user ID"),
+    cursor: Optional[str] = Query(None, description="comments_cursor of the card or previous page"),
+    limit: int = Query(settings.COMMENT_PAGE_SIZE, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Comments beyond a card's top-K window, as comment rows plus the next "load more" button."""
+    try:
+        comments, next_cursor = await get_comments_page(db, proposal_id, user_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    template = templates.get_template("proposal_card.html")
+    return HTMLResponse(content=render_comment_rows(template, proposal_id, comments, next_cursor))
 
 
 # ---------- Service-backed API Endpoints ----------
@@ -465,6 +616,18 @@ async def promote_to_next_round_endpoint(
     new_round = await promote_to_next_round(db, prev_round_id, fractal_id)
     return JSONResponse(content={"ok": True, "new_round": orm_to_dict(new_round) if new_round else None})
 
+@router.get("/replay_round/{round_id}")
+async def replay_round_endpoint(
+    round_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Regenerate a round's groups from its stored seed and diff them with the actual groups."""
+    try:
+        replay = await replay_round_groups(db, round_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return JSONResponse(content={"ok": True, **replay})
+
 @router.post("/create_proposal")
 async def create_proposal_endpoint(
     payload: CreateProposalRequest, 
@@ -568,6 +731,12 @@ class VoteRepresentativePayload(BaseModel):
     candidate_user_id: int
     points: int
 
+class VoteRepresentativeBallotPayload(BaseModel):
+    group_id: int
+    round_id: int
+    voter_user_id: int
+    ballot: Dict[int, int]  # {points: candidate_user_id}, 3=gold, 2=silver, 1=bronze
+
 
 def _iter_comment_nodes(comment_nodes):
     """
@@ -641,7 +810,7 @@ async def test_generate_representative_votes(fractal_id: int, db: AsyncSession =
         
         for voter_id in member_ids:
             # voter always gives 3 to highest
-            vote = await vote_representative_repo(
+            vote = await vote_representative(
                 db=db,
                 group_id=g.id,
                 round_id=round_obj.id,
@@ -660,7 +829,7 @@ async def test_generate_representative_votes(fractal_id: int, db: AsyncSession =
             if len(other_candidates) >= 2:
                 c1, c2 = other_candidates[:2]  # or random.sample(other_candidates, 2)
                 # 2 points to first other
-                vote2 = await vote_representative_repo(
+                vote2 = await vote_representative(
                     db=db,
                     group_id=g.id,
                     round_id=round_obj.id,
@@ -670,7 +839,7 @@ async def test_generate_representative_votes(fractal_id: int, db: AsyncSession =
                 )
                 votes.append(vote2)
                 # 1 point to second other
-                vote3 = await vote_representative_repo(
+                vote3 = await vote_representative(
                     db=db,
                     group_id=g.id,
                     round_id=round_obj.id,
@@ -689,7 +858,7 @@ async def vote_representative_endpoint(
     db: AsyncSession = Depends(get_db)
 ):
     data = payload.dict()
-    vote = await vote_representative_repo(
+    vote = await vote_representative(
         db=db,
         group_id=data["group_id"],
         round_id=data["round_id"],
@@ -700,6 +869,24 @@ async def vote_representative_endpoint(
     return {"ok": True, "vote": orm_to_dict(vote)}
 
 
+@router.post("/vote_representative_ballot")
+async def vote_representative_ballot_endpoint(
+    payload: VoteRepresentativeBallotPayload,
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        votes = await vote_representative_ballot(
+            db,
+            group_id=payload.group_id,
+            round_id=payload.round_id,
+            voter_user_id=payload.voter_user_id,
+            ballot=payload.ballot,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": True, "votes": [orm_to_dict(v) for v in votes]}
+
+
 @router.get("/rep_results/{group_id}/{round_id}")
 async def get_rep_results(group_id: int, round_id: int, db: AsyncSession = Depends(get_db)):
     results = await calculate_rep_results(db, group_id, round_id)
@@ -729,14 +916,54 @@ async def get_user_endpoint(
 
 @router.get("/{fractal_id}/tree")
 async def get_fractal_tree(
+    request: Request,
     fractal_id: int,
     round_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
 ):
+    # Latest round moves with the fractal, a fixed round only changes with itself
+    if round_id is None:
+        etag = make_etag("tree", fractal_id, "latest", change_version("fractal", fractal_id))
+    else:
+        etag = make_etag("tree", fractal_id, round_id, change_version("round", round_id))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     tree = await get_or_build_round_tree_repo(db, fractal_id=fractal_id, round_id=round_id)
     if not tree.get("rounds"):
         raise HTTPException(status_code=404, detail="No rounds found")
-    return tree
+    return _with_etag(JSONResponse(content=jsonable_encoder(tree)), etag)
+
+@router.get("/export/{fractal_id}/{table}")
+async def export_fractal_router(
+    fractal_id: int,
+    table: str,
+    format: str = Query("csv", description="csv or columnar (gzip'd JSON column blocks)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Stream one table of a fractal's results (proposals, comments, proposal_votes,
+    comment_votes, representative_votes, representatives) as a download.
+    """
+    if not await get_fractal(db, fractal_id):
+        raise HTTPException(status_code=404, detail="Fractal not found")
+    try:
+        body = stream_export(AsyncSessionLocal, fractal_id, table, format)
+    except ValueError as e:
+        raise HTTPException(status_code=404 if table not in EXPORT_TABLES else 400, detail=str(e))
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(body, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="fractal_{fractal_id}_{table}.{extension}"',
+    })
+
+@router.get("/debug/query_stats")
+async def get_query_stats_endpoint():
+    """Per route / Telegram handler / poll tick: calls, queries, DB time and slowest statements. Development only."""
+    if settings.ENV != "development":
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {"ok": True, "stats": get_query_stats()}
 
 @router.get("/get-ws-token")
 def get_ws_token(request: Request, user_id: str):
@@ -786,14 +1013,13 @@ async def websocket_endpoint(websocket: WebSocket):
 #            print("📨 Message received:", repr(data))
             
     except WebSocketDisconnect:
-        print(f"👋 User {user_id} DISCONNECTED")
+        logger.debug("👋 ws disconnected", extra=sampled("ws_disconnect", user_id=user_id))
     except Exception as e:
-        print(f"❌ WS error {user_id}: {e}")
+        logger.warning("❌ ws error: %s", e, extra=sampled("ws_error", user_id=user_id))
     finally:
         # CLEANUP (your code is correct)
         if user_id in connected_clients and websocket in connected_clients[user_id]:
             connected_clients[user_id].remove(websocket)
-            print(f"✅ Removed WS for user {user_id}. Remaining: {len(connected_clients[user_id])}")
             if not connected_clients[user_id]:
                 del connected_clients[user_id]
             
@@ -1078,7 +1304,7 @@ async def test_generate_representative_votes(
 
         for voter_id in ai_ids:
             for points, candidate_id in zip(candidates_needed, assigned_candidates):
-                vote = await vote_representative_repo(
+                vote = await vote_representative(
                     db=db,
                     group_id=g.id,
                     round_id=round_obj.id,
@@ -1212,9 +1438,7 @@ async def test_status(fractal_id: int, db: AsyncSession = Depends(get_db)):
             "members": len(await get_group_members(db, group.id))
         })
     
-    reps = {}
-    for group in groups:
-        reps[group.id] = await get_representatives_for_group_repo(db, group.id, round_obj.id)
+    reps = await rank_representatives_for_round(db, round_obj.id)
     
     return {
         "fractal": fractal.id,
@@ -1239,6 +1463,7 @@ from fastapi import APIRouter, HTTPException
     
 @router.get("/rep_vote_card/{group_id}")
 async def get_rep_vote_card(
+    request: Request,
     group_id: int,
     user_id: int,
     fractal_id: int,
@@ -1247,5 +1472,26 @@ async def get_rep_vote_card(
     """
     Builds and returns the representative vote card HTML for a given group and user.
     """
+    etag = _scope_etag("rep_vote_card", group_id, user_id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
     html = await rep_vote_card(db, user_id=user_id, group_id=group_id, fractal_id=fractal_id)
-    return {"ok": True, "html": html}
+    return _with_etag(JSONResponse(content={"ok": True, "html": html}), etag)
+
+
+@router.get("/group_progress/{group_id}")
+async def get_group_progress(
+    request: Request,
+    group_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Voting progress of a group: members done and votes cast out of the total."""
+    etag = _scope_etag("group_progress", group_id)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    progress = (await get_voting_progress(db, [group_id]))[group_id]
+    return _with_etag(JSONResponse(content={"ok": True, "group_id": group_id, **progress}), etag)
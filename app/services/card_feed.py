@@ -0,0 +1,92 @@
+# services/card_feed.py
+"""
+Keyset cursors for the paginated card feed, per-card comment windows and
+search results.
+
+Cards are ordered by (total_score DESC NULLS LAST, created_at DESC, id DESC),
+comments by (current group first, total_score DESC NULLS LAST, created_at, id),
+search hits by (rank DESC, kind DESC, id DESC).
+A cursor is the sort key of the last item already shown, sent to the client as
+an opaque url-safe token, so the next page is a range scan instead of an OFFSET.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+CardCursor = Tuple[Optional[float], Optional[datetime], int]
+CommentCursor = Tuple[int, Optional[float], Optional[datetime], int]
+SearchCursor = Tuple[float, str, int]
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(token: str, size: int) -> List:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Invalid cursor: {token!r}")
+    return values
+
+
+def _score(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def _date(value) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def encode_cursor(total_score: Optional[float], created_at: Optional[datetime], proposal_id: int) -> str:
+    return _encode([total_score, created_at, proposal_id])
+
+
+def decode_cursor(token: Optional[str]) -> Optional[CardCursor]:
+    """None for an empty token; ValueError for a malformed one."""
+    if not token:
+        return None
+    total_score, created_at, proposal_id = _decode(token, 3)
+    try:
+        return _score(total_score), _date(created_at), int(proposal_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+
+
+def encode_comment_cursor(
+    is_current_group: int, total_score: Optional[float], created_at: Optional[datetime], comment_id: int
+) -> str:
+    return _encode([is_current_group, total_score, created_at, comment_id])
+
+
+def decode_comment_cursor(token: Optional[str]) -> Optional[CommentCursor]:
+    """None for an empty token; ValueError for a malformed one."""
+    if not token:
+        return None
+    is_current_group, total_score, created_at, comment_id = _decode(token, 4)
+    try:
+        return int(is_current_group), _score(total_score), _date(created_at), int(comment_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
+
+
+def encode_search_cursor(rank: float, kind: str, item_id: int) -> str:
+    return _encode([rank, kind, item_id])
+
+
+def decode_search_cursor(token: Optional[str]) -> Optional[SearchCursor]:
+    """None for an empty token; ValueError for a malformed one."""
+    if not token:
+        return None
+    rank, kind, item_id = _decode(token, 3)
+    try:
+        return float(rank), str(kind), int(item_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {token!r}") from e
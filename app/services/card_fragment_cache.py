@@ -0,0 +1,159 @@
+# services/card_fragment_cache.py
+"""
+In-process fragment cache for proposal cards.
+
+The shared parts of a card (header, body, comment rows) are rendered once per
+(proposal_id, content version) with markers where the viewer's vote pills go.
+Each viewer's card is then assembled by splicing in pills rendered from their
+own vote state, and the assembled card is cached per
+(proposal_id, content version, vote state).
+
+Votes are spliced in per viewer and need no invalidation.
+New comments bump the proposal version (invalidate_card_fragments), and
+scoring at round close clears everything (clear_card_fragments).
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+from config.settings import settings
+
+# Must match visible_count in proposal_card.html
+VISIBLE_COMMENTS = 5
+
+_HIDDEN_MARKER = "<!--hidden:%d-->"
+_PILL_MARKER = "<!--pill:%d-->"
+
+_fragments: "OrderedDict[Hashable, Any]" = OrderedDict()
+_versions: Dict[int, int] = {}
+_generation = 0
+
+
+def _get(key: Hashable) -> Optional[Any]:
+    value = _fragments.get(key)
+    if value is not None:
+        _fragments.move_to_end(key)
+    return value
+
+
+def _put(key: Hashable, value: Any) -> Any:
+    _fragments[key] = value
+    _fragments.move_to_end(key)
+    while len(_fragments) > settings.CARD_FRAGMENT_CACHE_SIZE:
+        _fragments.popitem(last=False)
+    return value
+
+
+def invalidate_card_fragments(proposal_id: int) -> None:
+    """Content of one card changed (e.g. new comment)."""
+    _versions[proposal_id] = _versions.get(proposal_id, 0) + 1
+
+
+def clear_card_fragments() -> None:
+    """Scores changed for many cards (round close)."""
+    global _generation
+    _generation += 1
+    _fragments.clear()
+
+
+def _content_version(card: Dict) -> tuple:
+    # Comment count and total_score also guard against writes made by another process
+    return (
+        _generation,
+        _versions.get(card["id"], 0),
+        len(card.get("comments") or []),
+        card.get("total_score"),
+        card.get("comments_cursor"),
+    )
+
+
+def _render_def(template, name: str, **kwargs) -> str:
+    return template.get_def(name).render_unicode(**kwargs)
+
+
+def _shared_parts(template, card: Dict, version: tuple):
+    key = ("shared", card["id"], version)
+    parts = _get(key)
+    if parts is not None:
+        return parts
+
+    proposal_id = card["id"]
+    head = _render_def(template, "card_head", proposal=card)
+    comments_open = _render_def(template, "comments_open", proposal_id=proposal_id)
+    rows = {
+        c["id"]: _render_def(
+            template,
+            "comment_row",
+            comment=c,
+            proposal_id=proposal_id,
+            row_class=_HIDDEN_MARKER % c["id"],
+            pill=_PILL_MARKER % c["id"],
+        )
+        for c in card.get("comments") or []
+    }
+    return _put(key, (head, comments_open, rows))
+
+
+def _pill(template, name: str, item_id: int, vote: int) -> str:
+    key = (name, item_id, vote)
+    html = _get(key)
+    if html is None:
+        if name == "proposal_pill":
+            html = _render_def(template, name, proposal_id=item_id, proposal_vote=vote)
+        else:
+            html = _render_def(template, name, comment_id=item_id, comment_vote=vote)
+        _put(key, html)
+    return html
+
+
+def render_card(template, card: Dict) -> str:
+    """Render one card dict (as built by _enrich_proposal_with_comments_repo) as HTML."""
+    proposal_id = card["id"]
+    comments: List[Dict] = card.get("comments") or []
+    proposal_vote = int(card.get("vote") or 0)
+    comment_votes = tuple((c["id"], int(c.get("vote") or 0)) for c in comments)
+
+    version = _content_version(card)
+    key = ("card", proposal_id, version, proposal_vote, comment_votes)
+    html = _get(key)
+    if html is not None:
+        return html
+
+    head, comments_open, rows = _shared_parts(template, card, version)
+
+    out = [head, _pill(template, "proposal_pill", proposal_id, proposal_vote), comments_open]
+    hidden_count = 0
+    for i, (comment_id, vote) in enumerate(comment_votes):
+        is_hidden = i >= VISIBLE_COMMENTS and vote != 0
+        hidden_count += 1 if is_hidden else 0
+        out.append(
+            rows[comment_id]
+            .replace(_HIDDEN_MARKER % comment_id, f"hidden_{proposal_id}" if is_hidden else "")
+            .replace(_PILL_MARKER % comment_id, _pill(template, "comment_pill", comment_id, vote))
+        )
+    out.append(_render_def(
+        template,
+        "comments_close",
+        proposal_id=proposal_id,
+        comments_count=len(comments),
+        hidden_comments_count=hidden_count,
+        comments_cursor=card.get("comments_cursor"),
+    ))
+
+    return _put(key, "".join(out))
+
+
+def render_comment_rows(template, proposal_id: int, comments: List[Dict], cursor: Optional[str]) -> str:
+    """Comment rows for a "load more" page, followed by the next load-more button."""
+    out = [
+        _render_def(
+            template,
+            "comment_row",
+            comment=c,
+            proposal_id=proposal_id,
+            row_class="",
+            pill=_pill(template, "comment_pill", c["id"], int(c.get("vote") or 0)),
+        )
+        for c in comments
+    ]
+    out.append(_render_def(template, "comments_more", proposal_id=proposal_id, comments_cursor=cursor))
+    return "".join(out)
@@ -0,0 +1,49 @@
+# services/change_counters.py
+"""
+In-process change counters per group, round and fractal.
+
+Writes (proposals, comments, votes, round lifecycle) bump the counters of the
+scopes they touch. Polled endpoints turn the counters into strong ETags, so a
+conditional GET can be answered with 304 before any proposal or comment query.
+The boot token makes ETags from a previous process never match.
+"""
+import hashlib
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+_BOOT = f"{os.getpid()}-{time.time_ns()}"
+_counters: Dict[Tuple[str, int], int] = {}
+
+
+def bump_changes(
+    group_id: Optional[int] = None,
+    round_id: Optional[int] = None,
+    fractal_id: Optional[int] = None,
+) -> None:
+    """Bump every given scope once."""
+    for scope, scope_id in (("group", group_id), ("round", round_id), ("fractal", fractal_id)):
+        if scope_id is not None:
+            key = (scope, int(scope_id))
+            _counters[key] = _counters.get(key, 0) + 1
+
+
+def change_version(scope: str, scope_id: int) -> int:
+    """Current counter for ("group" | "round" | "fractal", id)."""
+    return _counters.get((scope, int(scope_id)), 0)
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the boot token and the given parts."""
+    raw = "|".join([_BOOT, *map(str, parts)])
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches the ETag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return any(t.removeprefix("W/") == etag for t in candidates)
@@ -0,0 +1,102 @@
+# services/export_formats.py
+"""
+Streaming writers for fractal exports.
+
+Both take the column names and an async iterator of row chunks (lists of
+tuples, one server-side cursor partition each) and yield bytes, so a chunk is
+encoded, sent and dropped before the next is fetched.
+
+Timestamps should arrive as text (formatted by Postgres, see
+export_statements_repo); Python-side isoformat is the slow path.
+
+  csv       header + one line per row; JSON values (score_per_level) as JSON text
+  columnar  gzip'd JSON lines: a header {"format", "version", "columns"}, then
+            one block per chunk {"rows": n, "data": [[column 0 values], ...]}.
+            Parquet-style row groups without a pyarrow dependency: readable
+            with gzip + json, column-at-a-time, native JSON for nested values.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, List, Sequence
+
+COLUMNAR_FORMAT = "fractal-columnar"
+COLUMNAR_VERSION = 1
+GZIP_LEVEL = 1  # speed over the last few percent of size
+
+FORMATS = {
+    # name: (media type, file extension)
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "columnar": ("application/gzip", "columnar.jsonl.gz"),
+}
+
+
+async def csv_chunks(columns: Sequence[str], chunks: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue().encode()
+    async for rows in chunks:
+        buf.seek(0)
+        buf.truncate()
+        if not rows:
+            continue
+        # Convert column-wise, only the columns that need it
+        cols = list(zip(*rows))
+        if any(_kind(c) for c in cols):
+            rows = zip(*(_column(c, nested=True) for c in cols))
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+
+
+def _kind(values: tuple) -> str:
+    """'date', 'json' or '' for a column, judged on its first non-null value."""
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, (datetime, date)):
+        return "date"
+    if isinstance(sample, (dict, list)):
+        return "json"
+    return ""
+
+
+def _column(values: tuple, nested: bool = False) -> list:
+    """JSON-ready column; with nested, dict/list values become JSON text (for CSV)."""
+    kind = _kind(values)
+    if kind == "date":
+        return [v.isoformat() if v is not None else None for v in values]
+    if kind == "json" and nested:
+        return [json.dumps(v, separators=(",", ":")) if v is not None else None for v in values]
+    return list(values)
+
+
+async def columnar_chunks(columns: Sequence[str], chunks: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    gz = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    header = {"format": COLUMNAR_FORMAT, "version": COLUMNAR_VERSION, "columns": list(columns)}
+    yield gz.compress(json.dumps(header).encode() + b"\n")
+    async for rows in chunks:
+        if not rows:
+            continue
+        block = {"rows": len(rows), "data": [_column(col) for col in zip(*rows)]}
+        out = gz.compress(json.dumps(block, separators=(",", ":")).encode() + b"\n")
+        if out:
+            yield out
+    yield gz.flush()
+
+
+WRITERS = {
+    "csv": csv_chunks,
+    "columnar": columnar_chunks,
+}
+
+
+def read_columnar(data: bytes) -> dict:
+    """{"columns": [...], "data": {column: [values]}} from a whole columnar export."""
+    lines = zlib.decompress(data, 31).splitlines()
+    columns = json.loads(lines[0])["columns"]
+    out = {c: [] for c in columns}
+    for line in lines[1:]:
+        for c, values in zip(columns, json.loads(line)["data"]):
+            out[c].extend(values)
+    return {"columns": columns, "data": out}
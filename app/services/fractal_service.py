@@ -1,24 +1,33 @@
 #~~~{"id":"70524","variant":"standard","title":"Async Fractal Service Layer"} 
 # app/services/fractal_service.py
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timezone
 from config.settings import settings
 from fastapi.websockets import WebSocketState
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from states import connected_clients
 from datetime import datetime, timedelta
 import asyncio
+from collections import OrderedDict
+import html
+import logging
+import time
+from contextlib import contextmanager
+from infrastructure.logging_setup import kv, sampled
+
+logger = logging.getLogger(__name__)
 
 
 from repositories.fractal_repos import (
-    close_round_repo,
     get_last_group_repo,
     get_rep_votes_for_round_repo,
     save_rep_vote_repo,
     get_representatives_for_group_repo,
+    rank_representatives_for_round_repo,
+    save_representatives_for_round_repo,
+    get_or_build_representatives_for_round_repo,
+    get_stored_representatives_for_group_repo,
     get_user_rep_points_repo,
-    get_votes_for_group_comments_repo,
-    get_votes_for_group_proposals_repo,
     set_round_status_repo,
     get_user_by_telegram_id_repo,
     create_user_repo,
@@ -37,11 +46,31 @@ from repositories.fractal_repos import (
     get_proposals_for_group_repo,
     get_comments_for_proposal_repo,
     get_top_proposals_repo,
-    close_last_round_repo,
+    begin_round_close_repo,
+    transition_round_repo,
+    checkpoint_round_repo,
+    checkpoint_group_scored_repo,
+    discard_round_repo,
+    get_closing_rounds_repo,
     save_proposal_score_repo,
     save_comment_score_repo,
     get_groups_for_round_repo,
+    get_comember_history_repo,
+    get_round_proposals_repo,
+    get_round_by_level_repo,
+    get_round_memberships_repo,
+    get_round_activity_repo,
+    get_unassigned_members_repo,
+    move_group_members_repo,
+    get_grouping_attrs_repo,
     vote_representative_repo,
+    vote_representative_ballot_repo,
+    get_group_scope_repo,
+    get_proposal_scope_repo,
+    get_comment_scope_repo,
+    count_votes_for_proposal_repo,
+    count_votes_for_comment_repo,
+    get_group_telegram_ids_repo,
     get_votes_for_comment_repo,
     get_votes_for_proposal_repo,
     get_round_repo,
@@ -52,10 +81,32 @@ from repositories.fractal_repos import (
     get_user_info_by_telegram_id_repo,
     create_user_repo,
     get_fractal_member_repo,
-    get_fractal_members_repo,
     get_fractal_from_name_or_id_repo,
     get_next_card_repo,
     get_all_cards_repo,
+    get_cards_page_repo,
+    search_fractal_repo,
+    export_statements_repo,
+    group_proposal_votes_stmt,
+    group_comment_votes_stmt,
+    fractal_telegram_ids_stmt,
+    get_users_telegram_ids_repo,
+    HEADLINE_START,
+    HEADLINE_STOP,
+    SEARCH_KINDS,
+    hydrate_card_repo,
+    get_comment_windows_repo,
+    get_comments_page_repo,
+    comment_cards_repo,
+    build_voting_queue_repo,
+    enqueue_proposal_repo,
+    enqueue_comment_repo,
+    consume_queue_item_repo,
+    clear_voting_queue_repo,
+    get_voting_progress_repo,
+    get_dashboard_state_repo,
+    QUEUE_PROPOSAL,
+    QUEUE_COMMENT,
     get_last_round_repo,
     close_fractal_repo,
     open_fractal_repo,
@@ -68,11 +119,34 @@ from repositories.fractal_repos import (
 
 )
 from domain import fractal_logic as domain
+from domain import promotion
 
+from types import SimpleNamespace
 from typing import Iterable, Protocol
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from telegram.service import send_message_to_telegram_users, send_button_to_telegram_users
+from services.card_fragment_cache import invalidate_card_fragments, clear_card_fragments
+from services.change_counters import bump_changes, change_version
+from repositories.streaming import stream_batches_repo, stream_rows_repo, keyset_batches_repo, group_consecutive
+from services.export_formats import WRITERS as EXPORT_WRITERS
+from services.card_feed import (
+    encode_cursor, decode_cursor, encode_comment_cursor, decode_comment_cursor,
+    encode_search_cursor, decode_search_cursor,
+)
+from infrastructure.db.query_profiler import query_profile
+from infrastructure.metrics import (
+    POLL_TICK_SECONDS,
+    ROUNDS_CLOSED,
+    ROUND_CLOSE_LAG_SECONDS,
+    ROUND_TIME_SAVED_SECONDS,
+    ROUND_CLOSE_SECONDS,
+    ROUND_CLOSE_STAGE_SECONDS,
+    GROUP_SCORING_SECONDS,
+    GROUP_REBALANCE_MOVES,
+    WEBSOCKET_SENDS,
+    SEND_QUEUE_DEPTH,
+)
 
 class HasUserId(Protocol):
     user_id: int
@@ -119,7 +193,7 @@ async def join_fractal(db: AsyncSession, user_info: Dict, fractal_id: int):
     if not fractal:
         raise ValueError("Fractal not found")
     
-    if fractal.status != "waiting":
+    if fractal.status != "waiting" and not accepts_late_joiners(fractal, await get_last_round_repo(db, fractal_id)):
         raise ValueError(f"Fractal is not open for joining (status: {fractal.status})")
     
     # 2. Get or create user
@@ -135,6 +209,7 @@ async def join_fractal(db: AsyncSession, user_info: Dict, fractal_id: int):
     existing_member = await get_fractal_member_repo(db, fractal_id, user.id)
     if existing_member:
         await set_active_fractal_repo(db, user.id, fractal_id)
+        invalidate_dashboard_state(telegram_id)
         raise ValueError("User is already a member of this fractal")
     
     # 4. Execute operations
@@ -143,6 +218,7 @@ async def join_fractal(db: AsyncSession, user_info: Dict, fractal_id: int):
 
     await add_fractal_member_repo(db, fractal_id, user.id)
     await set_active_fractal_repo(db, user.id, fractal_id)
+    invalidate_dashboard_state(telegram_id)
 
 
 
@@ -156,11 +232,8 @@ async def start_fractal(db: AsyncSession, fractal_id: int):
     round_0 = await start_round(db, fractal_id, level=0, members=members)
     fractal = await get_fractal_repo(db, fractal_id)
     # 1️⃣ Notify all members that the fractal/round has started
-    print ("🚀 Your fractal has started!")
-
-
     groups = await get_groups_for_round(db, round_0.id)
-    print(f"Found {len(groups)} groups")
+    logger.info("🚀 Fractal started", extra=kv(fractal_id=fractal_id, round_id=round_0.id, groups=len(groups)))
     group_members_map = {}
     total_members = 0
 
@@ -169,7 +242,7 @@ async def start_fractal(db: AsyncSession, fractal_id: int):
         member_ids = [m.user_id for m in members]
         group_members_map[g.id] = member_ids
         total_members += len(member_ids)
-        print(f"Group {g.id} members: {member_ids}")
+        logger.debug("Group members", extra=kv(group_id=g.id, members=member_ids))
 
     # Add member/group stats to message
         text = f"🚀 Fractal '{fractal.name}' has started!\n\n"
@@ -182,8 +255,24 @@ async def start_fractal(db: AsyncSession, fractal_id: int):
     text = f"🚀 Fractal '{fractal.name}' has started!<p>👥 The fractal has {total_members} members in {len(groups)} groups<p>💬 You can chat with your group members in the Fractal Circle Bot private chat. Try writing 'Hi!'<p>📝 You can write and vote on proposals here in the Fractal Fractal App!<p>⭐ Please note that you HAVE to vote on EVERY proposal and comment to continue!"
     await send_message_to_fractal_web_app_members(db, fractal_id, text, "start")
     await open_fractal_repo(db, fractal_id)
+    bump_changes(round_id=round_0.id, fractal_id=fractal_id)
     return round_0
 
+def _telegram_ids(raw_ids) -> list[int]:
+    telegram_ids: list[int] = []
+    for telegram_id in raw_ids:
+        try:
+            telegram_ids.append(int(telegram_id))
+        except ValueError:
+            continue
+    return telegram_ids
+
+
+async def _member_telegram_ids(db: AsyncSession, members: Iterable[HasUserId]) -> list[int]:
+    """Telegram ids of the members' users in one column-only query (no User entities)."""
+    return _telegram_ids(await get_users_telegram_ids_repo(db, {m.user_id for m in members}))
+
+
 async def send_message_to_members(
     db: AsyncSession,
     members: Iterable[HasUserId],
@@ -193,16 +282,7 @@ async def send_message_to_members(
     Given any member objects with .user_id (FractalMember, GroupMember, etc.),
     resolve Users and send them a Telegram message.
     """
-    telegram_ids: list[int] = []
-
-    for member in members:
-        user = await get_user(db, member.user_id)
-        if not user or not user.telegram_id:
-            continue
-        try:
-            telegram_ids.append(int(user.telegram_id))
-        except ValueError:
-            continue
+    telegram_ids = await _member_telegram_ids(db, members)
 
 #    import os
 #    text += f" [PID {os.getpid()}]"
@@ -222,16 +302,7 @@ async def send_button_to_members(
     Given any member objects with .user_id (FractalMember, GroupMember, etc.),
     resolve Users and send them a Telegram message.
     """
-    telegram_ids: list[int] = []
-
-    for member in members:
-        user = await get_user(db, member.user_id)
-        if not user or not user.telegram_id:
-            continue
-        try:
-            telegram_ids.append(int(user.telegram_id))
-        except ValueError:
-            continue
+    telegram_ids = await _member_telegram_ids(db, members)
 
  #   import os
  #   text += f" [PID {os.getpid()}]"
@@ -253,16 +324,7 @@ async def send_message_to_web_app_members(
     Given any member objects with .user_id (FractalMember, GroupMember, etc.),
     resolve Users and send them a Telegram message.
     """
-    telegram_ids: list[int] = []
-
-    for member in members:
-        user = await get_user(db, member.user_id)
-        if not user or not user.telegram_id:
-            continue
-        try:
-            telegram_ids.append(int(user.telegram_id))
-        except ValueError:
-            continue
+    telegram_ids = await _member_telegram_ids(db, members)
 
  #   import os
  #   text += f" [PID {os.getpid()}]"
@@ -272,41 +334,48 @@ async def send_message_to_web_app_members(
 
 
 async def send_message_to_group(db: AsyncSession, group_id: int, text: str) -> None:
-    members = await get_group_members_repo(db, group_id)
-    await send_message_to_members(db, members, text)
+    telegram_ids = _telegram_ids(await get_group_telegram_ids_repo(db, group_id))
+    if telegram_ids:
+        await send_message_to_telegram_users(telegram_ids, text)
 
 async def send_button_to_group(db: AsyncSession, group_id: int, text: str, button, fractal_id, data=0) -> None:
-    members = await get_group_members_repo(db, group_id)
-    await send_button_to_members(db, members, text, button, fractal_id, data=0)
+    telegram_ids = _telegram_ids(await get_group_telegram_ids_repo(db, group_id))
+    if telegram_ids:
+        await send_button_to_telegram_users(telegram_ids, text, button, fractal_id, 0)
+
+async def _fractal_telegram_id_batches(db: AsyncSession, fractal_id: int):
+    """Members' Telegram ids in batches (keyset walk over users, no N+1 user lookups)."""
+    async for rows in keyset_batches_repo(db, fractal_telegram_ids_stmt(fractal_id)):
+        telegram_ids = _telegram_ids(row.telegram_id for row in rows)
+        if telegram_ids:
+            yield telegram_ids
+
 
 async def send_message_to_fractal_members(db: AsyncSession, fractal_id: int, text: str) -> None:
-    members = await get_fractal_members_repo(db, fractal_id)
-    await send_message_to_members(db, members, text)
+    async for telegram_ids in _fractal_telegram_id_batches(db, fractal_id):
+        await send_message_to_telegram_users(telegram_ids, text)
 
 
 async def send_message_to_web_app_group(db: AsyncSession, group_id: int, text: str, event_type="message") -> None:
-    members = await get_group_members_repo(db, group_id)
-    await send_message_to_web_app_members(db, members, text, event_type)
+    telegram_ids = _telegram_ids(await get_group_telegram_ids_repo(db, group_id))
+    if telegram_ids:
+        await send_message_to_web_app_users(telegram_ids, text, event_type)
+
+async def send_event_to_web_app_group(db: AsyncSession, group_id: int, event_type: str, data: Dict, user_id: int = 0) -> None:
+    """
+    Push a delta event (proposal_new, comment_new, vote_tally) to the group's web app clients.
+    message carries the acting user id, like "refresh", so clients can skip their own writes.
+    """
+    telegram_ids = await get_group_telegram_ids_repo(db, group_id)
+    if telegram_ids:
+        await send_message_to_web_app_users(telegram_ids, str(user_id), event_type, data)
 
 async def send_message_to_fractal_web_app_members(db: AsyncSession, fractal_id: int, text: str, event_type="message") -> None:
-    members = await get_fractal_members_repo(db, fractal_id)
-    await send_message_to_web_app_members(db, members, text, event_type)
+    async for telegram_ids in _fractal_telegram_id_batches(db, fractal_id):
+        await send_message_to_web_app_users(telegram_ids, text, event_type)
 
 async def send_button_to_fractal_members(db, text, button, fractal_id, data=0):
-    members = await get_fractal_members_repo(db, fractal_id)
-    telegram_ids: list[int] = []
-
-    for member in members:
-        user = await get_user(db, member.user_id)
-        if not user or not user.telegram_id:
-            continue
-        try:
-            telegram_ids.append(int(user.telegram_id))
-        except ValueError:
-            continue
-
-#    print("Sending message to telegram Users")
-    if telegram_ids:
+    async for telegram_ids in _fractal_telegram_id_batches(db, fractal_id):
         await send_button_to_telegram_users(telegram_ids, text, button, fractal_id, data)
 
 
@@ -321,19 +390,13 @@ async def start_round(db: AsyncSession, fractal_id: int, level: int, members: Li
     Create a round and divide users into groups.
     """
 #    print("starting round")
-    round_obj = await create_round_repo(db, fractal_id, level)
+    fractal = await get_fractal(db, fractal_id)
+    round_obj = await create_round_repo(db, fractal_id, level, seed=round_seed(fractal, level))
 
     user_ids = [m.user_id for m in members]
 #    group_size = 8  # Could come from fractal settings
 
-    fractal = await get_fractal(db, fractal_id)
-    settings_dict = fractal.settings or {}
-
-    group_size = settings_dict.get("group_size")
-    if group_size is None:
-        group_size = settings.GROUP_SIZE_DEFAULT
-
-    groups_flat = domain.divide_into_groups(user_ids, group_size)
+    groups_flat = await _form_groups(db, fractal, round_obj, user_ids)
 
     groups = []
     for grp_users in groups_flat:
@@ -346,6 +409,128 @@ async def start_round(db: AsyncSession, fractal_id: int, level: int, members: Li
         groups.append(grp)
     return round_obj
 
+def group_size_for(fractal) -> int:
+    return (fractal.settings or {}).get("group_size") or settings.GROUP_SIZE_DEFAULT
+
+def round_seed(fractal, level: int) -> int:
+    """Derived from a fixed base seed when one is configured (comparable benchmark runs), else random."""
+    base = (fractal.settings or {}).get("seed", settings.GROUPING_SEED)
+    if base is None:
+        return domain.new_seed()
+    return domain.derive_seed(base, level)
+
+async def _form_groups(db: AsyncSession, fractal, round_obj, user_ids: List[int], related=None) -> List[List[int]]:
+    """
+    Seeded, constrained grouping for round_obj. Every input is read as of the
+    round (its seed, history before it), so replay_round_groups gets the same answer.
+    """
+    settings_dict = fractal.settings or {}
+    history = await get_comember_history_repo(
+        db, user_ids, settings_dict.get("grouping_history", settings.GROUPING_HISTORY_FRACTALS),
+        fractal.id, round_obj.id,
+    )
+    attrs = await get_grouping_attrs_repo(
+        db, user_ids, settings_dict.get("group_by", settings.GROUPING_ATTRIBUTES),
+    )
+    return domain.divide_into_groups(
+        user_ids, group_size_for(fractal),
+        history=history, related=related, attrs=attrs, seed=round_obj.seed,
+    )
+
+def accepts_late_joiners(fractal, round_obj, now: Optional[datetime] = None) -> bool:
+    """Round 0 is open and still in its first LATE_JOIN_MINUTES; rebalance_round seats the newcomers."""
+    if not settings.LATE_JOIN_MINUTES or fractal.status != "open":
+        return False
+    if round_obj is None or round_obj.level != 0 or round_obj.status != "open":
+        return False
+    now = now or datetime.now(timezone.utc)
+    return now <= round_obj.started_at + timedelta(minutes=settings.LATE_JOIN_MINUTES)
+
+async def rebalance_round(db: AsyncSession, round_obj, fractal, move_members: bool = False) -> List:
+    """
+    Round 0: seat late joiners in the groups with the fewest active members and,
+    with move_members, let groups short of active members trade inactive seats
+    for active members of busy groups (see domain.plan_rebalance). Authors never
+    move. All moves commit in one transaction; moved users are told to reload.
+    """
+    late = await get_unassigned_members_repo(db, fractal.id, round_obj.id)
+    if not late and not move_members:
+        return []
+    groups = await get_round_memberships_repo(db, round_obj.id)
+    active, authors = await get_round_activity_repo(db, round_obj.id)
+    moves = domain.plan_rebalance(
+        groups, active, authors, late, group_size_for(fractal), settings.REBALANCE_MIN_ACTIVE, move_members,
+    )
+    if not moves:
+        return []
+
+    await move_group_members_repo(db, round_obj.id, moves)
+    touched = sorted({gid for _, src, dst in moves for gid in (src, dst) if gid is not None})
+    await build_voting_queue_repo(db, touched)  # newcomers get the cards of their new group
+    for gid in touched:
+        bump_changes(group_id=gid)
+        _progress_cache.pop(gid, None)
+    bump_changes(round_id=round_obj.id, fractal_id=fractal.id)
+
+    for uid, src, _ in moves:
+        GROUP_REBALANCE_MOVES.inc(kind="late" if src is None else "active" if uid in active else "inactive")
+    logger.info("🔀 Rebalanced round groups", extra=kv(
+        round_id=round_obj.id, moves=len(moves), late=len(late), groups=len(touched),
+    ))
+    await _fan_out(_session_factory(db), db, _notify_regrouped, [uid for uid, _, _ in moves], touched)
+    return moves
+
+async def _notify_regrouped(db: AsyncSession, user_ids: List[int], group_ids: List[int]) -> None:
+    members = [SimpleNamespace(user_id=uid) for uid in user_ids]
+    text = "🔀 You have been placed in a new circle. Open the Fractal App to meet your group!"
+    await send_message_to_members(db, members, text)
+    await send_message_to_web_app_members(db, members, text, "regroup")
+    for gid in group_ids:
+        await publish_group_progress(db, gid)
+
+async def replay_round_groups(db: AsyncSession, round_id: int) -> Dict:
+    """
+    Regenerate a round's groups from its seed and compare with the stored ones.
+    Level 0 replays the round's members, higher levels the reps of the round
+    below. Differences mean members moved since, prefs changed, or the round
+    predates seeding (seed is None).
+    """
+    round_obj = await get_round_repo(db, round_id)
+    if not round_obj:
+        raise ValueError("Round not found")
+    fractal = await get_fractal(db, round_obj.fractal_id)
+
+    actual = [sorted(members) for members in (await get_round_memberships_repo(db, round_id)).values()]
+
+    related = None
+    if round_obj.level == 0:
+        user_ids = [uid for members in actual for uid in members]
+    else:
+        prev_round = await get_round_by_level_repo(db, round_obj.fractal_id, round_obj.level - 1)
+        policy = promotion_policy(fractal)
+        rep_to_source_group = await _rep_sources(db, prev_round.id, policy) if prev_round else {}
+        user_ids = list(rep_to_source_group)
+        related = {rep_id: g.id for rep_id, g in rep_to_source_group.items()}
+
+    expected = []
+    if round_obj.seed is not None:
+        expected = [sorted(g) for g in await _form_groups(db, fractal, round_obj, user_ids, related)]
+
+    actual.sort()
+    expected.sort()
+    match = round_obj.seed is not None and expected == actual
+    logger.info("🔁 Replayed round groups", extra=kv(
+        round_id=round_id, seed=round_obj.seed, groups=len(actual), match=match,
+    ))
+    return {
+        "round_id": round_id,
+        "level": round_obj.level,
+        "seed": round_obj.seed,
+        "match": match,
+        "expected": expected,
+        "actual": actual,
+    }
+
 async def get_groups_for_round(db: AsyncSession, round_id: int):
     return await get_groups_for_round_repo(db, round_id)
 
@@ -366,18 +551,12 @@ RANK_POINTS: List[int] = list(range(MAX_RANK, 0, -1))  # [10, 9, 8, ..., 1]
 MIN_VOTES_FOR_BAYES: int = 5
 
 async def calculate_proposal_scores_with_ties(db, group_id: int, round_obj):
-    all_votes = await get_votes_for_group_proposals_repo(db, group_id)
-    if not all_votes:
-        return
-
-    # Group by voter (one dict per member)
-    votes_by_member = defaultdict(list)
-    for v in all_votes:
-        votes_by_member[v.voter_user_id].append(v)
+    # Votes stream in by voter: one voter's ballot in memory at a time
+    votes_by_member = group_consecutive(stream_rows_repo(db, group_proposal_votes_stmt(group_id)))
 
     proposal_totals = defaultdict(float)
 
-    for voter_user_id, votes in votes_by_member.items():
+    async for voter_user_id, votes in votes_by_member:
         sorted_votes = sorted(votes, key=lambda v: v.score, reverse=True)
         assigned_points = {}
         rank_index = 0
@@ -418,36 +597,27 @@ async def calculate_comment_scores(db, group_id: int, round_obj):
     """
     Normalize user votes, then apply Bayesian weighted average.
     """
-#    print ("get all votes")
-    all_votes = await get_votes_for_group_comments_repo(db, group_id)
-    if not all_votes:
-        return
-
-    votes_by_user = defaultdict(list)
-    for v in all_votes:
-        votes_by_user[v.voter_user_id].append(v)
+    # Votes stream in by voter; per comment only (sum, count) of normalized votes is kept
+    votes_by_user = group_consecutive(stream_rows_repo(db, group_comment_votes_stmt(group_id)))
 
-    normalized_votes = []
-    for voter_user_id, votes in votes_by_user.items():
+    comment_totals = defaultdict(lambda: [0.0, 0])
+    async for voter_user_id, votes in votes_by_user:
         max_score = max(v.vote for v in votes) or 1
         for v in votes:
-            norm_score = v.vote / max_score
-            normalized_votes.append((v.comment_id, norm_score))
-
-    # Aggregate normalized votes
-    comment_totals = defaultdict(list)
-    for cid, score in normalized_votes:
-        comment_totals[cid].append(score)
+            totals = comment_totals[v.comment_id]
+            totals[0] += v.vote / max_score
+            totals[1] += 1
+    if not comment_totals:
+        return
 
     # Compute global average for Bayesian smoothing
     global_avg = (
-        sum(sum(vals) / len(vals) for vals in comment_totals.values()) / len(comment_totals)
+        sum(total / n for total, n in comment_totals.values()) / len(comment_totals)
     )
 
     # Apply Bayesian weighting
-    for comment_id, vals in comment_totals.items():
-        n = len(vals)
-        local_avg = sum(vals) / n
+    for comment_id, (total, n) in comment_totals.items():
+        local_avg = total / n
         adjusted = (n / (n + MIN_VOTES_FOR_BAYES)) * local_avg + (
             MIN_VOTES_FOR_BAYES / (n + MIN_VOTES_FOR_BAYES)
         ) * global_avg
@@ -458,92 +628,280 @@ async def calculate_comment_scores(db, group_id: int, round_obj):
 
 # ===================== ROUND CLOSURE ===========================
 
-async def close_last_round(db: AsyncSession, fractal_id: int):
+async def close_last_round(db: AsyncSession, fractal_id: int, reason: str = "manual"):
     """
     Close a round: mark it closed and calculate totals for proposals and comments.
     Saves scores per level as lists in JSONB.
+    reason labels the rounds-closed metric (scheduled from the poll loop, else manual).
     """
-    round = await get_last_round_repo(db, fractal_id)
-    groups = await get_groups_for_round_repo(db, round.id)
-    text = f"ℹ️ Round {round.level+1} has ended!"
-    for g in groups:
-        await send_message_to_group(db, g.id, text)
-        await send_message_to_web_app_group(db, g.id, text, "end")
+    round_obj = await get_last_round_repo(db, fractal_id)
+    if round_obj is None:
+        return None
+    return await close_round(db, round_obj, reason)
+
 
-    # Step 1: Mark round as closed hard
-    round_obj = await close_last_round_repo(db, fractal_id)
+_closing_rounds: set = set()  # round ids with a close running in this process
 
-    # Step 2: Process each group
-    for group in groups:
-        await calculate_proposal_scores_with_ties(db, group.id, round_obj)
-        await calculate_comment_scores(db, group.id, round_obj)
 
-    # Step 3: Promote to next round
-    new_round = await promote_to_next_round(db, round_obj.id, round_obj.fractal_id)
+async def close_round(db: AsyncSession, round_obj, reason: str = "manual"):
+    """
+    Drive a round through open/vote → scoring → promoting → closed, starting
+    from whatever state it is in. Each step is checkpointed on the round, so a
+    retry after a crash skips finished work (reps, scored groups) and redoes
+    only the unfinished step. Returns the next round, or None when the fractal
+    ended or the close is owned by someone else.
+    """
+    if round_obj.id in _closing_rounds:
+        logger.info("⏭️ Round close already running", extra=kv(round_id=round_obj.id))
+        return None
+    _closing_rounds.add(round_obj.id)
+    try:
+        await db.refresh(round_obj)  # current status and checkpoints
+        with ROUND_CLOSE_SECONDS.time():
+            return await _close_round(db, round_obj, reason)
+    finally:
+        _closing_rounds.discard(round_obj.id)
+
+
+async def _close_round(db: AsyncSession, round_obj, reason: str):
+    """
+    Staged close: end voting + reps → score groups concurrently → promote.
+    Notifications are fanned out in the background, in order, off the critical path.
+    """
+    stages: Dict[str, float] = {}
+    factory = _session_factory(db)
+    fractal_id = round_obj.fractal_id
+    resumed_from = round_obj.status
+
+    groups = await get_groups_for_round_repo(db, round_obj.id)
+    group_ids = [g.id for g in groups]
+    ended = None
+
+    # Step 1: Voting ends (open/vote → scoring). Compare-and-set, so a concurrent close is a no-op.
+    if round_obj.status in ("open", "vote"):
+        with _close_stage(stages, "close"):
+            round_obj = await begin_round_close_repo(db, round_obj.id)
+        if round_obj is None:
+            return None
+        ended = await _fan_out(factory, db, _notify_round_ended, group_ids, round_obj.level)
+
+    # Step 2: Reps and scores (scoring → promoting), skipping checkpointed work
+    if round_obj.status == "scoring":
+        checkpoints = round_obj.checkpoints or {}
+        with _close_stage(stages, "reps"):
+            if not checkpoints.get("reps"):
+                # Rank reps for all groups at once and store the winners
+                await save_representatives_for_round_repo(db, round_obj.id)
+                await checkpoint_round_repo(db, round_obj.id, reps=True)
+
+        scored = set(checkpoints.get("scored") or [])
+        with _close_stage(stages, "scoring"):
+            await _score_groups(factory, db, [gid for gid in group_ids if gid not in scored], round_obj)
+        clear_card_fragments()  # scores changed on every card of the round
+        await clear_voting_queue_repo(db, group_ids)
+        for gid in group_ids:
+            _progress_cache.pop(gid, None)
+
+        round_obj = await transition_round_repo(db, round_obj.id, ("scoring",), "promoting")
+        if round_obj is None:
+            return None
+
+    if round_obj.status != "promoting":
+        return None
+
+    # Step 3: Promote (promoting → closed, committed with the proposal moves)
+    with _close_stage(stages, "promote"):
+        partial_round_id = (round_obj.checkpoints or {}).get("next_round_id")
+        if partial_round_id:
+            # Still promoting, so the promotion never committed: start it over
+            await discard_round_repo(db, partial_round_id)
+            logger.warning("♻️ Discarded round of an interrupted promotion", extra=kv(
+                round_id=round_obj.id, next_round_id=partial_round_id,
+            ))
+
+        new_round = await promote_to_next_round(db, round_obj.id, fractal_id)
+        if new_round:
+            next_group_ids = [g.id for g in await get_groups_for_round(db, new_round.id)]
+            # Promoted proposals are known now: materialize every rep's voting queue
+            await build_voting_queue_repo(db, next_group_ids)
+        else:
+            if await transition_round_repo(db, round_obj.id, ("promoting",), "closed") is None:
+                return None  # closed by someone else
+            await close_fractal_repo(db, fractal_id)
+        bump_round_changes(round_obj, groups)  # status, scores, reps and proposal groups all moved
+
+    # Step 4: Notify (background, after the "round ended" messages)
     if new_round:
-        next_groups = await get_groups_for_round(db, new_round.id)
-        text = "🚀 The Next Round has started! ℹ️ You have been selected to represent your Circle!"
-        for g in next_groups:
-            await send_button_to_group(db, g.id, text, "Fractal App", round_obj.fractal_id)
-            await send_message_to_web_app_group(db, g.id, text, "start")
-        return new_round
-    await close_round_repo(db, round_obj.id)
-
-    # Step 4: End fractal if no new round
+        await _fan_out(factory, db, _notify_next_round, next_group_ids, fractal_id, after=ended)
+    else:
+        await _fan_out(factory, db, _notify_fractal_ended, fractal_id, after=ended)
+
+    ROUNDS_CLOSED.inc(reason=reason)
+    logger.info("🏁 Round closed", extra=kv(
+        fractal_id=fractal_id, round_id=round_obj.id, groups=len(group_ids), resumed_from=resumed_from,
+        next_round_id=new_round.id if new_round else None, stages_ms=stages,
+    ))
+    return new_round
+
+
+@contextmanager
+def _close_stage(stages: Dict[str, float], name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stages[name] = round(elapsed * 1000, 1)
+        ROUND_CLOSE_STAGE_SECONDS.observe(elapsed, stage=name)
+
+
+def _session_factory(db: AsyncSession):
+    """Sessions on the same engine as db, or None when db is bound to a single connection."""
+    if isinstance(db.bind, AsyncEngine):
+        return async_sessionmaker(bind=db.bind, expire_on_commit=False, autoflush=False)
+    return None
+
+
+async def _score_group(db: AsyncSession, group_id: int, round_obj) -> None:
+    """Score one group and checkpoint it. Scores are set per level, so redoing a half-scored group is safe."""
+    with GROUP_SCORING_SECONDS.time():
+        await calculate_proposal_scores_with_ties(db, group_id, round_obj)
+        await calculate_comment_scores(db, group_id, round_obj)
+    await checkpoint_group_scored_repo(db, round_obj.id, group_id)
+
+
+async def _score_groups(factory, db: AsyncSession, group_ids: List[int], round_obj) -> None:
+    """Score groups concurrently, at most SCORING_CONCURRENCY sessions at a time."""
+    if factory is None:
+        for gid in group_ids:
+            await _score_group(db, gid, round_obj)
+        return
+
+    semaphore = asyncio.Semaphore(settings.SCORING_CONCURRENCY)
+
+    async def job(group_id: int):
+        async with semaphore, factory() as session:
+            await _score_group(session, group_id, round_obj)
+
+    results = await asyncio.gather(*(job(gid) for gid in group_ids), return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+_background_tasks: set = set()
+
+
+def _on_fan_out_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error("❌ Notification fan-out failed", exc_info=task.exception(), extra=kv(task=task.get_name()))
+
+
+async def _fan_out(factory, db: AsyncSession, job, *args, after: Optional[asyncio.Task] = None):
+    """
+    Run a notification job in the background with its own session, after the
+    given task (so messages keep their order). Without a factory it runs inline.
+    """
+    if factory is None:
+        await job(db, *args)
+        return None
+
+    async def run():
+        if after is not None:
+            await asyncio.wait([after])
+        with query_profile(f"fanout:{job.__name__.lstrip('_')}"):
+            async with factory() as session:
+                await job(session, *args)
+
+    task = asyncio.create_task(run(), name=job.__name__)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_fan_out_done)
+    return task
+
+
+async def _notify_round_ended(db: AsyncSession, group_ids: List[int], level: int) -> None:
+    text = f"ℹ️ Round {level+1} has ended!"
+    for gid in group_ids:
+        await send_message_to_group(db, gid, text)
+        await send_message_to_web_app_group(db, gid, text, "end")
+
+
+async def _notify_next_round(db: AsyncSession, group_ids: List[int], fractal_id: int) -> None:
+    text = "🚀 The Next Round has started! ℹ️ You have been selected to represent your Circle!"
+    for gid in group_ids:
+        await send_button_to_group(db, gid, text, "Fractal App", fractal_id)
+        await send_message_to_web_app_group(db, gid, text, "start")
+
+
+async def _notify_fractal_ended(db: AsyncSession, fractal_id: int) -> None:
     end_text = "⚡️ The Fractal has ended!"
     await send_message_to_fractal_web_app_members(db, fractal_id, end_text, "end")
     end_text = "\n\n🚀 Open the Fractal App to see the final results."
     await send_button_to_fractal_members(db, end_text, "Fractal App", fractal_id)
-    await close_fractal_repo(db, fractal_id)
-    return None
+
+def bump_round_changes(round_obj, groups) -> None:
+    """Round status or scores changed: invalidate ETags of the round and all its groups."""
+    for g in groups:
+        bump_changes(group_id=g.id)
+    bump_changes(round_id=round_obj.id, fractal_id=round_obj.fractal_id)
 
 # ----------------------------
 # Promote to Next Round
 # ----------------------------
 
+def promotion_policy(fractal) -> Dict:
+    """The fractal's promotion policy (meta "promotion" over the defaults), see domain.promotion."""
+    policy, ignored = promotion.resolve_policy(fractal.meta, settings.PROPOSALS_PER_USER_DEFAULT)
+    if ignored:
+        logger.warning("⚠️ Unknown promotion strategy, using default", extra=kv(fractal_id=fractal.id, ignored=ignored))
+    return policy
+
+async def _rep_sources(db: AsyncSession, prev_round_id: int, policy: Dict, prev_groups=None) -> Dict:
+    """Promoted reps (policy "reps") → the group they represent, for the groups of prev_round_id."""
+    if prev_groups is None:
+        prev_groups = await get_groups_for_round(db, prev_round_id)
+    round_reps = await get_or_build_representatives_for_round_repo(db, prev_round_id)
+    groups_by_id = {g.id: g for g in prev_groups}
+    rep_source = promotion.select_reps(
+        {g.id: round_reps[g.id] for g in prev_groups if round_reps.get(g.id)}, policy,
+    )
+    logger.debug("Promoted reps", extra=kv(round_id=prev_round_id, reps=len(rep_source)))
+    return {rep_id: groups_by_id[gid] for rep_id, gid in rep_source.items()}
+
 async def promote_to_next_round(db: AsyncSession, prev_round_id: int, fractal_id: int):
     """
     Start next round: Reps form Rep Circles (1 rep → 1 Circle).
     Each Rep carries top proposals from source_group to their Rep Circle.
+    Which reps and proposals move up follows the fractal's promotion policy.
     """
-    print(f"\n{'🔄 PROMOTE TO NEXT ROUND' :=^60}")
-    print(f"   📊 Input: prev_round_id={prev_round_id}, fractal_id={fractal_id}")
 
     # Step 1: Get prev groups
     prev_groups = await get_groups_for_round(db, prev_round_id)
-    print(f"   📋 [STEP 1] Found {len(prev_groups)} groups in prev round")
     
     if len(prev_groups) < 2:
-        print(f"   ⏭️  < 2 groups → NO NEXT ROUND")
-        print(f"{'='*60}\n")
+        logger.info("⏭️ < 2 groups, no next round", extra=kv(prev_round_id=prev_round_id, fractal_id=fractal_id))
         return None
 
-    # Step 2: Gather top reps + map rep → source_group
-    rep_to_source_group = {}
-    for i, g in enumerate(prev_groups, 1):
-        print(f"      Group {i}: id={g.id}")
-        reps = await get_representatives_for_group_repo(db, g.id, prev_round_id)
-        rep_id = reps.get(1)
-        print(f"         Top rep: {rep_id}")
-        if rep_id:
-            rep_to_source_group[rep_id] = g
-
+    # Step 2: Gather promoted reps + map rep → source_group (stored at close)
+    fractal = await get_fractal(db, fractal_id)
+    policy = promotion_policy(fractal)
+    rep_to_source_group = await _rep_sources(db, prev_round_id, policy, prev_groups)
     unique_reps = list(rep_to_source_group.keys())
-    print(f"   ✓ {len(unique_reps)} reps mapped to source groups")
 
     # Step 3: Create new Rep Circle round
     prev_round_obj = await get_round_repo(db, prev_round_id)
     next_level = prev_round_obj.level + 1
-    new_round = await create_round_repo(db, fractal_id, next_level)
-    print(f"   🆕 [STEP 3] New Rep Circle round #{new_round.id} (level {next_level})")
+    new_round = await create_round_repo(db, fractal_id, next_level, seed=round_seed(fractal, next_level), commit=False)
+    # Committed together with the round: if we die before the final commit, a resumed close discards it and starts over
+    await checkpoint_round_repo(db, prev_round_id, next_round_id=new_round.id)
 
     # Step 4: Divide reps into Rep Circles + map rep → their SINGLE Rep Circle
-    fractal = await get_fractal(db, fractal_id)
-    settings_dict = fractal.settings or {}
-    group_size = settings_dict.get("group_size", settings.GROUP_SIZE_DEFAULT)
-    print(f"   👥 [STEP 4] Rep Circle size: {group_size}")
+    group_size = group_size_for(fractal)
 
-    groups_flat = domain.divide_into_groups(unique_reps, group_size)
+    # Keep reps of the same source group apart and avoid repeat meetings
+    related = {rep_id: g.id for rep_id, g in rep_to_source_group.items()}
+    groups_flat = await _form_groups(db, fractal, new_round, unique_reps, related)
     rep_to_new_group = {}  # rep_id → single group_id
     
     new_groups = []
@@ -552,34 +910,59 @@ async def promote_to_next_round(db: AsyncSession, prev_round_id: int, fractal_id
         for uid in grp_users:
             await add_group_member_repo(db, grp.id, uid)
             rep_to_new_group[uid] = grp  # 1:1 mapping
-        print(f"         Rep Circle {i}: id={grp.id}, reps={grp_users}")
+        logger.debug("Rep Circle", extra=kv(group_id=grp.id, reps=grp_users))
         new_groups.append(grp)
 
-    # Step 5: Each rep carries to THEIR Rep Circle
-    top_count = settings.PROPOSALS_PER_USER_DEFAULT
-    print(f"\n   📈 [STEP 5] Reps carrying top {top_count} from source → their Rep Circle...")
-    
+    # Step 5: Each rep carries their share of the policy's proposals to THEIR Rep Circle
+    proposals_by_group = await get_round_proposals_repo(db, prev_round_id)
+    carried, merged = promotion.plan_promotion(
+        {rep_id: g.id for rep_id, g in rep_to_source_group.items()}, proposals_by_group, policy,
+    )
+
     promoted_count = 0
-    for rep_id, source_g in rep_to_source_group.items():
+    for rep_id, props in carried.items():
         target_grp = rep_to_new_group.get(rep_id)
         if not target_grp:
-            print(f"     ⚠️ Rep {rep_id} missing Rep Circle")
+            logger.warning("⚠️ Rep missing Rep Circle", extra=kv(rep_id=rep_id))
             continue
-            
-        top_props = await get_top_proposals_repo(db, source_g.id, top_count)
-        print(f"     Rep {rep_id}: {len(top_props)} from {source_g.id} → Rep Circle {target_grp.id}")
-        
-        for p in top_props:  # No j/enumerate needed (single target)
+
+        for p in props:
             p.round_id = new_round.id
             p.group_id = target_grp.id
             promoted_count += 1
-        
-        await db.flush()
 
+    # Duplicates stay behind in their group, pointing at the proposal that carries them;
+    # the kept card lists them so the Rep Circle sees what was merged
+    if merged:
+        by_id = {p.id: p for props in proposals_by_group.values() for p in props}
+        for dup_id, kept_id in merged.items():
+            dup, kept = by_id[dup_id], by_id[kept_id]
+            dup.meta = {**(dup.meta or {}), "merged_into": kept_id}
+            kept.meta = {**(kept.meta or {}), "merged_from": [
+                *(kept.meta or {}).get("merged_from", []),
+                {"id": dup.id, "title": dup.title, "group_id": dup.group_id},
+            ]}
+        for kept_id in set(merged.values()):
+            invalidate_card_fragments(kept_id)
+    await db.flush()
+
+    # Proposal moves and promoting → closed commit together
+    if await transition_round_repo(db, prev_round_id, ("promoting",), "closed", commit=False) is None:
+        # Someone else finished this close: drop our moves and the round built for them
+        new_round_id = new_round.id  # rollback expires new_round
+        await db.rollback()
+        await discard_round_repo(db, new_round_id)
+        logger.warning("⏭️ Round closed elsewhere, promotion dropped", extra=kv(
+            prev_round_id=prev_round_id, new_round_id=new_round_id,
+        ))
+        return None
     await db.commit()
-    print(f"   ✅ {promoted_count} proposals carried to Rep Circles")
-    print(f"   🎉 New Rep Circle round ready!")
-    print(f"{'='*60}\n")
+    logger.info("🔄 Promoted to next round", extra=kv(
+        fractal_id=fractal_id, prev_round_id=prev_round_id, new_round_id=new_round.id,
+        level=next_level, seed=new_round.seed, reps=len(unique_reps), circles=len(new_groups),
+        group_size=group_size, proposals=promoted_count, merged=len(merged),
+        policy={k: policy[k] for k in ("reps", "proposals", "merge")},
+    ))
     
     return new_round
 
@@ -730,26 +1113,305 @@ async def _promote_to_next_round(db: AsyncSession, prev_round_id: int, fractal_i
 # ----------------------------
 async def create_proposal(db: AsyncSession, fractal_id: int, group_id: int, round_id: int,
                                 title: str, body: str, creator_user_id: int):
-    # send ws to group about new proposal
-    await send_message_to_web_app_group(db, group_id, str(creator_user_id), "refresh")
-    return await add_proposal_repo(db, fractal_id, group_id, round_id, title, body, creator_user_id)
+    proposal = await add_proposal_repo(db, fractal_id, group_id, round_id, title, body, creator_user_id)
+    await enqueue_proposal_repo(db, proposal.id)
+    _progress_cache.pop(group_id, None)
+    bump_changes(group_id, round_id, fractal_id)
+    # send ws delta to group about new proposal (clients fetch just that card)
+    await send_event_to_web_app_group(db, group_id, "proposal_new", {
+        "proposal_id": proposal.id,
+        "group_id": group_id,
+    }, creator_user_id)
+    await publish_group_progress(db, group_id)
+    return proposal
 
 
 async def create_comment(db: AsyncSession, proposal_id: int, user_id: int, text: str,
                                parent_comment_id: Optional[int] = None, group_id: Optional[int] = None):
-    await send_message_to_web_app_group(db, group_id, str(user_id), "refresh")    
-    return await add_comment_repo(db, proposal_id, user_id, text, parent_comment_id, group_id)
+    comment = await add_comment_repo(db, proposal_id, user_id, text, parent_comment_id, group_id)
+    await enqueue_comment_repo(db, comment.id)
+    invalidate_card_fragments(proposal_id)
+    scope = await (get_group_scope_repo(db, group_id) if group_id else get_proposal_scope_repo(db, proposal_id))
+    if scope:
+        _progress_cache.pop(scope[0], None)
+        bump_changes(*scope)
+        # send ws delta with the comment itself, clients append the row
+        author = await get_user(db, user_id)
+        await send_event_to_web_app_group(db, scope[0], "comment_new", {
+            "proposal_id": proposal_id,
+            "comment_id": comment.id,
+            "parent_comment_id": parent_comment_id,
+            "user_id": user_id,
+            "username": author.username if author else "",
+            "avatar": f"/static/img/64_{user_id % 16 + 1}.png",
+            "text": comment.text,
+            "date": comment.created_at.strftime("%Y-%m-%d %H:%M") if comment.created_at else "just now",
+        }, user_id)
+        await publish_group_progress(db, scope[0])
+    return comment
+
+
+# ----------------------------
+# Voting progress / early close
+# ----------------------------
+# group_id -> raw counts of get_voting_progress_repo, kept current by per-vote
+# deltas; dropped (recounted on next read) on structural changes: new cards,
+# members moving, queues rebuilt, round close
+_progress_cache: Dict[int, Dict] = {}
+_progress_push_pending: set = set()  # group ids with a debounced progress push scheduled
+
+
+def _progress_consumed(group_id: int, user_id: int, consumed: int) -> None:
+    """Delta: the user voted on consumed queue items of the group."""
+    raw = _progress_cache.get(group_id)
+    if raw is None or not consumed:
+        return
+    raw["remaining"][user_id] = raw["remaining"].get(user_id, 0) - consumed
+    raw["items_consumed"] += consumed
+
+
+def _progress_medals(group_id: int, user_id: int, points: Iterable[int]) -> None:
+    """Delta: the user gave these rep medals (medals are replaced, never withdrawn)."""
+    raw = _progress_cache.get(group_id)
+    if raw is not None:
+        raw["medals"].setdefault(user_id, set()).update(points)
+
+
+async def get_voting_progress(db: AsyncSession, group_ids: List[int], fresh: bool = False) -> Dict[int, Dict]:
+    """
+    Voting progress per group (see domain.group_progress). Counted once per
+    group and then maintained by vote deltas; fresh=True recounts.
+    """
+    stale = [gid for gid in group_ids if fresh or gid not in _progress_cache]
+    if stale:
+        _progress_cache.update(await get_voting_progress_repo(db, stale))
+    out = {}
+    for gid in group_ids:
+        r = _progress_cache[gid]
+        out[gid] = domain.group_progress(
+            r["member_ids"], r["remaining"], {uid: len(p) for uid, p in r["medals"].items()},
+            r["proposals"], r["items_total"], r["items_consumed"],
+        )
+    return out
+
+
+async def publish_group_progress(db: AsyncSession, group_id: int) -> None:
+    """
+    Push the group's progress to its web app members, debounced per group: a
+    burst of votes within PROGRESS_PUSH_DEBOUNCE_SECONDS sends one event.
+    """
+    factory = _session_factory(db)
+    if factory is None or not settings.PROGRESS_PUSH_DEBOUNCE_SECONDS:
+        await _push_group_progress(db, group_id)
+        return
+    if group_id in _progress_push_pending:
+        return
+    _progress_push_pending.add(group_id)
+    await _fan_out(factory, db, _debounced_progress_push, group_id)
+
+
+async def _debounced_progress_push(db: AsyncSession, group_id: int) -> None:
+    try:
+        await asyncio.sleep(settings.PROGRESS_PUSH_DEBOUNCE_SECONDS)
+    finally:
+        _progress_push_pending.discard(group_id)  # later votes schedule the next push
+    await _push_group_progress(db, group_id)
+
+
+async def _push_group_progress(db: AsyncSession, group_id: int) -> None:
+    progress = (await get_voting_progress(db, [group_id]))[group_id]
+    await send_event_to_web_app_group(db, group_id, "progress", {"group_id": group_id, **progress})
+
+
+def early_close_policy(fractal) -> str:
+    policy = (fractal.meta or {}).get("early_close", settings.EARLY_CLOSE_POLICY)
+    return policy if policy in domain.EARLY_CLOSE_POLICIES else "off"
+
+
+async def round_ready_to_close(db: AsyncSession, round_obj, fractal) -> bool:
+    """True when the policy allows it and every group of the round has finished voting."""
+    policy = early_close_policy(fractal)
+    if policy == "off":
+        return False
+    group_ids = [g.id for g in await get_groups_for_round_repo(db, round_obj.id)]
+    progress = await get_voting_progress(db, group_ids)
+    if not domain.should_close_early(policy, round_obj.status, list(progress.values())):
+        return False
+    # Confirm against the votes themselves: fill any queue items that were never built, recount
+    await build_voting_queue_repo(db, group_ids)
+    progress = await get_voting_progress(db, group_ids, fresh=True)
+    return domain.should_close_early(policy, round_obj.status, list(progress.values()))
+
+
+# ----------------------------
+# Dashboard state
+# ----------------------------
+_dashboard_cache: "OrderedDict[tuple, tuple]" = OrderedDict()  # (telegram_id, fractal_id) -> (expires, versions, state)
+
+
+def _dashboard_versions(state: Dict) -> tuple:
+    fractal_id, group_id = state["fractal_id"], state["group_id"]
+    return (
+        change_version("fractal", fractal_id) if fractal_id else None,
+        change_version("group", group_id) if group_id and group_id > 0 else None,
+    )
+
+
+def _dashboard_state(row: Dict, fractal_id: Optional[int]) -> Dict:
+    """The cacheable part of the dashboard state, from get_dashboard_state_repo's row."""
+    user, fractal, round_ = row["user"], row["fractal"] or {}, row["round"] or {}
+    user_id = user["id"]
+    round_id = round_.get("id")
+    group_id = row["group_id"]
+    if not group_id:
+        round_id = None
+    if fractal_id and fractal_id != user["active_fractal_id"]:
+        # Browsing another fractal: its last group, as in /auth
+        group_id = round_id = -1
+
+    started_at = round_.get("started_at")
+    round_time = fractal.get("round_time")
+    round_ends_at = None
+    if started_at and round_time and round_.get("status") != "closed":
+        round_ends_at = datetime.fromisoformat(started_at) + timedelta(minutes=int(round_time))
+
+    progress = pending = rep_ballot = None
+    if group_id and group_id > 0:
+        members = row["members"]
+        progress, mine = domain.member_progress(
+            [m["user_id"] for m in members],
+            [(q["user_id"], q["item_type"], q["total"], q["consumed"]) for q in row["queue"]],
+            [(v["voter_user_id"], v["points"]) for v in row["rep_votes"]],
+            row["proposals"],
+            user_id,
+        )
+        progress = {"group_id": group_id, **progress}
+        pending = {
+            "proposals": mine["unvoted"].get(QUEUE_PROPOSAL, 0),
+            "comments": mine["unvoted"].get(QUEUE_COMMENT, 0),
+            "medals_cast": mine["medals_cast"],
+            "medals_needed": mine["medals_needed"],
+        }
+        names = {m["user_id"]: m["username"] for m in members}
+        if round_.get("status") == "closed":
+            # Closed without stored reps: left to /rep_vote_card, which can build them
+            if row["reps"]:
+                rep_ballot = _rep_results_html({r["rank"]: (r["user_id"], names.get(r["user_id"])) for r in row["reps"]})
+        else:
+            given = {v["candidate_user_id"]: v["points"] for v in row["rep_votes"] if v["voter_user_id"] == user_id}
+            rep_ballot = _rep_ballot_html(
+                [(uid, name, given.get(uid, 0)) for uid, name in names.items() if uid != user_id]
+            )
+
+    start_date = fractal.get("start_date")
+    return {
+        "user_id": user_id,
+        "username": user["username"],
+        "fractal_id": fractal.get("id"),
+        "round_id": round_id,
+        "group_id": group_id,
+        "fractal_name": fractal.get("name"),
+        "fractal_description": fractal.get("description"),
+        "fractal_start_date": (
+            datetime.fromisoformat(start_date).strftime("%Y-%m-%d %H:%M") if start_date else None
+        ),
+        "fractal_round_time": round_time,
+        "level": round_.get("level"),
+        "fractal_status": fractal.get("status"),
+        "round_status": round_.get("status"),
+        "user_status": "active" if group_id else "observer",
+        "round_ends_at": round_ends_at,
+        "progress": progress,
+        "pending": pending,
+        "rep_ballot": rep_ballot,
+    }
+
+
+def invalidate_dashboard_state(telegram_id: str) -> None:
+    """Drop a user's cached states, e.g. when their active fractal changes (not covered by the counters)."""
+    for key in [k for k in _dashboard_cache if k[0] == str(telegram_id)]:
+        del _dashboard_cache[key]
+
+
+async def get_dashboard_state(db: AsyncSession, telegram_id: str, fractal_id: Optional[int] = None) -> Optional[Dict]:
+    """
+    What the web app needs on open (fractal, round, group, time left, voting
+    progress, the user's pending votes, rep ballot HTML) from a single query.
+
+    Cached per (user, fractal) for DASHBOARD_STATE_TTL_SECONDS and dropped
+    early when the fractal's or group's change counter moves; seconds_left is
+    computed on every call. None for an unknown Telegram user.
+    """
+    key = (str(telegram_id), fractal_id or 0)
+    now = time.monotonic()
+    hit = _dashboard_cache.get(key)
+    if hit and hit[0] > now and hit[1] == _dashboard_versions(hit[2]):
+        state = hit[2]
+    else:
+        row = await get_dashboard_state_repo(db, telegram_id, fractal_id)
+        if row is None:
+            return None
+        state = _dashboard_state(row, fractal_id)
+        _dashboard_cache[key] = (now + settings.DASHBOARD_STATE_TTL_SECONDS, _dashboard_versions(state), state)
+        _dashboard_cache.move_to_end(key)
+        while len(_dashboard_cache) > settings.DASHBOARD_STATE_CACHE_SIZE:
+            _dashboard_cache.popitem(last=False)
+
+    ends = state["round_ends_at"]
+    return {
+        **state,
+        "round_ends_at": ends.isoformat() if ends else None,
+        "seconds_left": max(0, int((ends - datetime.now(timezone.utc)).total_seconds())) if ends else None,
+    }
 
 
 # ----------------------------
 # Voting Workflow
 # ----------------------------
 async def vote_proposal(db: AsyncSession, proposal_id: int, voter_user_id: int, score: int):
-    return await vote_proposal_repo(db, proposal_id, voter_user_id, score)
+    vote = await vote_proposal_repo(db, proposal_id, voter_user_id, score)
+    consumed = await consume_queue_item_repo(db, voter_user_id, QUEUE_PROPOSAL, proposal_id)
+    scope = await get_proposal_scope_repo(db, proposal_id)
+    if scope:
+        _progress_consumed(scope[0], voter_user_id, consumed)
+        bump_changes(*scope)
+        # tally = number of voters, scores stay hidden until the round closes
+        votes = await count_votes_for_proposal_repo(db, proposal_id)
+        await send_event_to_web_app_group(db, scope[0], "vote_tally", {
+            "target": "proposal", "id": proposal_id, "votes": votes,
+        }, voter_user_id)
+        await publish_group_progress(db, scope[0])
+    return vote
 
 
 async def vote_comment(db: AsyncSession, comment_id: int, voter_user_id: int, vote: int):
-    return await vote_comment_repo(db, comment_id, voter_user_id, vote)
+    comment_vote = await vote_comment_repo(db, comment_id, voter_user_id, vote)
+    consumed = await consume_queue_item_repo(db, voter_user_id, QUEUE_COMMENT, comment_id)
+    scope = await get_comment_scope_repo(db, comment_id)
+    if scope:
+        _progress_consumed(scope[0], voter_user_id, consumed)
+        bump_changes(*scope)
+        votes = await count_votes_for_comment_repo(db, comment_id)
+        await send_event_to_web_app_group(db, scope[0], "vote_tally", {
+            "target": "comment", "id": comment_id, "votes": votes,
+        }, voter_user_id)
+        await publish_group_progress(db, scope[0])
+    return comment_vote
+
+
+async def vote_representative(
+    db: AsyncSession,
+    group_id: int,
+    round_id: int,
+    voter_user_id: int,
+    candidate_user_id: int,
+    points: int,
+):
+    vote = await vote_representative_repo(db, group_id, round_id, voter_user_id, candidate_user_id, points)
+    _progress_medals(group_id, voter_user_id, [points])
+    bump_changes(group_id=group_id, round_id=round_id)
+    await publish_group_progress(db, group_id)
+    return vote
 
 
 
@@ -857,6 +1519,24 @@ async def get_proposal_comments_tree(db: AsyncSession, proposal_id: int):
 #    results = await calculate_rep_results(db, group_id, round_id)
 #    return results
 
+async def vote_representative_ballot(
+    db: AsyncSession,
+    group_id: int,
+    round_id: int,
+    voter_user_id: int,
+    ballot: Dict[int, int],
+):
+    """Gold/silver/bronze in one call: ballot = {3: gold_id, 2: silver_id, 1: bronze_id}."""
+    if voter_user_id in ballot.values():
+        raise ValueError("You cannot vote for yourself")
+    if len(set(ballot.values())) != len(ballot):
+        raise ValueError("Each medal must go to a different member")
+    votes = await vote_representative_ballot_repo(db, group_id, round_id, voter_user_id, ballot)
+    _progress_medals(group_id, voter_user_id, ballot)
+    bump_changes(group_id=group_id, round_id=round_id)
+    await publish_group_progress(db, group_id)
+    return votes
+
 async def calculate_rep_results(db: AsyncSession, group_id: int, round_id: int):
     votes = await get_rep_votes_for_round_repo(db, group_id)
     
@@ -875,6 +1555,11 @@ async def calculate_rep_results(db: AsyncSession, group_id: int, round_id: int):
     return {user_id: data for user_id, data in ranked[:3]}  # Top 3 only
 
 
+async def rank_representatives_for_round(db: AsyncSession, round_id: int):
+    """Live rep ranking for every group of a round: {group_id: {rank: user_id}}."""
+    return await rank_representatives_for_round_repo(db, round_id)
+
+
 # Add to services/fractal_service.py:
 async def get_user_by_telegram_id(db: AsyncSession, telegram_id: str):
     # Implementation using repo
@@ -895,16 +1580,143 @@ async def get_fractal_member(db: AsyncSession, user_id: int):
     return await get_fractal_member_repo(db, user_id)
 
 
+def _with_comments_cursor(card: Optional[Dict]) -> Optional[Dict]:
+    """Turn a card's comments_after sort key into the opaque comments_cursor of its "load more"."""
+    if card is not None:
+        after = card.pop("comments_after", None)
+        card["comments_cursor"] = encode_comment_cursor(*after) if after else None
+    return card
+
+
 async def get_next_card(db: AsyncSession, group_id: int, current_user_id: int) -> Optional[Dict]:
     """Service: Get next unvoted card for user."""
-    return await get_next_card_repo(db, group_id, current_user_id)
+    return _with_comments_cursor(await get_next_card_repo(db, group_id, current_user_id))
 
 async def get_all_cards(db: AsyncSession, group_id: int, current_user_id: int, fractal_id: int=-1) -> Optional[Dict]:
     """Service: Get next unvoted card for user."""
-    return await get_all_cards_repo(db, group_id, current_user_id, fractal_id)
+    cards = await get_all_cards_repo(db, group_id, current_user_id, fractal_id)
+    return [_with_comments_cursor(card) for card in cards] if cards else cards
 
 
-async def send_message_to_web_app_users(telegram_ids: list[int], text: str, event_type="message"):
+async def get_cards_page(
+    db: AsyncSession, group_id: int, fractal_id: int = -1, cursor: Optional[str] = None, limit: int = 20
+):
+    """Service: one keyset page of (unhydrated) proposals and the cursor of the next page, or None."""
+    proposals, has_more = await get_cards_page_repo(db, group_id, fractal_id, decode_cursor(cursor), limit)
+    next_cursor = None
+    if has_more and proposals:
+        last = proposals[-1]
+        next_cursor = encode_cursor(last.total_score, last.created_at, last.id)
+    return proposals, next_cursor
+
+
+def _highlight(headline: Optional[str]) -> str:
+    """Escaped headline with the search markers turned into <mark>."""
+    return (
+        html.escape(headline or "")
+        .replace(HEADLINE_START, "<mark>")
+        .replace(HEADLINE_STOP, "</mark>")
+    )
+
+
+async def search_fractal(
+    db: AsyncSession,
+    fractal_id: int,
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    kind: Optional[str] = None,
+):
+    """
+    Service: one page of full-text hits over a fractal's proposals and comments
+    (highlights as escaped HTML with <mark>) and the cursor of the next page, or None.
+    ValueError for an empty query, an unknown kind or a malformed cursor.
+    """
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("Empty search query")
+    if kind is not None and kind not in SEARCH_KINDS:
+        raise ValueError(f"Unknown kind {kind!r}, expected one of {', '.join(SEARCH_KINDS)}")
+
+    hits, has_more = await search_fractal_repo(
+        db, fractal_id, query, decode_search_cursor(cursor), limit, (kind,) if kind else SEARCH_KINDS,
+    )
+    for hit in hits:
+        hit["title_headline"] = _highlight(hit["title_headline"])
+        hit["headline"] = _highlight(hit["headline"])
+    next_cursor = None
+    if has_more and hits:
+        last = hits[-1]
+        next_cursor = encode_search_cursor(last["rank"], last["kind"], last["id"])
+    return hits, next_cursor
+
+
+EXPORT_TABLES = tuple(export_statements_repo(0))
+
+
+def stream_export(session_factory, fractal_id: int, table: str, fmt: str, chunk_size: Optional[int] = None):
+    """
+    Service: one table of a fractal's results as an async iterator of encoded
+    chunks (bytes), fetched with a server-side cursor and written chunk by chunk,
+    so memory stays flat whatever the size. Uses its own session, like stream_cards.
+    ValueError (raised here, before anything streams) for an unknown table or format.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table {table!r}, expected one of {', '.join(EXPORT_TABLES)}")
+    if fmt not in EXPORT_WRITERS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {', '.join(EXPORT_WRITERS)}")
+    stmt = export_statements_repo(fractal_id)[table]
+    columns = [c.name for c in stmt.selected_columns]
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    rows = 0
+
+    async def chunks(db):
+        nonlocal rows
+        async for part in stream_batches_repo(db, stmt, chunk_size):
+            rows += len(part)
+            yield part
+
+    async def body():
+        t0 = time.perf_counter()
+        size = 0
+        async with session_factory() as db:
+            async for data in EXPORT_WRITERS[fmt](columns, chunks(db)):
+                size += len(data)
+                yield data
+        logger.info("📦 Export streamed", extra=kv(
+            fractal_id=fractal_id, table=table, format=fmt, rows=rows, bytes=size,
+            seconds=round(time.perf_counter() - t0, 3),
+        ))
+
+    return body()
+
+
+async def stream_cards(session_factory, proposals: list, current_user_id: int):
+    """
+    Service: hydrate cards one at a time and yield them as they are ready.
+    Uses its own session, the request session may be closed while the response streams.
+    """
+    async with session_factory() as db:
+        # Top comments of the whole page in one query
+        windows = await get_comment_windows_repo(db, [p.id for p in proposals], settings.COMMENT_WINDOW_SIZE)
+        for proposal in proposals:
+            card = await hydrate_card_repo(db, proposal, current_user_id, windows.get(proposal.id, ([], None)))
+            if card:
+                yield _with_comments_cursor(card)
+
+
+async def get_comments_page(
+    db: AsyncSession, proposal_id: int, current_user_id: int, cursor: Optional[str] = None, limit: int = 20
+):
+    """Service: comments after a card's comment window, as template dicts, and the next cursor or None."""
+    comments, next_after, group_id = await get_comments_page_repo(
+        db, proposal_id, decode_comment_cursor(cursor), limit
+    )
+    next_cursor = encode_comment_cursor(*next_after) if next_after else None
+    return await comment_cards_repo(db, comments, group_id, current_user_id), next_cursor
+
+
+async def send_message_to_web_app_users(telegram_ids: list[int], text: str, event_type="message", data: Optional[Dict] = None):
     for user_id in telegram_ids:
         if(int(user_id)>=20000 and int(user_id)<300000):
             continue
@@ -919,27 +1731,35 @@ async def send_message_to_web_app_users(telegram_ids: list[int], text: str, even
             if user_id in connected_clients:
 #                print ("Sent")
                 event = {"type": event_type, "message": text, "timestamp": datetime.now(timezone.utc).isoformat()}
+                if data is not None:
+                    event["data"] = data
                 disconnected = []
                 
-                for ws in connected_clients[user_id][:]:  # Copy list
+                sockets = connected_clients[user_id][:]  # Copy list
+                SEND_QUEUE_DEPTH.inc(len(sockets), channel="websocket")
+                for ws in sockets:
                     try:
                         # ✅ CHECK IF STILL OPEN
                         if ws.client_state == WebSocketState.CONNECTED:
                             await ws.send_json(event)
-                            print("✅ send success")
+                            WEBSOCKET_SENDS.inc(result="ok")
+                            logger.debug("ws send ok", extra=sampled("ws_send", user_id=user_id, event=event_type))
                         else:
-                            print("⚠️ WS already closed")
+                            logger.debug("ws already closed", extra=sampled("ws_closed", user_id=user_id))
                             disconnected.append(ws)
                     except Exception as e:
-                        print(f"❌ send failed: {e}")
+                        WEBSOCKET_SENDS.inc(result="failed")
+                        logger.warning("ws send failed: %s", e, extra=sampled("ws_send_failed", user_id=user_id))
                         disconnected.append(ws)
+                    finally:
+                        SEND_QUEUE_DEPTH.dec(channel="websocket")
                 
                 # Cleanup
                 for ws in disconnected:
                     connected_clients[user_id].remove(ws)
 
         except Exception as e:
-            print(f"Failed to send to {user_id}: {e}")
+            logger.warning("Failed to send to %s: %s", user_id, e, extra=sampled("ws_send_failed"))
 
 
 # POLL
@@ -949,19 +1769,15 @@ async def send_message_to_web_app_users(telegram_ids: list[int], text: str, even
 from sqlalchemy.ext.asyncio import AsyncSession
 
 async def poll_worker(async_session_maker, poll_interval: int = 60):
-    print("🌀 Poll worker loop started.")
+    logger.info("🌀 Poll worker loop started", extra=kv(interval_s=poll_interval))
     while True:
         try:
             async with async_session_maker() as db:  # ✅ this creates AsyncSession
                 assert isinstance(db, AsyncSession)
-                now = datetime.now(timezone.utc)
-                print(f"🔁 Poll iteration @ {now.isoformat()}")
-                await check_fractals(db)
-                print("✅ Poll iteration done")
-        except Exception as e:
-            import traceback
-            print("💥 UNHANDLED poll error in poll_worker:", e)
-            traceback.print_exc()
+                with POLL_TICK_SECONDS.time(), query_profile("poll:check_fractals"):
+                    await check_fractals(db)
+        except Exception:
+            logger.exception("💥 Unhandled poll error in poll_worker")
         await asyncio.sleep(poll_interval)
 
 # ----------------- MAIN CHECK -----------------
@@ -973,40 +1789,41 @@ async def check_fractals(db: AsyncSession):
     Respects status changes (e.g., "vote" after half-way).
     """
     now = datetime.now(timezone.utc)
-    print(f"\n{'='*60}")
-    print(f"🕓 [Poll @ {now.isoformat()}] Checking fractals...")
-    print(f"{'='*60}")
     
     try:
         # 1. Start waiting fractals
-        print(f"   [STEP 1] Fetching waiting fractals...")
         waiting_fractals = await get_waiting_fractals_repo(db, now)
-        print(f"   ✓ Found {len(waiting_fractals)} waiting fractals")
         
         for fractal in waiting_fractals:
-            print(f"     → id={fractal.id}, name='{fractal.name}', start={fractal.start_date}")
             if fractal.start_date <= now:
-                print(f"     🚀 STARTING fractal {fractal.id}")
+                logger.info("🚀 Starting fractal", extra=kv(fractal_id=fractal.id, name=fractal.name))
                 try:
                     await start_fractal(db, fractal.id)
-                    print(f"     ✅ Started successfully")
-                except Exception as e:
-                    print(f"     ❌ Error starting: {e}")
-                    import traceback
-                    traceback.print_exc()
-
-        # 2. Check rounds
-        print(f"\n   [STEP 2] Fetching open/vote rounds...")
+                except Exception:
+                    logger.exception("❌ Error starting fractal", extra=kv(fractal_id=fractal.id))
+
+        # 2. Resume round closes interrupted by a crash or restart (before the
+        #    open-round checks, which would otherwise see a half-promoted next round)
+        for round_obj in await get_closing_rounds_repo(db):
+            logger.warning("♻️ Resuming round close", extra=kv(
+                round_id=round_obj.id, status=round_obj.status, checkpoints=round_obj.checkpoints,
+            ))
+            try:
+                await close_round(db, round_obj, reason="resumed")
+            except Exception:
+                await db.rollback()
+                logger.exception("❌ Error resuming round close", extra=kv(round_id=round_obj.id))
+
+        # 3. Check rounds
         open_rounds = await get_open_rounds_repo(db)  # Assumes includes "vote"
-        print(f"   ✓ Found {len(open_rounds)} rounds")
+        logger.debug("Poll tick", extra=kv(waiting_fractals=len(waiting_fractals), open_rounds=len(open_rounds)))
         
         for round_obj in open_rounds:
-            print(f"\n     🔍 Processing round {round_obj.id} (status={round_obj.status})...")
             
             try:
                 fractal = await get_fractal_repo(db, round_obj.fractal_id)
                 if not fractal or not fractal.meta or "round_time" not in fractal.meta:
-                    print(f"        ⏭️ Invalid fractal/meta, skipping")
+                    logger.debug("⏭️ Invalid fractal/meta, skipping", extra=kv(round_id=round_obj.id))
                     continue
                 
                 round_time_minutes = int(fractal.meta["round_time"])
@@ -1017,63 +1834,77 @@ async def check_fractals(db: AsyncSession):
                 half_way_time = round_start + half_duration
                 close_time = round_start + round_duration
                 
-                print(f"        Round time: {round_time_minutes}min ({round_duration})")
-                print(f"        Started: {round_start}")
-                print(f"        Half-way at: {half_way_time}")
-                print(f"        Close at: {close_time}")
-                print(f"        Now: {now}")
-                
+
                 # Already closed
                 if round_obj.status == "closed":
 #                    print(f"        ✅ Already closed")
                     continue
                 
-                # PRIORITY 1: Force overdue (any status, 2min grace)
+                # PRIORITY 1: Overdue (e.g. we were down through the close window, 2min grace):
+                # the full staged close, so reps, scores and the next round are not skipped
                 overdue_grace = timedelta(minutes=2)
                 if now > close_time + overdue_grace:
                     overdue_mins = (now - close_time).total_seconds() / 60
-                    print(f"        🛑 OVERDUE +{overdue_mins:.1f}min - FORCE CLOSING")
-                    await close_round_repo(db, round_obj.id)
+                    logger.warning("🛑 Round overdue, closing", extra=kv(round_id=round_obj.id, overdue_min=round(overdue_mins, 1)))
+                    await close_round(db, round_obj, reason="overdue")
+                    ROUND_CLOSE_LAG_SECONDS.observe((datetime.now(timezone.utc) - close_time).total_seconds())
+                    continue
+
+                # PRIORITY 2: Early close, every group has voted on everything
+                if await round_ready_to_close(db, round_obj, fractal):
+                    saved = (close_time - now).total_seconds()
+                    logger.info("✅ All groups voted, closing round early", extra=kv(
+                        round_id=round_obj.id, saved_min=round(saved / 60, 1),
+                    ))
+                    await close_last_round(db, fractal.id, reason="early")
+                    ROUND_TIME_SAVED_SECONDS.observe(max(0.0, saved))
                     continue
 
-                # PRIORITY 2: Half-way (5min window, ONLY "open")
+                # PRIORITY 3: Round 0 seating: late joiners every tick, seat trades once
+                if round_obj.level == 0 and round_obj.status == "open":
+                    trade_at = round_start + timedelta(minutes=settings.REBALANCE_AFTER_MINUTES)
+                    trade = (
+                        settings.REBALANCE_AFTER_MINUTES > 0 and now >= trade_at
+                        and not (round_obj.checkpoints or {}).get("rebalanced")
+                    )
+                    await rebalance_round(db, round_obj, fractal, move_members=trade)
+                    if trade:
+                        await checkpoint_round_repo(db, round_obj.id, rebalanced=True)
+
+                # PRIORITY 4: Half-way (5min window, ONLY "open")
                 half_window_start = half_way_time
                 half_window_end = half_way_time + timedelta(minutes=5)
                 if (round_obj.status == "open" and 
                     half_window_start <= now <= half_window_end):
                     mins_in = (now - half_window_start).total_seconds() / 60
-                    print(f"        🟡 HALFWAY ({mins_in:.1f}min in) - round_half_way_service")
+                    logger.info("🟡 Round half-way", extra=kv(round_id=round_obj.id, min_in=round(mins_in, 1)))
                     await round_half_way_service(db, fractal.id)  # → sets "vote"
                     await db.refresh(round_obj)
                     continue
 
-                # PRIORITY 3: Close (10min window, "open" or "vote")
+                # PRIORITY 5: Close (10min window, "open" or "vote")
                 close_window_start = close_time
                 close_window_end = close_time + timedelta(minutes=10)
                 if (round_obj.status in ("open", "vote") and
                     close_window_start <= now <= close_window_end):
                     mins_in = (now - close_window_start).total_seconds() / 60
-                    print(f"        🔴 CLOSING ({mins_in:.1f}min in) - close_last_round")
-                    await close_last_round(db, fractal.id)
+                    logger.info("🔴 Closing round", extra=kv(round_id=round_obj.id, min_in=round(mins_in, 1)))
+                    await close_last_round(db, fractal.id, reason="scheduled")
+                    ROUND_CLOSE_LAG_SECONDS.observe((datetime.now(timezone.utc) - close_time).total_seconds())
                     continue
 
                 # Active logging
                 elapsed_mins = (now - round_start).total_seconds() / 60
-                print(f"        ⏳ {round_obj.status}: {elapsed_mins:.1f}min / {round_time_minutes}min")
+                logger.debug("⏳ Round running", extra=kv(
+                    round_id=round_obj.id, status=round_obj.status,
+                    elapsed_min=round(elapsed_mins, 1), round_min=round_time_minutes,
+                ))
                 
-            except Exception as e:
-                print(f"        💥 Error processing round {round_obj.id}: {e}")
-                import traceback
-                traceback.print_exc()
+            except Exception:
+                logger.exception("💥 Error processing round", extra=kv(round_id=round_obj.id))
         
-        print(f"\n{'='*60}")
-        print(f"✅ Poll cycle complete")
-        print(f"{'='*60}\n")
-        
-    except Exception as e:
-        print(f"\n💥 CRITICAL ERROR in check_fractals: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("💥 Critical error in check_fractals")
 
 async def round_half_way_service(db, fractal_id: int):
     """
@@ -1104,6 +1935,7 @@ async def round_half_way_service(db, fractal_id: int):
         )
 
     await set_round_status_repo(db, round.id, "vote")
+    bump_round_changes(round, groups)
 
 async def rep_vote_card(db: AsyncSession, user_id: int, group_id: int, fractal_id: int = -1) -> str:
 
@@ -1117,55 +1949,26 @@ async def rep_vote_card(db: AsyncSession, user_id: int, group_id: int, fractal_i
 
     group = await get_group_repo(db, group_id)
     round = await get_round_repo(db, group.round_id)
-    print("Round Status", round.status)
+    logger.debug("rep vote card", extra=sampled("rep_vote_card", group_id=group_id, status=round.status))
 
     if (round.status == "closed"):
-        # if round is closed return the representatives total score
-        reps = await get_representatives_for_group_repo(db, group_id, round.id)
+        # if round is closed return the representatives selected at close
+        reps = await get_stored_representatives_for_group_repo(db, group_id)
+        if not reps:
+            reps = (await get_or_build_representatives_for_round_repo(db, round.id)).get(group_id, {})
         if not reps:
             members = await get_group_members(db, group_id)
-            if not members:
-                return "<div class='proposal-card rep-vote-card'><div class='instructions'>No members in group.</div></div>"
-            
-
-            html = [
-                    "<div class='proposal-card rep-vote-card'>",
-                    "<div class='instructions'>Group Members</div>",
-                ]
-            
+            names = {}
             for member in members:
                 user = await get_user(db, member.user_id)
-                avatar = f"/static/img/64_{(member.user_id % 16) + 1}.png"
-                name = user.username or f"User {member.user_id}"  # Safe: username or fallback
-                
-                html.append(f"""
-                    <div class="rep-member">
-                        <img src="{avatar}" alt="" class="proposal-comment-avatar">
-                        <span class="name">{name}</span>
-                    </div>
-                """)
-            return "\n".join(html)        
-
-
-        html = [
-            "<div class='proposal-card rep-vote-card'>",
-            "<div class='instructions'>Group Representatives 🥇 🥈 🥉</div>",
-        ]
+                names[member.user_id] = user.username if user else None
+            return _rep_members_html(names)
 
-        for rank, user_id in reps.items():
-            user = await get_user(db, user_id)
-            avatar = f"/static/img/64_{(user_id % 16) + 1}.png"
-            medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, "")
-            html.append(f"""
-                <div class="rep-member">
-                    <img src="{avatar}" alt="" class="proposal-comment-avatar">
-                    <span class="name">{user.username}</span>
-                    <span class="medal">{medal}</span>
-                </div>
-            """)
-
-        html.append("</div>")
-        return "\n".join(html)        
+        names = {}
+        for rank, rep_id in reps.items():
+            user = await get_user(db, rep_id)
+            names[rep_id] = user.username if user else None
+        return _rep_results_html({rank: (rep_id, names[rep_id]) for rank, rep_id in reps.items()})
 
     else:
         # if round open return vote card
@@ -1174,37 +1977,74 @@ async def rep_vote_card(db: AsyncSession, user_id: int, group_id: int, fractal_i
         votes = await get_user_rep_points_repo(db, group_id, user_id)
         vote_map = {v.candidate_user_id: v.points for v in votes}
 
-        html = [
-            "<div class='proposal-card rep-vote-card'>",
-            "<div class='instructions'>Group Representative: 🥇 🥈 🥉</div>",
-        ]
-
+        candidates = []
         for m in members:
-            user = await get_user(db, m.user_id)
-   #         print("rep ", user.id, user_id)
-            if user.id == user_id:
+            if m.user_id == user_id:
                 continue
-            points = vote_map.get(m.user_id, 0)
-            medal, dimmed = "", "dimmed"
-
-            if points == 3:
-                medal, dimmed = "🥇", ""
-            elif points == 2:
-                medal, dimmed = "🥈", ""
-            elif points == 1:
-                medal, dimmed = "🥉", ""
-
-            # avatar image based on user_id mod 16
-            avatar = f"/static/img/64_{(m.user_id % 16) + 1}.png"
-
-            html.append(f"""
-                <div class="rep-member" data-user-id="{m.user_id}">
-                    <img src="{avatar}" alt="" class="proposal-comment-avatar">
-                    <span class="name">{user.username}</span>
-                    <span class="medal {dimmed}">{medal}</span>
-                </div>
-            """)
-
-        html.append("</div>")
-        return "\n".join(html)
+            user = await get_user(db, m.user_id)
+            candidates.append((m.user_id, user.username if user else None, vote_map.get(m.user_id, 0)))
+        return _rep_ballot_html(candidates)
+
+
+_MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}  # by rank; ballot points are 4 - rank
+
+
+def _avatar(user_id: int) -> str:
+    # avatar image based on user_id mod 16
+    return f"/static/img/64_{(user_id % 16) + 1}.png"
+
+
+def _rep_members_html(names: Dict[int, Optional[str]]) -> str:
+    """Closed round without reps: just the group members."""
+    if not names:
+        return "<div class='proposal-card rep-vote-card'><div class='instructions'>No members in group.</div></div>"
+    html = [
+        "<div class='proposal-card rep-vote-card'>",
+        "<div class='instructions'>Group Members</div>",
+    ]
+    for uid, name in names.items():
+        html.append(f"""
+            <div class="rep-member">
+                <img src="{_avatar(uid)}" alt="" class="proposal-comment-avatar">
+                <span class="name">{name or f"User {uid}"}</span>
+            </div>
+        """)
+    return "\n".join(html)
+
+
+def _rep_results_html(reps: Dict[int, Tuple[int, Optional[str]]]) -> str:
+    """Closed round: the selected reps, {rank: (user_id, username)}."""
+    html = [
+        "<div class='proposal-card rep-vote-card'>",
+        "<div class='instructions'>Group Representatives 🥇 🥈 🥉</div>",
+    ]
+    for rank, (uid, name) in sorted(reps.items()):
+        html.append(f"""
+            <div class="rep-member">
+                <img src="{_avatar(uid)}" alt="" class="proposal-comment-avatar">
+                <span class="name">{name}</span>
+                <span class="medal">{_MEDALS.get(rank, "")}</span>
+            </div>
+        """)
+    html.append("</div>")
+    return "\n".join(html)
+
+
+def _rep_ballot_html(candidates: List[Tuple[int, Optional[str], int]]) -> str:
+    """Open round: the viewer's ballot, [(user_id, username, points given)]."""
+    html = [
+        "<div class='proposal-card rep-vote-card'>",
+        "<div class='instructions'>Group Representative: 🥇 🥈 🥉</div>",
+    ]
+    for uid, name, points in candidates:
+        medal = _MEDALS.get(4 - points, "") if points else ""
+        html.append(f"""
+            <div class="rep-member" data-user-id="{uid}">
+                <img src="{_avatar(uid)}" alt="" class="proposal-comment-avatar">
+                <span class="name">{name}</span>
+                <span class="medal {"" if medal else "dimmed"}">{medal}</span>
+            </div>
+        """)
+    html.append("</div>")
+    return "\n".join(html)
 
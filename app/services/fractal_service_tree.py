@@ -5,6 +5,8 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import infrastructure.models as models
+from infrastructure.metrics import TREE_BUILD_SECONDS
+from repositories.streaming import stream_rows_repo
 
 
 async def _get_comment_subtree(
@@ -19,8 +21,11 @@ async def _get_comment_subtree(
     User = models.User
     CommentVote = models.CommentVote
 
-    # Load all comments for this proposal (optionally limited by group)
-    stmt = select(Comment, User).join(User, Comment.user_id == User.id).where(
+    # Load all comments for this proposal (optionally limited by group), columns only
+    stmt = select(
+        Comment.id, Comment.proposal_id, Comment.parent_comment_id, Comment.user_id,
+        User.username, Comment.text, Comment.created_at,
+    ).join(User, Comment.user_id == User.id).where(
         Comment.proposal_id == proposal_id
     )
     if group_id is not None:
@@ -30,26 +35,26 @@ async def _get_comment_subtree(
     rows = res.all()
 
     # Collect comment ids
-    comment_ids = [c.id for (c, _) in rows]
+    comment_ids = [c.id for c in rows]
     votes_by_comment: Dict[int, List[Dict[str, Any]]] = {cid: [] for cid in comment_ids}
 
     if comment_ids:
-        # Load all votes on these comments with voter info
+        # Stream the votes on these comments with voter info as plain rows
         v_stmt = (
-            select(CommentVote, User)
+            select(
+                CommentVote.comment_id, CommentVote.voter_user_id, User.username,
+                CommentVote.vote, CommentVote.created_at,
+            )
             .join(User, CommentVote.voter_user_id == User.id)
             .where(CommentVote.comment_id.in_(comment_ids))
         )
-        v_res = await db.execute(v_stmt)
-        for vote, voter in v_res.all():
+        async for vote in stream_rows_repo(db, v_stmt):
             votes_by_comment.setdefault(vote.comment_id, []).append(
                 {
                     "voter_user_id": vote.voter_user_id,
-                    "voter_username": voter.username,
+                    "voter_username": vote.username,
                     "vote": vote.vote,
-                    "created_at": vote.created_at.isoformat()
-                    if getattr(vote, "created_at", None)
-                    else None,
+                    "created_at": vote.created_at.isoformat() if vote.created_at else None,
                 }
             )
 
@@ -57,13 +62,13 @@ async def _get_comment_subtree(
     by_id: Dict[int, Dict[str, Any]] = {}
     roots: List[Dict[str, Any]] = []
 
-    for c, user in rows:
+    for c in rows:
         node = {
             "comment_id": c.id,
             "proposal_id": c.proposal_id,
             "parent_comment_id": c.parent_comment_id,
             "user_id": c.user_id,
-            "username": user.username,
+            "username": c.username,
             "text": c.text,
             "created_at": c.created_at.isoformat() if c.created_at else None,
             "votes": votes_by_comment.get(c.id, []),
@@ -72,7 +77,7 @@ async def _get_comment_subtree(
         by_id[c.id] = node
 
     # Nest by parent_comment_id
-    for c, _ in rows:
+    for c in rows:
         node = by_id[c.id]
         if c.parent_comment_id is None:
             roots.append(node)
@@ -97,9 +102,13 @@ async def _get_proposal_subtree_for_group(
     User = models.User
     ProposalVote = models.ProposalVote
 
-    # Proposals with creator user
+    # Proposals with creator user, columns only
     stmt = (
-        select(Proposal, User)
+        select(
+            Proposal.id, Proposal.fractal_id, Proposal.group_id, Proposal.round_id,
+            Proposal.creator_user_id, User.username.label("creator_username"),
+            Proposal.title, Proposal.body, Proposal.created_at,
+        )
         .join(User, Proposal.creator_user_id == User.id)
         .where(
             Proposal.group_id == group_id,
@@ -110,8 +119,7 @@ async def _get_proposal_subtree_for_group(
 
     res = await db.execute(stmt)
     rows = res.all()
-    proposals = [p for (p, _) in rows]
-    proposal_ids = [p.id for p in proposals]
+    proposal_ids = [p.id for p in rows]
 
     # Per-voter scores
     votes_by_proposal: Dict[int, List[Dict[str, Any]]] = {
@@ -120,25 +128,25 @@ async def _get_proposal_subtree_for_group(
 
     if proposal_ids:
         v_stmt = (
-            select(ProposalVote, User)
+            select(
+                ProposalVote.proposal_id, ProposalVote.voter_user_id, User.username,
+                ProposalVote.score, ProposalVote.created_at,
+            )
             .join(User, ProposalVote.voter_user_id == User.id)
             .where(ProposalVote.proposal_id.in_(proposal_ids))
         )
-        v_res = await db.execute(v_stmt)
-        for vote, voter in v_res.all():
+        async for vote in stream_rows_repo(db, v_stmt):
             votes_by_proposal.setdefault(vote.proposal_id, []).append(
                 {
                     "voter_user_id": vote.voter_user_id,
-                    "voter_username": voter.username,
+                    "voter_username": vote.username,
                     "score": vote.score,
-                    "created_at": vote.created_at.isoformat()
-                    if getattr(vote, "created_at", None)
-                    else None,
+                    "created_at": vote.created_at.isoformat() if vote.created_at else None,
                 }
             )
 
     result: List[Dict[str, Any]] = []
-    for p, creator in rows:
+    for p in rows:
         comments_tree = await _get_comment_subtree(
             db,
             proposal_id=p.id,
@@ -151,7 +159,7 @@ async def _get_proposal_subtree_for_group(
                 "group_id": p.group_id,
                 "round_id": p.round_id,
                 "creator_user_id": p.creator_user_id,
-                "creator_username": creator.username,
+                "creator_username": p.creator_username,
                 "title": p.title,
                 "body": p.body,
                 "created_at": p.created_at.isoformat() if p.created_at else None,
@@ -173,39 +181,38 @@ async def _get_group_subtree_for_round(
 
     # Groups in this round
     g_res = await db.execute(
-        select(Group).where(
+        select(Group.id).where(
             Group.fractal_id == fractal_id,
             Group.round_id == round_id,
         )
     )
-    groups = g_res.scalars().all()
+    group_ids = g_res.scalars().all()
 
     result: List[Dict[str, Any]] = []
-    for g in groups:
+    for group_id in group_ids:
         # Members with usernames
         gm_res = await db.execute(
-            select(GroupMember, User)
+            select(GroupMember.user_id, User.username)
             .join(User, GroupMember.user_id == User.id)
-            .where(GroupMember.group_id == g.id)
+            .where(GroupMember.group_id == group_id)
         )
-        gm_rows = gm_res.all()
         members = [
             {
                 "user_id": gm.user_id,
-                "username": user.username,
+                "username": gm.username,
             }
-            for gm, user in gm_rows
+            for gm in gm_res.all()
         ]
 
         proposals = await _get_proposal_subtree_for_group(
             db,
-            group_id=g.id,
+            group_id=group_id,
             round_id=round_id,
         )
 
         result.append(
             {
-                "group_id": g.id,
+                "group_id": group_id,
                 "round_id": round_id,
                 "fractal_id": fractal_id,
                 "members": members,
@@ -220,6 +227,15 @@ async def build_fractal_tree(
     db: AsyncSession,
     fractal_id: int,
     round_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    with TREE_BUILD_SECONDS.time():
+        return await _build_fractal_tree(db, fractal_id, round_id)
+
+
+async def _build_fractal_tree(
+    db: AsyncSession,
+    fractal_id: int,
+    round_id: Optional[int] = None,
 ) -> Dict[str, Any]:
     Round = models.Round
 
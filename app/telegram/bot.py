@@ -6,6 +6,7 @@ from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from config.settings import settings
 from telegram.handlers.fractal_telegram import router as fractal_router
+from telegram.middleware import QueryProfileMiddleware
 
 from aiogram import Bot, Dispatcher
 from aiogram.types import Update
@@ -31,6 +32,10 @@ def get_bot_and_dispatcher() -> tuple[Bot, Dispatcher]:
     dp = Dispatcher(storage=MemoryStorage())  # do not bind bot here
     dp.include_router(fractal_router)
 
+    # SQL query count / DB time per handler
+    for observer in (fractal_router.message, fractal_router.callback_query, fractal_router.inline_query):
+        observer.middleware(QueryProfileMiddleware())
+
     
 #    dp.include_router(proposal_router)
 #    dp.include_router(callback_router)
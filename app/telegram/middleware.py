@@ -0,0 +1,27 @@
+# telegram/middleware.py
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from infrastructure.db.query_profiler import start_query_profile, finish_query_profile
+
+
+class QueryProfileMiddleware(BaseMiddleware):
+    """Inner middleware: profiles SQL per handler as "tg:<handler name>"."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        callback = getattr(handler_object, "callback", None)
+        name = f"tg:{getattr(callback, '__name__', type(event).__name__)}"
+
+        profile, token = start_query_profile(name)
+        try:
+            return await handler(event, data)
+        finally:
+            finish_query_profile(profile, token)
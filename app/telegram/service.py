@@ -6,19 +6,53 @@ from sqlalchemy import select
 from config.settings import settings
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, WebAppInfo
 import os
+import time
+import logging
+from infrastructure.logging_setup import sampled
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError
+from infrastructure.metrics import TELEGRAM_SEND_SECONDS, TELEGRAM_SEND_ERRORS, SEND_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
 
 bot = Bot(token=settings.bot_token)
 
+
+async def _send_message(**kwargs):
+    """bot.send_message with latency / error metrics."""
+    start = time.perf_counter()
+    try:
+        return await bot.send_message(**kwargs)
+    except TelegramRetryAfter:
+        TELEGRAM_SEND_ERRORS.inc(error="retry_after")
+        raise
+    except TelegramForbiddenError:
+        TELEGRAM_SEND_ERRORS.inc(error="forbidden")
+        raise
+    except Exception:
+        TELEGRAM_SEND_ERRORS.inc(error="other")
+        raise
+    finally:
+        TELEGRAM_SEND_SECONDS.observe(time.perf_counter() - start)
+        SEND_QUEUE_DEPTH.dec(channel="telegram")
+
+
+def _queue(telegram_ids) -> list:
+    """Real (non-test) recipients; adds them to the telegram send queue depth."""
+    ids = [u for u in telegram_ids if not (20000 <= int(u) < 300000)]
+    SEND_QUEUE_DEPTH.inc(len(ids), channel="telegram")
+    return ids
+
 async def send_message_to_telegram_users(telegram_ids: list[int], text: str):
+    telegram_ids = _queue(telegram_ids)
     for user_id in telegram_ids:
         if(int(user_id)>=20000 and int(user_id)<300000):
             continue
         try:
 #            print("Sending message to telegram", user_id)
 #            print(f"[PID {os.getpid()}]")
-            await bot.send_message(chat_id=user_id, text=text)
+            await _send_message(chat_id=user_id, text=text)
         except Exception as e:
-            print(f"Failed to send to {user_id}: {e}")
+            logger.warning("Failed to send to %s: %s", user_id, e, extra=sampled("tg_send_failed"))
 
 
 async def send_button_to_telegram_users(
@@ -29,6 +63,7 @@ async def send_button_to_telegram_users(
     data: int,
 ) -> None:
     
+    telegram_ids = _queue(telegram_ids)
     if (button=="Fractal App"):
         url = f"{settings.public_base_url}/api/v1/fractals/dashboard?fractal_id={fractal_id}"
         keyboard = InlineKeyboardMarkup(
@@ -45,7 +80,7 @@ async def send_button_to_telegram_users(
                 continue
 
             try:
-                await bot.send_message(
+                await _send_message(
                     chat_id=user_id,
                     text=text,
                     reply_markup=keyboard,
@@ -55,7 +90,7 @@ async def send_button_to_telegram_users(
 
 
             except Exception as e:
-                print(f"Failed to send to {user_id}: {e}")
+                logger.warning("Failed to send to %s: %s", user_id, e, extra=sampled("tg_send_failed"))
     else:
 
         for user_id in telegram_ids:
@@ -63,10 +98,10 @@ async def send_button_to_telegram_users(
                 continue
 
             try:
-                await bot.send_message(
+                await _send_message(
                     chat_id=user_id,
                     text=text,
                 )
 
             except Exception as e:
-                print(f"Failed to send to {user_id}: {e}")
+                logger.warning("Failed to send to %s: %s", user_id, e, extra=sampled("tg_send_failed"))
@@ -0,0 +1,506 @@
+"""
+Load test / benchmark harness for a full fractal round.
+
+Drives N simulated users through join → start_fractal → proposals → comments →
+votes → rep ballots → close_last_round via the service layer (each operation
+in its own session, `--concurrency` at a time). With --base-url, proposals,
+comments, votes and rep ballots go through the HTTP API instead ("http.*"
+operations) and card polling is measured over HTTP as well; join, start and
+close have no HTTP endpoint and stay in-process. Reports p50/p95/p99 latency
+and queries per operation plus wall time for start_fractal / close_last_round,
+and saves everything as JSON. HTTP query counts come from the X-DB-Queries
+header, which the server only sends with ENV=development.
+
+Run inside the app container (PYTHONPATH=/app), no input() pauses:
+
+    python -m tests.benchmark_fractal --users 1000 --out bench_1k.json
+    python -m tests.benchmark_fractal --users 10000 --compare bench_1k.json
+
+For --base-url the server must use the same database:
+    DATABASE_URL=postgresql+asyncpg://fractal_user:fractal_pass@db:5432/bench_fractal_db
+
+Simulated telegram ids start at 30000, so Telegram/web app sends are skipped.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import asyncpg
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from infrastructure.db.schema import apply_schema_upgrades
+from infrastructure.models import Base, Fractal
+from services.fractal_service import (
+    close_last_round,
+    create_comment,
+    create_fractal,
+    create_proposal,
+    get_all_cards,
+    get_group_members,
+    get_groups_for_round,
+    get_next_card,
+    join_fractal,
+    start_fractal,
+    vote_comment,
+    vote_proposal,
+    vote_representative_ballot,
+)
+
+BENCH_DATABASE_URL = os.getenv(
+    "BENCH_DATABASE_URL",
+    "postgresql+asyncpg://fractal_user:fractal_pass@db:5432/bench_fractal_db",
+)
+SIM_TELEGRAM_ID_START = 30000
+API_PREFIX = "/api/v1/fractals"
+
+
+# ----------------------------
+# Database setup
+# ----------------------------
+async def recreate_bench_db(database_url: str):
+    base, db_name = database_url.replace("+asyncpg", "").rsplit("/", 1)
+    conn = await asyncpg.connect(f"{base}/postgres")
+    await conn.execute(
+        """
+        SELECT pg_terminate_backend(pid)
+        FROM pg_stat_activity
+        WHERE datname = $1 AND pid <> pg_backend_pid();
+        """,
+        db_name,
+    )
+    await conn.execute(f'DROP DATABASE IF EXISTS "{db_name}";')
+    await conn.execute(f'CREATE DATABASE "{db_name}";')
+    await conn.close()
+    print(f"🗄️  Database '{db_name}' recreated")
+
+
+async def create_tables(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await apply_schema_upgrades(conn)
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = math.ceil(p / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(k, len(sorted_values) - 1))]
+
+
+class Bench:
+    """
+    Runs operations in their own connection + session and records
+    (latency, queries) per operation name. Queries are counted with a
+    before_cursor_execute listener keyed on the checked-out connection,
+    so concurrent operations never mix up their counts.
+    """
+
+    def __init__(self, engine, concurrency: int):
+        self.engine = engine
+        self.sem = asyncio.Semaphore(concurrency)
+        self.samples: Dict[str, List[tuple]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count_query)
+
+    @staticmethod
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        counter = conn.info.get("bench_counter")
+        if counter is not None:
+            counter[0] += 1
+
+    async def _measured(self, fn: Callable[[AsyncSession], Awaitable[Any]]):
+        counter = [0]
+        async with self.engine.connect() as conn:
+            conn.info["bench_counter"] = counter
+            session = AsyncSession(bind=conn, expire_on_commit=False)
+            start = time.perf_counter()
+            try:
+                result = await fn(session)
+            finally:
+                elapsed = time.perf_counter() - start
+                conn.info.pop("bench_counter", None)
+                await session.close()
+        return result, elapsed, counter[0]
+
+    async def run(self, op: str, fn: Callable[[AsyncSession], Awaitable[Any]]):
+        async with self.sem:
+            try:
+                result, elapsed, queries = await self._measured(fn)
+            except Exception as e:
+                self.errors[op] += 1
+                if self.errors[op] <= 3:
+                    print(f"   ❌ {op}: {e}")
+                return None
+        self.samples[op].append((elapsed, queries))
+        return result
+
+    async def run_all(self, op: str, fns: List[Callable[[AsyncSession], Awaitable[Any]]]):
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self.run(op, fn) for fn in fns))
+        print(f"   ✓ {op}: {len(fns)} ops in {time.perf_counter() - started:.2f}s")
+        return results
+
+    async def phase(self, name: str, fn: Callable[[AsyncSession], Awaitable[Any]]):
+        """A single big operation (start_fractal, close_last_round): wall time + queries."""
+        result, elapsed, queries = await self._measured(fn)
+        self.phases[name] = {"wall_s": round(elapsed, 4), "queries": queries}
+        print(f"   ⏱️ {name}: {elapsed:.2f}s, {queries} queries")
+        return result
+
+    async def run_http(self, op: str, client, method: str, url: str, **kwargs):
+        async with self.sem:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+            except Exception as e:
+                self.errors[op] += 1
+                if self.errors[op] <= 3:
+                    print(f"   ❌ {op}: {e}")
+                return None
+            # Server-side query count from the profiler header (development only)
+            queries = response.headers.get("x-db-queries")
+            self.samples[op].append((time.perf_counter() - start, int(queries) if queries else None))
+            return response
+
+    def report(self) -> Dict[str, Any]:
+        operations = {}
+        for op, samples in sorted(self.samples.items()):
+            latencies = sorted(s[0] for s in samples)
+            queries = [s[1] for s in samples if s[1] is not None]
+            operations[op] = {
+                "count": len(samples),
+                "errors": self.errors.get(op, 0),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2),
+                "queries_per_op": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        return {"operations": operations, "phases": self.phases}
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    base_ops = (baseline or {}).get("operations", {})
+    base_phases = (baseline or {}).get("phases", {})
+
+    def delta(new, old):
+        if old in (None, 0) or new is None:
+            return ""
+        return f" ({(new - old) / old * 100:+.0f}%)"
+
+    print(f"\n{'📊 BENCHMARK' :=^96}")
+    print(f"{'operation':<28}{'count':>8}{'err':>5}{'p50 ms':>16}{'p95 ms':>16}{'p99 ms':>16}{'q/op':>7}")
+    for op, r in report["operations"].items():
+        old = base_ops.get(op, {})
+        print(
+            f"{op:<28}{r['count']:>8}{r['errors']:>5}"
+            f"{str(r['p50_ms']) + delta(r['p50_ms'], old.get('p50_ms')):>16}"
+            f"{str(r['p95_ms']) + delta(r['p95_ms'], old.get('p95_ms')):>16}"
+            f"{str(r['p99_ms']) + delta(r['p99_ms'], old.get('p99_ms')):>16}"
+            f"{'-' if r['queries_per_op'] is None else r['queries_per_op']:>7}"
+        )
+    for name, r in report["phases"].items():
+        old = base_phases.get(name, {})
+        print(
+            f"{name:<28} wall {r['wall_s']}s{delta(r['wall_s'], old.get('wall_s'))}"
+            f", {r['queries']} queries{delta(r['queries'], old.get('queries'))}"
+        )
+    print("=" * 96)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+# ----------------------------
+# Scenario
+# ----------------------------
+async def run_benchmark(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    await recreate_bench_db(args.database_url)
+    engine = create_async_engine(
+        args.database_url,
+        echo=False,
+        pool_size=args.concurrency,
+        max_overflow=args.concurrency,
+    )
+    await create_tables(engine)
+    bench = Bench(engine, args.concurrency)
+    client = None
+    if args.base_url:
+        import httpx
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    started = time.perf_counter()
+
+    # 1. Fractal far in the future with a long round, so a running poll worker never touches it
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        fractal = await create_fractal(
+            db,
+            name=f"Benchmark {args.users}",
+            description="benchmark_fractal.py",
+            start_date=datetime.now(timezone.utc) + timedelta(days=365),
+            status="waiting",
+            settings={"group_size": args.group_size, "round_time": 24 * 60},
+        )
+        # start_round reads group_size from Fractal.settings
+        db_fractal = await db.get(Fractal, fractal.id)
+        db_fractal.settings = {"group_size": args.group_size, "seed": args.seed}  # same groups every run
+        await db.commit()
+    fractal_id = fractal.id
+    print(f"🌱 Fractal {fractal_id}: {args.users} users, group size {args.group_size}")
+
+    # 2. Join
+    users = await bench.run_all("join_fractal", [
+        (lambda db, i=i: join_fractal(
+            db,
+            {"username": f"bench_user{i + 1}", "telegram_id": str(SIM_TELEGRAM_ID_START + i)},
+            fractal_id,
+        ))
+        for i in range(args.users)
+    ])
+    user_ids = [u.id for u in users if u]
+
+    # 3. Start
+    round0 = await bench.phase("start_fractal", lambda db: start_fractal(db, fractal_id))
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        groups = await get_groups_for_round(db, round0.id)
+        members_by_group = {
+            g.id: [m.user_id for m in await get_group_members(db, g.id)]
+            for g in groups
+        }
+    print(f"👥 {len(groups)} groups")
+
+    # 4. Proposals
+    proposal_jobs = []
+    for g in groups:
+        for author in members_by_group[g.id][:args.proposals_per_group]:
+            proposal_jobs.append((g.id, author))
+    proposals = await run_writes(bench, client, "create_proposal", [
+        (
+            lambda db, g_id=g_id, author=author: create_proposal(
+                db, fractal_id, g_id, round0.id,
+                f"Bench proposal by {author}", "Benchmark proposal body " * 8, author,
+            ),
+            ("/create_proposal", {
+                "fractal_id": fractal_id, "group_id": g_id, "round_id": round0.id,
+                "title": f"Bench proposal by {author}", "body": "Benchmark proposal body " * 8,
+                "creator_user_id": author,
+            }, "proposal"),
+        )
+        for g_id, author in proposal_jobs
+    ])
+    proposals_by_group = defaultdict(list)
+    for p in proposals:
+        if p:
+            proposals_by_group[p.group_id].append(p)
+
+    # 5. Comments
+    comment_jobs = []
+    for g_id, g_proposals in proposals_by_group.items():
+        members = members_by_group[g_id]
+        for p in g_proposals:
+            for _ in range(args.comments_per_proposal):
+                comment_jobs.append((g_id, p.id, rng.choice(members)))
+    comments = await run_writes(bench, client, "create_comment", [
+        (
+            lambda db, g_id=g_id, p_id=p_id, author=author: create_comment(
+                db, p_id, author, f"Bench comment by {author}", None, g_id,
+            ),
+            ("/create_comment", {
+                "proposal_id": p_id, "user_id": author, "group_id": g_id, "text": f"Bench comment by {author}",
+            }, "comment"),
+        )
+        for g_id, p_id, author in comment_jobs
+    ])
+    comments_by_group = defaultdict(list)
+    for c in comments:
+        if c:
+            comments_by_group[c.group_id].append(c)
+
+    # 6. Reads while the round is open
+    readers = rng.sample(
+        [(g.id, uid) for g in groups for uid in members_by_group[g.id]],
+        min(args.read_sample, len(user_ids)),
+    )
+    await bench.run_all("get_next_card", [
+        (lambda db, g_id=g_id, uid=uid: get_next_card(db, g_id, uid)) for g_id, uid in readers
+    ])
+    await bench.run_all("get_all_cards", [
+        (lambda db, g_id=g_id, uid=uid: get_all_cards(db, g_id, uid, fractal_id)) for g_id, uid in readers
+    ])
+    if client is not None:
+        await run_http_reads(bench, client, readers, fractal_id)
+
+    # 7. Votes: every member rates every other member's proposal/comment in their group
+    proposal_votes = [
+        (p.id, uid, rng.randint(1, 10))
+        for g_id, g_proposals in proposals_by_group.items()
+        for p in g_proposals
+        for uid in members_by_group[g_id]
+        if uid != p.creator_user_id
+    ]
+    await run_writes(bench, client, "vote_proposal", [
+        (
+            lambda db, p_id=p_id, uid=uid, score=score: vote_proposal(db, p_id, uid, score),
+            ("/vote_proposal", {"proposal_id": p_id, "voter_user_id": uid, "score": score}, "vote"),
+        )
+        for p_id, uid, score in proposal_votes
+    ])
+    comment_votes = [
+        (c.id, uid, rng.randint(1, 3))
+        for g_id, g_comments in comments_by_group.items()
+        for c in g_comments
+        for uid in members_by_group[g_id]
+        if uid != c.user_id
+    ]
+    await run_writes(bench, client, "vote_comment", [
+        (
+            lambda db, c_id=c_id, uid=uid, vote=vote: vote_comment(db, c_id, uid, vote),
+            ("/vote_comment", {"comment_id": c_id, "voter_user_id": uid, "vote": vote}, "vote"),
+        )
+        for c_id, uid, vote in comment_votes
+    ])
+    ballot_jobs = []
+    for g in groups:
+        members = members_by_group[g.id]
+        for uid in members:
+            others = [m for m in members if m != uid]
+            if len(others) >= 3:
+                gold, silver, bronze = rng.sample(others, 3)
+                ballot_jobs.append((g.id, uid, {3: gold, 2: silver, 1: bronze}))
+    await run_writes(bench, client, "vote_representative_ballot", [
+        (
+            lambda db, g_id=g_id, uid=uid, ballot=ballot: vote_representative_ballot(db, g_id, round0.id, uid, ballot),
+            ("/vote_representative_ballot", {
+                "group_id": g_id, "round_id": round0.id, "voter_user_id": uid, "ballot": ballot,
+            }, "votes"),
+        )
+        for g_id, uid, ballot in ballot_jobs
+    ])
+
+    # 8. Close (scores, reps, promotion)
+    await bench.phase("close_last_round", lambda db: close_last_round(db, fractal_id))
+
+    if client is not None:
+        await client.aclose()
+    await engine.dispose()
+    report = bench.report()
+    report["meta"] = {
+        "users": args.users,
+        "group_size": args.group_size,
+        "groups": len(groups),
+        "proposals": sum(len(v) for v in proposals_by_group.values()),
+        "comments": sum(len(v) for v in comments_by_group.values()),
+        "concurrency": args.concurrency,
+        "seed": args.seed,
+        "http": bool(args.base_url),
+        "git": git_revision(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "total_wall_s": round(time.perf_counter() - started, 2),
+    }
+    return report
+
+
+async def run_writes(
+    bench: Bench,
+    client,
+    op: str,
+    jobs: List[Tuple[Callable[[AsyncSession], Awaitable[Any]], Tuple[str, Dict[str, Any], str]]],
+) -> List[Any]:
+    """
+    jobs: (service call, (API path, JSON body, result key)). Through the HTTP
+    API as "http.<op>" when a client is given, results rebuilt from the JSON
+    (attribute access like the ORM objects), else through the service layer.
+    """
+    if client is None:
+        return await bench.run_all(op, [fn for fn, _ in jobs])
+
+    async def post(path: str, body: Dict[str, Any], key: str):
+        response = await bench.run_http(f"http.{op}", client, "POST", f"{API_PREFIX}{path}", json=body)
+        if response is None:
+            return None
+        result = response.json().get(key)
+        return SimpleNamespace(**result) if isinstance(result, dict) else result
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(post(*http) for _, http in jobs))
+    print(f"   ✓ http.{op}: {len(jobs)} ops in {time.perf_counter() - started:.2f}s")
+    return results
+
+
+async def run_http_reads(bench: Bench, client, readers, fractal_id: int):
+    """Card polling through the API: a full GET, then the conditional re-poll."""
+    async def poll(g_id: int, uid: int):
+        params = {"group_id": g_id, "user_id": uid, "fractal_id": fractal_id}
+        first = await bench.run_http("http.get_all_cards", client, "GET", f"{API_PREFIX}/get_all_cards", params=params)
+        etag = first.headers.get("etag") if first is not None else None
+        if etag:
+            await bench.run_http(
+                "http.get_all_cards_304", client, "GET", f"{API_PREFIX}/get_all_cards",
+                params=params, headers={"If-None-Match": etag},
+            )
+        await bench.run_http(
+            "http.get_next_card", client, "GET", f"{API_PREFIX}/get_next_card",
+            params={"group_id": g_id, "user_id": uid},
+        )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(poll(g_id, uid) for g_id, uid in readers))
+    print(f"   ✓ http reads: {len(readers)} users in {time.perf_counter() - started:.2f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fractal load test / benchmark")
+    parser.add_argument("--users", type=int, default=1000, help="simulated users (1k-50k)")
+    parser.add_argument("--group-size", type=int, default=7)
+    parser.add_argument("--proposals-per-group", type=int, default=2)
+    parser.add_argument("--comments-per-proposal", type=int, default=2)
+    parser.add_argument("--read-sample", type=int, default=200, help="users polling cards")
+    parser.add_argument("--concurrency", type=int, default=20, help="operations in flight (= DB connections)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--database-url", default=BENCH_DATABASE_URL, help="dropped and recreated!")
+    parser.add_argument("--base-url", default=None, help="write and poll through the HTTP API, e.g. http://localhost:8030")
+    parser.add_argument("--out", default=None, help="JSON results file (default benchmark_<users>.json)")
+    parser.add_argument("--compare", default=None, help="previous JSON results to diff against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    out = args.out or f"benchmark_{args.users}.json"
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Saved {out}")
+
+
+if __name__ == "__main__":
+    main()
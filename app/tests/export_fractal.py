@@ -0,0 +1,43 @@
+"""
+Export a fractal's full results to files, streamed with server-side cursors
+(same code path as GET /export/{fractal_id}/{table}).
+
+    python -m tests.export_fractal 7
+    python -m tests.export_fractal 7 --format columnar --out exports/ --tables proposals proposal_votes
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from infrastructure.db.session import AsyncSessionLocal
+from services.export_formats import FORMATS
+from services.fractal_service import EXPORT_TABLES, stream_export
+
+
+async def export(fractal_id: int, fmt: str, out: str, tables, chunk_size: int):
+    os.makedirs(out, exist_ok=True)
+    for table in tables:
+        path = os.path.join(out, f"fractal_{fractal_id}_{table}.{FORMATS[fmt][1]}")
+        t0 = time.perf_counter()
+        size = 0
+        with open(path, "wb") as f:
+            async for data in stream_export(AsyncSessionLocal, fractal_id, table, fmt, chunk_size):
+                f.write(data)
+                size += len(data)
+        print(f"📦 {path}: {size / 1024:.0f} KiB in {time.perf_counter() - t0:.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a fractal's results")
+    parser.add_argument("fractal_id", type=int)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--out", default=".")
+    parser.add_argument("--tables", nargs="+", choices=EXPORT_TABLES, default=list(EXPORT_TABLES))
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args(argv)
+    asyncio.run(export(args.fractal_id, args.format, args.out, args.tables, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Replay a round's group assignment from its stored seed.
+
+Regenerates the groups with the same inputs the round was formed with
+(members or promoted reps, co-member history before the round, prefs) and
+reports whether they match what is stored. Exit code 1 on a mismatch.
+
+    python -m tests.replay_round 42
+    python -m tests.replay_round 42 --show
+"""
+import argparse
+import asyncio
+import sys
+
+from infrastructure.db.session import AsyncSessionLocal
+from services.fractal_service import replay_round_groups
+
+
+async def replay(round_id: int, show: bool) -> bool:
+    async with AsyncSessionLocal() as db:
+        result = await replay_round_groups(db, round_id)
+
+    mark = "✅" if result["match"] else "❌"
+    print(f"{mark} Round {round_id} (level {result['level']}, seed {result['seed']}): "
+          f"{len(result['actual'])} groups, match={result['match']}")
+    expected = {tuple(g) for g in result["expected"]}
+    actual = {tuple(g) for g in result["actual"]}
+    for g in sorted(actual - expected) if show else []:
+        print(f"   stored only:   {list(g)}")
+    for g in sorted(expected - actual) if show else []:
+        print(f"   replayed only: {list(g)}")
+    return result["match"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a round's groups from its seed")
+    parser.add_argument("round_id", type=int)
+    parser.add_argument("--show", action="store_true", help="print the groups that differ")
+    args = parser.parse_args(argv)
+    sys.exit(0 if asyncio.run(replay(args.round_id, args.show)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,174 @@
+import asyncio
+from types import SimpleNamespace
 
+from domain.promotion import plan_promotion, resolve_policy, select_reps
+from domain.similarity import near_duplicate_clusters
+from services.export_formats import columnar_chunks, csv_chunks, read_columnar
+from domain.fractal_logic import (
+    derive_seed,
+    divide_into_groups,
+    group_progress,
+    grouping_conflicts,
+    member_progress,
+    plan_rebalance,
+    required_medals,
+    should_close_early,
+)
+
+
+def test_required_medals():
+    assert required_medals(1) == 0
+    assert required_medals(2) == 1
+    assert required_medals(7) == 3
+
+
+def test_group_progress_complete():
+    p = group_progress([1, 2, 3], {}, {1: 2, 2: 2, 3: 2}, proposal_count=2, items_total=6, items_consumed=6)
+    assert p["members_done"] == 3
+    assert p["votes_cast"] == p["votes_total"] == 12
+    assert p["complete"]
+
+
+def test_group_progress_pending_votes_and_medals():
+    p = group_progress([1, 2, 3], {2: 1}, {1: 2, 2: 2, 3: 1}, proposal_count=2, items_total=6, items_consumed=5)
+    assert p["members_done"] == 1
+    assert not p["complete"]
+
+
+def test_group_without_proposals_is_not_complete():
+    assert not group_progress([1, 2], {}, {1: 1, 2: 1}, 0, 0, 0)["complete"]
+
+
+def test_member_progress_from_raw_rows():
+    queue = [(1, 0, 2, 2), (1, 1, 3, 1), (2, 0, 2, 2), (2, 1, 3, 3), (3, 0, 2, 2), (3, 1, 3, 3)]
+    votes = [(1, 2), (1, 1), (2, 2), (2, 1), (3, 2), (3, 1), (3, 1)]
+    progress, mine = member_progress([1, 2, 3], queue, votes, 2, user_id=1)
+    assert progress == group_progress([1, 2, 3], {1: 2, 2: 0, 3: 0}, {1: 2, 2: 2, 3: 2}, 2, 15, 13)
+    assert mine == {"unvoted": {0: 0, 1: 2}, "medals_cast": 2, "medals_needed": 2}
+
+
+def test_should_close_early_policies():
+    done = [{"complete": True}, {"complete": True}]
+    assert not should_close_early("off", "vote", done)
+    assert not should_close_early("vote_phase", "open", done)
+    assert should_close_early("vote_phase", "vote", done)
+    assert should_close_early("any_time", "open", done)
+    assert not should_close_early("any_time", "vote", done + [{"complete": False}])
+    assert not should_close_early("any_time", "vote", [])
+
+
+def test_divide_into_groups_avoids_repeats_and_related():
+    users = list(range(49))
+    history = {u: set() for u in users}
+    for g in divide_into_groups(list(users), 7, seed=1):
+        for a in g:
+            history[a].update(b for b in g if b != a)
+    related = {u: u % 7 for u in users}
+    groups = divide_into_groups(list(users), 7, history=history, related=related, seed=2)
+    assert sorted(u for g in groups for u in g) == users
+    assert [len(g) for g in groups] == [7] * 7
+    shuffled = divide_into_groups(list(users), 7, seed=2)
+    conflicts = grouping_conflicts(groups, history, related)
+    assert conflicts["related"] == 0
+    assert conflicts["repeats"] < grouping_conflicts(shuffled, history, related)["repeats"]
+
+
+def test_divide_into_groups_keeps_attribute_buckets():
+    attrs = {u: "sv" if u < 12 else "en" for u in range(24)}
+    groups = divide_into_groups(list(attrs), 6, attrs=attrs, seed=3)
+    assert all(len({attrs[u] for u in g}) == 1 for g in groups)
+
+
+def test_divide_into_groups_is_reproducible_from_seed():
+    users = list(range(30))
+    first = divide_into_groups(list(users), 7, seed=derive_seed(42, 0))
+    assert divide_into_groups(list(reversed(users)), 7, seed=derive_seed(42, 0)) == first
+    assert divide_into_groups(list(users), 7, seed=derive_seed(42, 1)) != first
+    assert derive_seed(42, 0) == derive_seed("42", "0") < 2 ** 63
+
+
+def test_plan_rebalance_places_late_joiners_in_least_active_groups():
+    groups = {1: [1, 2, 3], 2: [4, 5, 6]}
+    moves = plan_rebalance(groups, active={1, 2, 4}, pinned=set(), late=[9, 8], group_size=4, move_members=False)
+    assert moves == [(8, None, 2), (9, None, 1)]
+
+
+def test_plan_rebalance_trades_inactive_seats_for_active_members():
+    groups = {1: [1, 2, 3, 4, 5, 6, 7], 2: [10, 11, 12, 13, 14, 15, 16]}
+    active = {1, 2, 3, 4, 5, 6, 10}
+    moves = plan_rebalance(groups, active, pinned={1, 2}, late=[], group_size=7)
+    assert [(src, dst) for _, src, dst in moves] == [(1, 2), (2, 1), (1, 2), (2, 1)]
+    assert all(uid not in (1, 2) for uid, _, _ in moves)
+    moved_in = {uid for uid, _, dst in moves if dst == 2}
+    assert moved_in <= active and len(moved_in) == 2
+
+
+def _proposal(pid, score, title="t", body=""):
+    return SimpleNamespace(id=pid, total_score=score, title=title, body=body)
+
+
+def test_resolve_policy_reads_meta_and_drops_unknown_strategies():
+    policy, ignored = resolve_policy({"proposals_per_user": 1, "promotion": {"merge": "magic"}}, 2)
+    assert policy["proposals_per_user"] == 1
+    assert policy["merge"] == "near" and ignored == ["merge=magic"]
+
+
+def test_promotion_top_k_reps_share_threshold_proposals():
+    policy, _ = resolve_policy(
+        {"promotion": {"reps_per_group": 2, "proposals": "threshold", "min_score": 5, "merge": "none"}}, 2,
+    )
+    rep_source = select_reps({1: {1: 10, 2: 11, 3: 12}, 2: {1: 20}}, policy)
+    assert rep_source == {10: 1, 11: 1, 20: 2}
+    proposals = {1: [_proposal(1, 9), _proposal(2, 7), _proposal(3, 6), _proposal(4, 1)], 2: [_proposal(5, None)]}
+    carried, merged = plan_promotion(rep_source, proposals, policy)
+    assert {uid: [p.id for p in ps] for uid, ps in carried.items()} == {10: [1, 3], 11: [2], 20: []}
+    assert merged == {}
+
+
+def test_promotion_exact_merge_keeps_best_scored():
+    policy, _ = resolve_policy({"promotion": {"merge": "exact"}}, 1)
+    proposals = {1: [_proposal(1, 3, "Bike lanes!")], 2: [_proposal(2, 8, "bike  lanes")]}
+    carried, merged = plan_promotion({10: 1, 20: 2}, proposals, policy)
+    assert merged == {1: 2}
+    assert [p.id for p in carried[10]] == [] and [p.id for p in carried[20]] == [2]
+
+
+def test_near_duplicate_clusters():
+    texts = {
+        1: "Build protected bike lanes on Main Street to make cycling to school safe",
+        2: "Build protected bike lanes on Main Street to make cycling to the school safe",
+        3: "Plant more trees in the city park",
+        4: "build protected bike lanes on main street to make cycling to school safe!",
+    }
+    assert near_duplicate_clusters(texts, 0.6) == [[1, 2, 4]]
+    assert near_duplicate_clusters(texts, 0.95) == [[1, 4]]
+
+
+def test_promotion_near_merge_is_the_default():
+    policy, _ = resolve_policy({}, 1)
+    proposals = {
+        1: [_proposal(1, 4, "More bike lanes downtown", "Paint protected lanes on every main road")],
+        2: [_proposal(2, 6, "More bike lanes downtown!", "Paint protected lanes on every main road.")],
+        3: [_proposal(3, 9, "Free public transport", "Buses free for everyone")],
+    }
+    carried, merged = plan_promotion({10: 1, 20: 2, 30: 3}, proposals, policy)
+    assert merged == {1: 2}
+    assert [p.id for ps in carried.values() for p in ps] == [2, 3]
+
+
+def test_export_writers_stream_chunks():
+    columns = ["id", "score_per_level", "created_at"]
+    chunks = [[(1, [3.5], "2026-01-01 10:00:00+00"), (2, None, None)], [], [(3, [1.0, 2.0], "2026-01-02 10:00:00+00")]]
+
+    async def source():
+        for rows in chunks:
+            yield rows
+
+    async def collect(writer):
+        return b"".join([data async for data in writer(columns, source())])
+
+    lines = asyncio.run(collect(csv_chunks)).decode().splitlines()
+    assert lines == ["id,score_per_level,created_at", '1,[3.5],2026-01-01 10:00:00+00', "2,,", '3,"[1.0,2.0]",2026-01-02 10:00:00+00']
+    table = read_columnar(asyncio.run(collect(columnar_chunks)))
+    assert table["data"] == {"id": [1, 2, 3], "score_per_level": [[3.5], None, [1.0, 2.0]],
+                             "created_at": ["2026-01-01 10:00:00+00", None, "2026-01-02 10:00:00+00"]}